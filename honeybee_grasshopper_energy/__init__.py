@@ -0,0 +1,12 @@
+"""Functions shared by the Grasshopper components of honeybee-energy.
+
+The components in the src folder import these modules rather than each holding
+its own copy of the same code. The modules can also be imported outside of
+Rhino, in which case the caches that are shared between components live in a
+plain dictionary instead of the scriptcontext sticky.
+"""
+
+try:  # share the caches between all components of the Rhino session
+    from scriptcontext import sticky
+except ImportError:  # outside of Rhino
+    sticky = {}
@@ -0,0 +1,85 @@
+# coding=utf-8
+"""Cache of the result files of EnergyPlus simulations.
+
+Each simulation is stored in a folder of the cache that is named with the hash
+of its inputs such that a later run with identical inputs can reuse the results.
+"""
+import os
+import shutil
+
+from ladybug.futil import nukedir
+
+from honeybee_grasshopper_energy.run import files_hash, result_files
+
+
+def simulation_hash(idf_file, epw_file):
+    """Get a hash that uniquely identifies the inputs of an EnergyPlus simulation.
+
+    This includes the contents of the IDF, the EPW and any CSV files that are
+    referenced by the Schedule:File objects of the IDF.
+    """
+    return files_hash((idf_file, epw_file))
+
+
+def cache_results(sim_dir, sim_files):
+    """Copy simulation result files into a folder of the simulation cache.
+
+    Args:
+        sim_dir: The folder of the cache into which the files are copied.
+        sim_files: A list of the result files of the simulation. Any None in
+            the list is ignored.
+    """
+    temp_dir = '{}.tmp'.format(sim_dir)  # copy to a temp folder so hits are complete
+    nukedir(temp_dir, True)
+    os.makedirs(temp_dir)
+    for f_path in sim_files:
+        if f_path is not None:
+            shutil.copy(f_path, temp_dir)
+    os.rename(temp_dir, sim_dir)
+
+
+def restore_results(sim_dir, directory):
+    """Copy the result files of a cached simulation into a simulation folder.
+
+    The files are copied rather than used from the cache since the cached
+    simulation can be deleted whenever the cache grows beyond its size.
+
+    Args:
+        sim_dir: The folder of the cache that holds the simulation.
+        directory: The folder into which the result files are copied, which
+            is typically the folder of the IDF.
+
+    Returns:
+        The sql, zsz, rdd, html and err files in the directory.
+    """
+    os.utime(sim_dir, None)  # mark the simulation as recently used
+    for f_path in result_files(sim_dir):
+        if f_path is not None:
+            shutil.copy(f_path, directory)
+    return result_files(directory)
+
+
+def evict_cache(cache_folder, max_size):
+    """Delete the least recently used simulations until the cache fits max_size.
+
+    Only the complete simulation folders of the cache are counted and deleted.
+    Any other file in the cache_folder and any folder that is still being
+    written (ending in .tmp) is left as it is.
+
+    Args:
+        cache_folder: The folder of the simulation cache.
+        max_size: The size in bytes that the cache should not exceed.
+    """
+    entries = []
+    for f_name in os.listdir(cache_folder):
+        entry = os.path.join(cache_folder, f_name)
+        if not os.path.isdir(entry) or f_name.endswith('.tmp'):
+            continue
+        size = sum(os.path.getsize(os.path.join(entry, f)) for f in os.listdir(entry))
+        entries.append((os.path.getmtime(entry), size, entry))
+    total_size = sum(entry[1] for entry in entries)
+    for _, size, entry in sorted(entries):
+        if total_size <= max_size:
+            break
+        nukedir(entry, True)
+        total_size -= size
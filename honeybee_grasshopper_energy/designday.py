@@ -0,0 +1,27 @@
+# coding=utf-8
+"""Cache of the design days that are parsed from .ddy files."""
+import os
+
+from ladybug.ddy import DDY
+
+from honeybee_grasshopper_energy import sticky
+
+
+def design_days_from_ddy(ddy_file):
+    """Get copies of the 99.6% and 0.4% design days in a .ddy file.
+
+    The parsed DesignDays are kept in a cache shared by all components under
+    the path, modification time and size of the .ddy file such that each file
+    is only parsed once. Copies are returned so that the cached DesignDays are
+    never changed by the SimulationParameter to which they are added.
+
+    Args:
+        ddy_file: Path to a .ddy file.
+    """
+    key = (os.path.abspath(ddy_file), os.path.getmtime(ddy_file),
+           os.path.getsize(ddy_file))
+    ddy_cache = sticky.setdefault('hb_ddy_design_days', {})
+    if key not in ddy_cache:
+        ddy_cache[key] = [dday for dday in DDY.from_ddy_file(ddy_file)
+                          if '99.6%' in dday.name or '.4%' in dday.name]
+    return [dday.duplicate() for dday in ddy_cache[key]]
@@ -0,0 +1,97 @@
+# coding=utf-8
+"""Job ledger that lets a batch of simulations resume after an interruption.
+
+The ledger is an SQLite database in the default simulation folder, which holds
+the input hash, status, timings and output files of every job that has been
+run with resume_ set to True.
+"""
+import os
+import time
+import sqlite3
+import threading
+
+from honeybee.config import folders
+
+from honeybee_grasshopper_energy.run import files_hash
+
+# the lock of the ledger, which is shared by all jobs of all components
+LEDGER_LOCK = threading.Lock()
+
+
+def job_hash(file_paths, extra=''):
+    """Get a hash that uniquely identifies the contents of the input files of a job.
+
+    The CSV files referenced by the Schedule:File objects of any IDF in the
+    file_paths are part of the hash such that editing them reruns the job.
+    """
+    return files_hash(file_paths, extra)
+
+
+def job_ledger():
+    """Get a connection to the SQLite job ledger, creating the Jobs table if needed."""
+    if not os.path.isdir(folders.default_simulation_folder):
+        os.makedirs(folders.default_simulation_folder)
+    ledger = os.path.join(folders.default_simulation_folder, 'simulation_jobs.db')
+    conn = sqlite3.connect(ledger)
+    c = conn.cursor()
+    c.execute('CREATE TABLE IF NOT EXISTS Jobs (InputHash TEXT PRIMARY KEY, '
+              'Component TEXT, InputFile TEXT, Status TEXT, StartTime REAL, '
+              'EndTime REAL, TranslateTime REAL, SimulationTime REAL, Osm TEXT, '
+              'Idf TEXT, Sql TEXT, Zsz TEXT, Rdd TEXT, Html TEXT, Err TEXT)')
+    return conn
+
+
+def completed_job(input_hash):
+    """Get the output files of a completed job in the ledger.
+
+    Returns:
+        A tuple with the osm, idf, sql, zsz, rdd, html and err of the job.
+        This will be None if the job has not been completed or if any of its
+        output files no longer exist.
+    """
+    with LEDGER_LOCK:
+        conn = job_ledger()
+        try:
+            c = conn.cursor()
+            c.execute('SELECT Osm, Idf, Sql, Zsz, Rdd, Html, Err FROM Jobs WHERE '
+                      'InputHash=? AND Status IN (?, ?)',
+                      (input_hash, 'Completed', 'Translated'))
+            row = c.fetchone()
+            conn.close()  # ensure connection is always closed
+        except Exception as e:
+            conn.close()  # ensure connection is always closed
+            raise Exception(str(e))
+    if row is None or not all(os.path.isfile(f) for f in row if f is not None):
+        return None
+    return row
+
+
+def record_job(component, input_hash, input_file, status, start_time,
+               translate_time=0, sim_time=0, outputs=(None,) * 7):
+    """Write the status, timings and output files of a job into the ledger.
+
+    Args:
+        component: The name of the component that runs the job.
+        input_hash: The job_hash of the input files of the job.
+        input_file: The path to the main input file of the job (eg. the IDF).
+        status: Text for the status of the job (eg. Running, Completed).
+        start_time: The time at which the job was started in seconds since
+            the epoch.
+        translate_time: The time in seconds that it took to translate the input.
+        sim_time: The time in seconds that it took to run the simulation.
+        outputs: A tuple with the osm, idf, sql, zsz, rdd, html and err files
+            of the job.
+    """
+    values = (input_hash, component, input_file, status, start_time,
+              time.time(), translate_time, sim_time) + tuple(outputs)
+    with LEDGER_LOCK:
+        conn = job_ledger()
+        try:
+            c = conn.cursor()
+            c.execute('INSERT OR REPLACE INTO Jobs VALUES ({})'.format(
+                ', '.join(['?'] * len(values))), values)
+            conn.commit()
+            conn.close()  # ensure connection is always closed
+        except Exception as e:
+            conn.close()  # ensure connection is always closed
+            raise Exception(str(e))
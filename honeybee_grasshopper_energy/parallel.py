@@ -0,0 +1,52 @@
+# coding=utf-8
+"""Functions for sizing the parallel work of the components."""
+import multiprocessing
+
+
+def physical_cores():
+    """Get the number of physical CPU cores on this machine.
+
+    The logical processors are counted when the physical cores cannot be
+    queried (eg. on a machine other than Windows).
+    """
+    try:
+        import clr
+        clr.AddReference('System.Management')
+        from System.Management import ManagementObjectSearcher
+        searcher = ManagementObjectSearcher('Select NumberOfCores from Win32_Processor')
+        return sum(int(item['NumberOfCores']) for item in searcher.Get())
+    except Exception:  # not on Windows or not in .NET; use the logical processors
+        try:
+            import System
+            return System.Environment.ProcessorCount
+        except ImportError:
+            return multiprocessing.cpu_count()
+
+
+def worker_count(max_workers=None, default=None, input_name='max_workers_'):
+    """Get a number of parallel workers from an optional input of the user.
+
+    Args:
+        max_workers: An optional integer for the maximum number of workers that
+            was input by the user. Values below 1 are raised to 1 since no work
+            would be done otherwise.
+        default: The number of workers to use when max_workers is None.
+            If None, the number of physical cores is used.
+        input_name: The name of the component input of max_workers, which is
+            used in the warning. (Default: max_workers_).
+
+    Returns:
+        A tuple with two items.
+
+        -   count: The number of workers, which is always at least 1.
+
+        -   warning: Text to warn the user that max_workers was changed. This
+            is None if max_workers was used as it is.
+    """
+    if max_workers is None:
+        count = default if default is not None else physical_cores()
+        return max(int(count), 1), None
+    if int(max_workers) >= 1:
+        return int(max_workers), None
+    return 1, '{} must be at least 1 and it has been set to 1 instead ' \
+        'of {}.'.format(input_name, max_workers)
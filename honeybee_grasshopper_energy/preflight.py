@@ -0,0 +1,90 @@
+# coding=utf-8
+"""Checks of a Model that are made before it is simulated."""
+
+
+def preflight_index(model):
+    """Get a dictionary that indexes a Model for the checks before simulation.
+
+    All of the checks are made in a single pass over the objects of the Model.
+    The index is not cached between runs since a Model can be edited in place
+    and it cannot be weakly referenced, so any cache would either return
+    stale results or keep every checked Model in memory.
+
+    Args:
+        model: A honeybee Model to be checked.
+
+    Returns:
+        A dictionary with the following keys.
+
+        -   counts: A dictionary with the number of each object type.
+        -   orphaned_faces: A list of the orphaned Faces of the Model.
+        -   orphaned_apertures: A list of the orphaned Apertures of the Model.
+        -   orphaned_doors: A list of the orphaned Doors of the Model.
+        -   zero_area: A list of text for the objects with no area.
+        -   duplicate_identifiers: A list of text for the objects with an
+            identifier that is already used by another object. Rooms are only
+            compared with other Rooms while Faces, Apertures, Doors and Shades
+            are all compared with one another since they are all surfaces in
+            EnergyPlus, which must have unique names.
+    """
+    counts = {'Room': 0, 'Face': 0, 'Aperture': 0, 'Door': 0, 'Shade': 0}
+    surface_ids = set()  # shared by all object types that are EnergyPlus surfaces
+    identifiers = dict((obj_type, surface_ids) for obj_type in counts)
+    identifiers['Room'] = set()
+    zero_area, duplicates = [], []
+    min_area = model.tolerance ** 2
+
+    def index_object(obj, obj_type):
+        counts[obj_type] += 1
+        if obj.identifier in identifiers[obj_type]:
+            duplicates.append('{} "{}"'.format(obj_type, obj.display_name))
+        identifiers[obj_type].add(obj.identifier)
+        if obj_type != 'Room' and obj.area <= min_area:
+            zero_area.append('{} "{}"'.format(obj_type, obj.display_name))
+
+    def index_shades(obj):
+        for shade in obj.shades:
+            index_object(shade, 'Shade')
+
+    def index_face(face):
+        index_object(face, 'Face')
+        index_shades(face)
+        for aperture in face.apertures:
+            index_object(aperture, 'Aperture')
+            index_shades(aperture)
+        for door in face.doors:
+            index_object(door, 'Door')
+            index_shades(door)
+
+    for room in model.rooms:
+        index_object(room, 'Room')
+        index_shades(room)
+        for face in room.faces:
+            index_face(face)
+    for face in model.orphaned_faces:
+        index_face(face)
+    for shade in model.orphaned_shades:
+        index_object(shade, 'Shade')
+    for aperture in model.orphaned_apertures:
+        index_object(aperture, 'Aperture')
+        index_shades(aperture)
+    for door in model.orphaned_doors:
+        index_object(door, 'Door')
+        index_shades(door)
+
+    return {
+        'counts': counts,
+        'orphaned_faces': model.orphaned_faces,
+        'orphaned_apertures': model.orphaned_apertures,
+        'orphaned_doors': model.orphaned_doors,
+        'zero_area': zero_area,
+        'duplicate_identifiers': duplicates
+    }
+
+
+def orphaned_warning(object_type):
+    """Generate an error message for orphaned Faces, Apertures, or Doors."""
+    return 'Input _model contains orphaned {}s. These are not permitted in ' \
+        'Models for energy simulation.\nIf you have geometry that is not a ' \
+        'part of a Room boundary that you want included in the energy simulation, ' \
+        'it should be added as shades.'.format(object_type)
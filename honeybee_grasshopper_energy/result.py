@@ -0,0 +1,618 @@
+# coding=utf-8
+"""Cached parsing of EnergyPlus SQLite result files into Ladybug DataCollections."""
+from __future__ import division
+
+import os
+import json
+import array
+import fnmatch
+import sqlite3
+import operator
+from collections import OrderedDict
+
+import ladybug.datatype
+from ladybug.dt import DateTime
+from ladybug.analysisperiod import AnalysisPeriod
+from ladybug.header import Header
+from ladybug.datacollection import HourlyContinuousCollection, DailyCollection, \
+    MonthlyCollection
+
+from honeybee_grasshopper_energy import sticky
+
+# memory in MB of the values cached across all sql files
+SQL_CACHE_MB = 512
+
+
+class SQLiteReader(object):
+    """Reader of an EnergyPlus SQLite file that caches the parts already parsed.
+
+    The ReportDataDictionary is only read once and the values of each series are
+    only read from the file the first time that they are requested. The values
+    are cached as compact arrays of doubles and the DataCollections are built
+    from them for each request such that the collections can be edited without
+    changing the cache. When the file has a columnar sidecar (see write_sidecar),
+    the values are read from the sidecar instead of the ReportData table.
+
+    Args:
+        file_path: Full path to an SQLite file that was generated by EnergyPlus.
+
+    Properties:
+        * file_path
+        * size
+        * dictionary
+        * sidecar_path
+        * sidecar
+        * max_size
+    """
+    _value_bytes = 8  # memory of each value of a cached array of doubles
+    _aggregations = ('Annual', 'Monthly', 'Daily', 'Peak')
+    _interval_codes = ('Timestep', 'Hourly', 'Daily', 'Monthly', 'Annual')
+    cache_version = 4  # change whenever the cached attributes or methods change
+
+    def __init__(self, file_path):
+        assert os.path.isfile(file_path), 'No file was found at {}'.format(file_path)
+        assert file_path.endswith(('.sql', '.db', '.sqlite')), \
+            '{} is not an SQL file ending in .sql or .db.'.format(file_path)
+        self._file_path = file_path
+        self._size = 0
+        self._dictionary = None
+        self._series = OrderedDict()  # least recently used first
+        self._run_periods = {}  # run periods and frequencies by start and end time
+        self._sidecar = None
+        self.max_size = None
+
+    @property
+    def file_path(self):
+        """Get the path to the .sql file."""
+        return self._file_path
+
+    @property
+    def size(self):
+        """Get the memory of the cached values in bytes."""
+        return self._size
+
+    @property
+    def max_size(self):
+        """Get or set the memory in bytes that the cached values should not exceed.
+
+        The values of the least recently used series are dropped at the end of
+        each request that takes the cache beyond this size. If None, the cache
+        of the reader is not bounded.
+        """
+        return self._max_size
+
+    @max_size.setter
+    def max_size(self, value):
+        self._max_size = value
+
+    @property
+    def dictionary(self):
+        """Get a dictionary of the ReportDataDictionary rows under each output name."""
+        if self._dictionary is None:
+            if self.sidecar is not None:
+                rows = [tuple(row) for row in self.sidecar['dictionary']]
+            else:
+                rows = self._query('SELECT * FROM ReportDataDictionary')
+            dictionary = {}
+            for row in rows:
+                dictionary.setdefault(row[6], []).append(row)
+            self._dictionary = dictionary
+        return self._dictionary
+
+    @property
+    def sidecar_path(self):
+        """Get the path to the columnar sidecar of the file, which may not exist."""
+        return os.path.splitext(self.file_path)[0] + '.columns'
+
+    @property
+    def sidecar(self):
+        """Get the index of the columnar sidecar of the file.
+
+        This will be None if the file has no sidecar or if the sidecar was
+        written for an earlier version of the file.
+        """
+        if self._sidecar is None:
+            self._sidecar = False
+            index_path = self.sidecar_path + '.json'
+            if os.path.isfile(index_path) and os.path.isfile(self.sidecar_path):
+                with open(index_path) as index_file:
+                    index = json.load(index_file)
+                stat = os.stat(self.file_path)
+                if (index.get('sql_mtime_us'), index.get('sql_size')) == \
+                        (mtime_microseconds(stat), stat.st_size):
+                    self._sidecar = index
+        return self._sidecar or None
+
+    def write_sidecar(self):
+        """Convert all of the time series of the file into a columnar sidecar.
+
+        The sidecar is a binary file next to the SQL file, which holds the values
+        of each series as one contiguous array of doubles, and a small JSON index
+        of the position of each array. Any later reader of the file loads the
+        values with a single read of each array rather than decoding the rows
+        of the ReportData table. The sidecar is ignored once the SQL file changes.
+        """
+        stat = os.stat(self.file_path)
+        series = {}
+        conn = sqlite3.connect(self.file_path)
+        try:
+            c = conn.cursor()
+            c.execute('SELECT ReportDataDictionaryIndex, Value, TimeIndex FROM '
+                      'ReportData ORDER BY ReportDataDictionaryIndex, ReportDataIndex')
+            with open(self.sidecar_path, 'wb') as data_file:
+                def write_series():
+                    series[index] = (data_file.tell(), len(values), start_time, end_time)
+                    values.tofile(data_file)
+
+                index = None
+                for row in c:
+                    if row[0] != index:
+                        if index is not None:
+                            write_series()
+                        index, values, start_time = row[0], array.array('d'), row[2]
+                    values.append(row[1])
+                    end_time = row[2]
+                if index is not None:
+                    write_series()
+            c.execute('SELECT * FROM ReportDataDictionary')
+            dictionary = c.fetchall()
+            conn.close()  # ensure connection is always closed
+        except Exception as e:
+            conn.close()  # ensure connection is always closed
+            raise Exception(str(e))
+
+        # write the index last such that a partly written sidecar is never used
+        index = {'sql_mtime_us': mtime_microseconds(stat), 'sql_size': stat.st_size,
+                 'dictionary': dictionary, 'series': series}
+        with open(self.sidecar_path + '.json', 'w') as index_file:
+            json.dump(index, index_file)
+        self._sidecar = None
+
+    def data_collections_by_output_name(self, output_name, aggregation=None,
+                                        keys=None):
+        """Get an array of Ladybug DataCollections for a specified output.
+
+        Args:
+            output_name: The name of an EnergyPlus output to be retrieved from
+                the SQLite result file. This can also be an array of output names
+                for which all data collections should be retrieved.
+            aggregation: Optional text for how the values should be aggregated
+                over the run period by SQLite rather than returned as the
+                reported time series. Choose from the following.
+
+                * Annual - a number for the total (or average) of each series
+                * Monthly - MonthlyCollections of the total (or average) of each month
+                * Daily - DailyCollections of the total (or average) of each day
+                * Peak - MonthlyCollections of the highest value in each month
+
+                Series with a Type of Sum in the ReportDataDictionary (eg. energy)
+                are summed while all others are averaged over time.
+            keys: An optional list of zone or surface names to which the results
+                should be limited. These can include * and ? wildcards and they
+                are matched regardless of case (eg. 'FACADE_SOUTH_*'). Only the
+                series of matching keys are queried from the file.
+
+        Returns:
+            An array of data collections of the requested output type. This will
+            be an empty list if no output of the requested name was found in the
+            file.
+        """
+        # surface outputs requested by name are labeled as such in the metadata
+        obj_type = 'Surface' if 'Surface' in output_name else None
+        rows = self._dictionary_rows(output_name, keys)
+        if aggregation is None:
+            cache_keys = [row[0] for row in rows]
+            self._load_series([row for row, key in zip(rows, cache_keys)
+                               if key not in self._series])
+        else:
+            assert aggregation in self._aggregations, 'Aggregation "{}" is not ' \
+                'recognized. Choose from: {}'.format(aggregation, self._aggregations)
+            cache_keys = [(row[0], aggregation) for row in rows]
+            self._load_aggregates([row for row, key in zip(rows, cache_keys)
+                                   if key not in self._series], aggregation)
+        series = [self._collection(row, obj_type, aggregation, self._used(key))
+                  for row, key in zip(rows, cache_keys)]
+        if self._max_size is not None:
+            self.trim(self._max_size)
+        return [data for data in series if data is not None]
+
+    def preload(self, output_names):
+        """Load the series of several outputs into the cache with one query of ReportData.
+
+        Args:
+            output_names: A list of EnergyPlus output names for which all series
+                should be loaded such that later requests for them do not have
+                to query the file again.
+        """
+        self._load_series([row for row in self._dictionary_rows(output_names)
+                           if row[0] not in self._series])
+        if self._max_size is not None:
+            self.trim(self._max_size)
+
+    def trim(self, max_size):
+        """Drop the least recently used series until the cache fits a size.
+
+        Args:
+            max_size: The memory in bytes that the values cached by this
+                reader should not exceed.
+        """
+        while self._size > max_size and len(self._series) != 0:
+            _, (_, size) = self._series.popitem(last=False)
+            self._size -= size
+
+    def _used(self, key):
+        """Get the cached values of a series and mark them as the most recently used."""
+        entry = self._series.pop(key)
+        self._series[key] = entry
+        return entry[0]
+
+    def _cache(self, key, values, value_count):
+        """Add the values of a series to the cache along with their memory."""
+        size = value_count * self._value_bytes
+        self._series[key] = (values, size)
+        self._size += size
+
+    def _dictionary_rows(self, output_name, keys=None):
+        """Get the ReportDataDictionary rows of one or more output names in file order."""
+        names = (output_name,) if isinstance(output_name, str) else output_name
+        rows = sorted(row for name in set(names) for row in self.dictionary.get(name, ()))
+        if keys is None:
+            return rows
+        patterns = [key.upper() for key in keys]
+        return [row for row in rows if any(
+            fnmatch.fnmatchcase((row[5] or '').upper(), pat) for pat in patterns)]
+
+    def _load_series(self, rows):
+        """Read the values of ReportDataDictionary rows into the cache."""
+        if len(rows) == 0:
+            return
+        if self.sidecar is not None:
+            series = self.sidecar['series']
+            with open(self.sidecar_path, 'rb') as data_file:
+                for row in rows:
+                    position, count, start_time, end_time = \
+                        series.get(str(row[0]), (0, 0, None, None))
+                    values = array.array('d')
+                    data_file.seek(position)
+                    values.fromfile(data_file, count)
+                    self._cache_series(row, values, start_time, end_time)
+            return
+
+        all_values = dict((row[0], array.array('d')) for row in rows)
+        start_times, end_times = {}, {}
+        for index, value, time_index in self._query(
+                'SELECT ReportDataDictionaryIndex, Value, TimeIndex FROM ReportData '
+                'WHERE ReportDataDictionaryIndex IN ({})'.format(
+                    ', '.join(str(row[0]) for row in rows))):
+            values = all_values[index]
+            if len(values) == 0:
+                start_times[index] = time_index
+            values.append(value)
+            end_times[index] = time_index
+
+        for row in rows:
+            self._cache_series(row, all_values[row[0]],
+                               start_times.get(row[0]), end_times.get(row[0]))
+
+    def _cache_series(self, row, values, start_time, end_time):
+        """Add the values of a ReportDataDictionary row to the cache."""
+        entry = None  # remember that the series has no data
+        if len(values) != 0:
+            if row[-1] == 'J':
+                values = array.array('d', (val / 3600000. for val in values))
+            entry = (values, start_time, end_time)
+        self._cache(row[0], entry, len(values))
+
+    def _load_aggregates(self, rows, aggregation):
+        """Aggregate the series of ReportDataDictionary rows with SQLite and cache them.
+
+        Only the weather file run periods of the simulation are aggregated such
+        that any design days in the file are excluded.
+        """
+        if len(rows) == 0:
+            return
+        groups = dict((row[0], []) for row in rows)
+        group_by = {'Annual': '', 'Monthly': ', t.Month', 'Peak': ', t.Month',
+                    'Daily': ', t.Month, t.Day'}[aggregation]
+        for group in self._query(
+                'SELECT r.ReportDataDictionaryIndex, SUM(r.Value), COUNT(r.Value), '
+                'SUM(r.Value * t.Interval), SUM(t.Interval), MAX(r.Value), '
+                'MIN(r.TimeIndex), MAX(r.TimeIndex) FROM ReportData r '
+                'JOIN Time t ON r.TimeIndex = t.TimeIndex '
+                'JOIN EnvironmentPeriods e ON t.EnvironmentPeriodIndex = '
+                'e.EnvironmentPeriodIndex WHERE e.EnvironmentType = 3 AND '
+                'r.ReportDataDictionaryIndex IN ({}) GROUP BY '
+                'r.ReportDataDictionaryIndex{} ORDER BY '
+                'r.ReportDataDictionaryIndex, MIN(r.TimeIndex)'.format(
+                    ', '.join(str(row[0]) for row in rows), group_by)):
+            groups[group[0]].append(group[1:])
+
+        for row in rows:
+            parts, key = groups[row[0]], (row[0], aggregation)
+            if len(parts) == 0:  # remember that the series has no data
+                self._cache(key, None, 0)
+                continue
+            factor = 1 / 3600000. if row[-1] == 'J' else 1
+            if aggregation == 'Peak':
+                values = [part[4] * factor for part in parts]
+            elif row[2] == 'Sum':
+                values = [part[0] * factor for part in parts]
+            else:  # average the values over the duration of each interval
+                values = [(part[2] / part[3] if part[3] else part[0] / part[1]) * factor
+                          for part in parts]
+            if aggregation == 'Annual':
+                self._cache(key, values[0], 1)
+                continue
+            start_time = min(part[5] for part in parts)
+            end_time = max(part[6] for part in parts)
+            run_period, _ = self._run_period(start_time, end_time)
+            datetimes = run_period.doys_int if aggregation == 'Daily' \
+                else run_period.months_int
+            assert len(values) == len(datetimes), 'Output "{}" is reported {} and ' \
+                'cannot be aggregated {}.'.format(row[6], row[7], aggregation)
+            self._cache(key, (array.array('d', values), start_time, end_time),
+                        len(values))
+
+    def _run_period(self, start_time, end_time):
+        """Get the run period and reporting frequency between two time indices."""
+        run_key = (start_time, end_time)
+        if run_key not in self._run_periods:
+            self._run_periods[run_key] = self._extract_run_period(start_time, end_time)
+        return self._run_periods[run_key]
+
+    def _extract_run_period(self, start_time, end_time):
+        """Get an AnalysisPeriod and the reporting frequency from the Time table.
+
+        Args:
+            start_time: Index of the Time row of the first value of a series.
+            end_time: Index of the Time row of the last value of a series.
+        """
+        start = self._query('SELECT * FROM Time WHERE TimeIndex={}'.format(
+            int(start_time)))[0]
+        end = self._query('SELECT * FROM Time WHERE TimeIndex={}'.format(
+            int(end_time)))[0]
+
+        # set the reporting frequency by the interval type
+        if start[8] <= 1:
+            min_per_step = start[7]
+            timestep = int(60 / min_per_step)
+            reporting_frequency = timestep
+        else:
+            reporting_frequency = self._interval_codes[min(start[8], 4)]
+            timestep, min_per_step = 1, 60
+
+        # convert the start and end times into an AnalysisPeriod
+        leap_year = start[1] % 4 == 0
+        st_date = DateTime(start[2], 1, 0) if reporting_frequency == 'Monthly' \
+            else DateTime(start[2], start[3], 0)
+        end_date = DateTime(end[2], end[3], 0).add_minute(1440 - min_per_step)
+        run_period = AnalysisPeriod(
+            st_date.month, st_date.day, st_date.hour, end_date.month, end_date.day,
+            end_date.hour, timestep, leap_year)
+        return run_period, reporting_frequency
+
+    def _series_header(self, row, obj_type, run_period):
+        """Get the Header for the series of a ReportDataDictionary row."""
+        units = row[-1] if row[-1] != 'J' else 'kWh'
+        obj_type = obj_type or row[3]
+        return Header(data_type_from_unit(units), units, run_period,
+                      {'type': row[6], obj_type: row[5]})
+
+    def _collection(self, row, obj_type, aggregation, entry):
+        """Build the DataCollection of a ReportDataDictionary row from cached values."""
+        if entry is None or aggregation == 'Annual':
+            return entry  # no data or a single aggregated number
+        values, start_time, end_time = entry
+        run_period, reporting_frequency = self._run_period(start_time, end_time)
+        if aggregation is not None:
+            reporting_frequency = 'Daily' if aggregation == 'Daily' else 'Monthly'
+        elif reporting_frequency == 'Annual':
+            return tuple(values)
+        header = self._series_header(row, obj_type, run_period)
+        if reporting_frequency == 'Daily':
+            return DailyCollection(header, list(values), run_period.doys_int)
+        elif reporting_frequency == 'Monthly':
+            return MonthlyCollection(header, list(values), run_period.months_int)
+        return HourlyContinuousCollection(header, list(values))
+
+    def _query(self, statement):
+        """Get all of the rows that result from an SQL statement on the file."""
+        conn = sqlite3.connect(self.file_path)
+        try:
+            c = conn.cursor()
+            c.execute(statement)
+            rows = c.fetchall()
+            conn.close()  # ensure connection is always closed
+        except Exception as e:
+            conn.close()  # ensure connection is always closed
+            raise Exception(str(e))
+        return rows
+
+    def ToString(self):
+        """Overwrite .NET ToString."""
+        return self.__repr__()
+
+    def __repr__(self):
+        return 'Energy SQLiteReader: {}'.format(self.file_path)
+
+
+def data_type_from_unit(from_unit):
+    """Get a Ladybug DataType object instance from a unit abbreviation.
+
+    The returned object will be the base type (eg. Temperature, Energy, etc.).
+    """
+    for key in ladybug.datatype.UNITS:
+        if from_unit in ladybug.datatype.UNITS[key]:
+            return ladybug.datatype.TYPESDICT[key]()
+
+
+def collection_like(data, values, output_type):
+    """Create a DataCollection with the header of another but new values and type."""
+    header = data.header.duplicate()
+    header.metadata['type'] = output_type
+    if isinstance(data, HourlyContinuousCollection):
+        return HourlyContinuousCollection(header, values)
+    return data.__class__(header, values, data.datetimes)
+
+
+def check_aligned(data, other):
+    """Check that two DataCollections describe the same object over the same times.
+
+    This is the case when they have the same number of values, the same analysis
+    period and the same metadata apart from the output type. An AssertionError
+    is raised otherwise such that the values are never combined with those of
+    another room or surface.
+    """
+    assert len(data.values) == len(other.values), 'Cannot combine "{}" with ' \
+        '"{}". They have {} and {} values.'.format(
+            data.header.metadata['type'], other.header.metadata['type'],
+            len(data.values), len(other.values))
+    assert data.header.analysis_period == other.header.analysis_period, \
+        'Cannot combine "{}" with "{}". Their analysis periods differ.'.format(
+            data.header.metadata['type'], other.header.metadata['type'])
+    keys = [dict((k, v) for k, v in d.header.metadata.items() if k != 'type')
+            for d in (data, other)]
+    assert keys[0] == keys[1], 'Cannot combine "{}" of {} with "{}" of {}.'.format(
+        data.header.metadata['type'], keys[0], other.header.metadata['type'], keys[1])
+
+
+def subtract_values(data, other):
+    """Get the values of one DataCollection minus those of another aligned one."""
+    check_aligned(data, other)
+    return list(map(operator.sub, data.values, other.values))
+
+
+def subtract_loss_from_gain(gain_load, loss_load):
+    """Create a single DataCollection from gains and losses.
+
+    The values of each gain and loss are subtracted as whole lists and only the
+    results are turned into DataCollections. Annual results are numbers and
+    they are subtracted directly. An AssertionError is raised if a gain and a
+    loss are not aligned (see check_aligned).
+    """
+    assert len(gain_load) == len(loss_load), 'Found {} gains but {} losses.'.format(
+        len(gain_load), len(loss_load))
+    return [gain - loss if isinstance(gain, float) else
+            collection_like(gain, subtract_values(gain, loss),
+                            gain.header.metadata['type'].replace('Gain ', ''))
+            for gain, loss in zip(gain_load, loss_load)]
+
+
+def sql_aggregates(sql_path, output_names):
+    """Get the annual and monthly values of outputs in an SQL file.
+
+    The values are summed for each month by SQLite over the weather file run
+    periods of the simulation (excluding design days) such that none of the
+    time series has to be loaded into Python.
+
+    Args:
+        sql_path: Path to an SQL result file that was generated by EnergyPlus.
+        output_names: A list of EnergyPlus output names to be aggregated.
+
+    Returns:
+        A list with one tuple for each series of the output_names in the file.
+        Each tuple has the key, output name, reporting frequency, unit, annual
+        value and a list of 12 monthly values (None for months outside the
+        run period). An output that is reported at several frequencies has
+        one tuple for each of them.
+    """
+    conn = sqlite3.connect(sql_path)
+    try:
+        c = conn.cursor()
+        c.execute('SELECT ReportDataDictionaryIndex, Type, KeyValue, Name, '
+                  'ReportingFrequency, Units FROM ReportDataDictionary '
+                  'WHERE Name IN ({})'.format(', '.join(['?'] * len(output_names))),
+                  tuple(output_names))
+        series = c.fetchall()
+        if len(series) == 0:
+            conn.close()  # ensure connection is always closed
+            return []
+        c.execute(
+            'SELECT r.ReportDataDictionaryIndex, t.Month, SUM(r.Value), COUNT(r.Value), '
+            'SUM(r.Value * t.Interval), SUM(t.Interval) FROM ReportData r '
+            'JOIN Time t ON r.TimeIndex = t.TimeIndex '
+            'JOIN EnvironmentPeriods e ON t.EnvironmentPeriodIndex = '
+            'e.EnvironmentPeriodIndex WHERE e.EnvironmentType = 3 AND '
+            'r.ReportDataDictionaryIndex IN ({}) '
+            'GROUP BY r.ReportDataDictionaryIndex, t.Month'.format(
+                ', '.join(str(row[0]) for row in series)))
+        month_rows = c.fetchall()
+        conn.close()  # ensure connection is always closed
+    except Exception as e:
+        conn.close()  # ensure connection is always closed
+        raise Exception(str(e))
+
+    # group the sums of each month under the series
+    month_sums = dict((row[0], {}) for row in series)
+    for index, month, total, count, weighted_total, duration in month_rows:
+        month_sums[index][month] = (total, count, weighted_total, duration)
+
+    # sum the energy outputs and average all other outputs over time
+    def aggregate(parts, sum_type, factor):
+        total, count, weighted_total, duration = \
+            [sum(part[i] for part in parts) for i in range(4)]
+        if sum_type == 'Sum':
+            return total * factor
+        if duration > 0:
+            return weighted_total * factor / duration
+        return total * factor / count
+
+    aggregates = []
+    for index, sum_type, key, name, frequency, unit in series:
+        sums = month_sums[index]
+        if len(sums) == 0:
+            continue
+        factor = 1 / 3600000. if unit == 'J' else 1
+        monthly = [aggregate([sums[m]], sum_type, factor) if m in sums else None
+                   for m in range(1, 13)]
+        aggregates.append((key, name, frequency, 'kWh' if unit == 'J' else unit,
+                           aggregate(sums.values(), sum_type, factor), monthly))
+    return aggregates
+
+
+def mtime_microseconds(stat):
+    """Get the modification time of an os.stat result as integer microseconds.
+
+    Integers are stored in the sidecar index since a float modification time
+    does not always survive the round trip through JSON unchanged.
+    """
+    try:
+        return stat.st_mtime_ns // 1000
+    except AttributeError:  # IronPython and Python 2 only have the float time
+        return int(round(stat.st_mtime * 1000000))
+
+
+def sql_reader(file_path):
+    """Get the SQLiteReader of a file from the cache shared by all components.
+
+    Readers are cached under the path, modification time and size of the file
+    such that a file that is overwritten by a new simulation gets a new reader.
+    They are also cached under the cache_version of the SQLiteReader such that
+    components of a different version never use each other's readers.
+    The least recently used readers are dropped once the estimated memory of
+    all cached values exceeds SQL_CACHE_MB. The reader that is returned
+    is bounded by the memory that the other readers leave, such that a single
+    large file cannot grow the cache beyond SQL_CACHE_MB either.
+    """
+    stat = os.stat(file_path)
+    key = (os.path.normcase(os.path.abspath(file_path)), stat.st_mtime, stat.st_size,
+           SQLiteReader.cache_version)
+    readers = sticky.setdefault('hb_sql_readers', [])  # most recently used last
+    reader = None
+    for entry in list(readers):
+        if entry[0] == key:
+            reader = entry[1]
+            readers.remove(entry)
+        elif entry[0][0] == key[0]:  # the file or the reader version has changed
+            readers.remove(entry)
+    if reader is None:
+        reader = SQLiteReader(file_path)
+
+    max_size = SQL_CACHE_MB * 1048576
+    while len(readers) != 0 and \
+            reader.size + sum(r.size for _, r in readers) > max_size:
+        readers.pop(0)
+    reader.max_size = max_size - sum(r.size for _, r in readers)
+    reader.trim(reader.max_size)
+    readers.append((key, reader))
+    return reader
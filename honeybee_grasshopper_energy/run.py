@@ -0,0 +1,220 @@
+# coding=utf-8
+"""Functions for running simulations from the components."""
+from __future__ import division
+
+import os
+import io
+import re
+import time
+import hashlib
+
+from honeybee_energy.run import prepare_idf_for_simulation
+from honeybee_energy.config import folders as energy_folders
+
+# the index of the file name field in each object that references an external file
+SCHEDULE_FILE_FIELDS = {'schedule:file': 3, 'schedule:file:shading': 1}
+
+
+def schedule_files(idf_lines, directory):
+    """Get the paths to the CSV files referenced by the Schedule:File objects of an IDF.
+
+    Args:
+        idf_lines: An iterable of the lines of IDF text (eg. an open IDF file).
+        directory: The folder against which relative file names are resolved,
+            which is typically the folder of the IDF.
+
+    Returns:
+        A list of the paths to the referenced files in the order that they
+        appear in the IDF. Paths are included even if there is no file there.
+    """
+    files, obj_text, file_field = [], '', None
+    for line in idf_lines:
+        text = line.split('!', 1)[0]
+        if file_field is None:  # only collect the text of schedule objects
+            obj_class = text.split(',', 1)[0].strip().lower()
+            if obj_class not in SCHEDULE_FILE_FIELDS:
+                continue
+            file_field, obj_text = SCHEDULE_FILE_FIELDS[obj_class], ''
+        obj_text += text
+        if ';' in obj_text:
+            fields = [field.strip() for field in obj_text.split(';', 1)[0].split(',')]
+            if len(fields) > file_field and fields[file_field] != '':
+                f_path = fields[file_field]
+                if not os.path.isabs(f_path):
+                    f_path = os.path.join(directory, f_path)
+                files.append(os.path.normpath(f_path))
+            file_field = None
+    return files
+
+
+def input_files(file_paths):
+    """Get a list of input files along with all files that their IDFs reference.
+
+    Args:
+        file_paths: A list of paths to the input files of a simulation. The
+            Schedule:File objects of any IDF in the list are followed to the
+            CSV files that they reference.
+    """
+    all_files = []
+    for f_path in file_paths:
+        all_files.append(f_path)
+        if f_path.lower().endswith('.idf'):
+            with io.open(f_path, encoding='utf-8', errors='ignore') as idf_file:
+                all_files.extend(schedule_files(idf_file, os.path.dirname(f_path)))
+    return all_files
+
+
+def files_hash(file_paths, extra=''):
+    """Get a hash that uniquely identifies the contents of a list of files.
+
+    Args:
+        file_paths: A list of paths to files. The Schedule:File objects of any
+            IDF in the list are followed such that the contents of the CSV files
+            that they reference are also part of the hash.
+        extra: Optional text that should also change the hash (eg. the value
+            of other inputs to the simulation).
+    """
+    input_hash = hashlib.md5(extra.encode('utf-8'))
+    for f_path in input_files(file_paths):
+        if not os.path.isfile(f_path):  # a missing file is part of the hash
+            input_hash.update('missing {}'.format(f_path).encode('utf-8'))
+            continue
+        with open(f_path, 'rb') as input_file:
+            for chunk in iter(lambda: input_file.read(1048576), b''):
+                input_hash.update(chunk)
+    return input_hash.hexdigest()
+
+
+def result_files(directory):
+    """Get the sql, zsz, rdd, html and err files from a simulation folder.
+
+    Each file is None if it does not exist in the directory.
+    """
+    files = []
+    for f_name in ('eplusout.sql', 'epluszsz.csv', 'eplusout.rdd',
+                   'eplusout.html', 'eplusout.err'):
+        f_path = os.path.join(directory, f_name)
+        files.append(f_path if os.path.isfile(f_path) else None)
+    return files
+
+
+def energyplus_process(executable, directory):
+    """Start an executable of EnergyPlus in a directory with its output redirected."""
+    from System.Diagnostics import Process, ProcessStartInfo
+    info = ProcessStartInfo(os.path.join(energy_folders.energyplus_path, executable))
+    info.WorkingDirectory = directory
+    info.UseShellExecute = False
+    info.RedirectStandardOutput = True
+    info.CreateNoWindow = True
+    return Process.Start(info)
+
+
+def new_err_lines(err_file, position):
+    """Get the complete lines written to an .err file after a position in the file."""
+    if not os.path.isfile(err_file):
+        return [], position
+    with open(err_file, 'rb') as err:  # binary so that positions are in bytes
+        err.seek(position)
+        lines = err.readlines()
+        if len(lines) != 0 and not lines[-1].endswith(b'\n'):
+            lines.pop(-1)  # the line is still being written
+        position += sum(len(line) for line in lines)
+        return [line.decode('utf-8', 'ignore') for line in lines], position
+
+
+def monitored_run_idf(idf, epw_file, abort_patterns=None, progress=None,
+                      progress_interval=1, expand_objects=True):
+    """Run an IDF through EnergyPlus while tailing its output and .err file.
+
+    This runs the same steps as honeybee_energy.run.run_idf, which gives no
+    access to EnergyPlus while it runs. The folder is prepared with
+    prepare_idf_for_simulation, any HVAC Template objects are expanded with
+    ExpandObjects and the expanded IDF is run with the EnergyPlus executable
+    of the operating system (EnergyPlus on Windows and energyplus elsewhere).
+
+    Args:
+        idf: Path to the IDF file to be simulated.
+        epw_file: Path to the EPW file to be used in the simulation.
+        abort_patterns: An optional list of regular expressions. EnergyPlus will
+            be stopped as soon as any of them matches a line of its output or
+            a line of the .err file.
+        progress: An optional function to be called with the environment and the
+            simulated day as the simulation moves forward.
+        progress_interval: The minimum number of seconds between two calls of
+            the progress function, apart from the first call of each new
+            environment. (Default: 1).
+        expand_objects: If True, any HVAC Template objects in the IDF are
+            expanded before the simulation. (Default: True).
+
+    Returns:
+        A tuple with eight elements
+
+        -   sql, zsz, rdd, html, err -- Paths to the simulation output files.
+
+        -   last_progress -- A tuple with the last environment and simulated day
+            of the simulation.
+
+        -   abort_line -- The line that matched one of the abort_patterns. This
+            will be None if the simulation was not stopped.
+
+        -   process_stats -- A tuple with the CPU time of EnergyPlus in seconds
+            and its peak working set memory in MB.
+    """
+    # prepare the directory and expand any HVAC Template objects
+    directory = prepare_idf_for_simulation(idf, epw_file)
+    if expand_objects:
+        expand = energyplus_process('ExpandObjects', directory)
+        expand.StandardOutput.ReadToEnd()  # read all output so that it never blocks
+        expand.WaitForExit()
+        expanded_idf = os.path.join(directory, 'expanded.idf')
+        if os.path.isfile(expanded_idf):
+            os.remove(os.path.join(directory, 'in.idf'))
+            os.rename(expanded_idf, os.path.join(directory, 'in.idf'))
+
+    # run EnergyPlus and check each new line of output for progress and errors
+    patterns = [re.compile(pat) for pat in abort_patterns] if abort_patterns else []
+    err_file = os.path.join(directory, 'eplusout.err')
+    err_position, environment, day, abort_line = 0, None, None, None
+    last_call, peak_memory = 0, 0
+    process = energyplus_process(
+        'EnergyPlus' if os.name == 'nt' else 'energyplus', directory)
+    line = process.StandardOutput.ReadLine()
+    while line is not None:
+        if line.strip().startswith(('Starting Simulation', 'Continuing Simulation')):
+            day_env = line.split(' at ', 1)[-1].split(' for ', 1)
+            new_env = day_env[-1].strip() != environment
+            day, environment = day_env[0].strip(), day_env[-1].strip()
+            if new_env or time.time() - last_call >= progress_interval:
+                last_call = time.time()
+                peak_memory = max(peak_memory, process_peak_memory(process))
+                if progress is not None:
+                    progress(environment, day)
+        elif line.strip().startswith('Warming up'):
+            day = 'Warmup'
+        err_lines, err_position = new_err_lines(err_file, err_position)
+        for out_line in [line] + err_lines:
+            if any(pat.search(out_line) for pat in patterns):
+                abort_line = out_line.strip()
+        if abort_line is not None:
+            process.Kill()
+            break
+        line = process.StandardOutput.ReadLine()
+    peak_memory = max(peak_memory, process_peak_memory(process))
+    process.WaitForExit()
+    cpu_time = process.TotalProcessorTime.TotalSeconds
+
+    sql, zsz, rdd, html, err = result_files(directory)
+    return sql, zsz, rdd, html, err, (environment, day), abort_line, \
+        (cpu_time, peak_memory)
+
+
+def process_peak_memory(process):
+    """Get the peak working set of a running .NET Process in MB.
+
+    This is 0 once the process has exited.
+    """
+    try:
+        process.Refresh()
+        return process.PeakWorkingSet64 / 1048576.
+    except Exception:  # the process has exited
+        return 0
@@ -0,0 +1,158 @@
+# coding=utf-8
+"""Reuse of the sunlit fractions of the exterior shading calculation.
+
+The sunlit fractions that EnergyPlus exports to eplusshading.csv are stored
+under a hash of the inputs that affect them such that later runs of a Model
+with the same shading geometry can schedule them instead of calculating them.
+"""
+from honeybee.boundarycondition import Outdoors
+
+from honeybee_energy.writer import generate_idf_string
+
+from honeybee_grasshopper_energy.writer import content_hash
+
+
+# the calculation methods of the ShadowCalculation in EnergyPlus 9.2 and earlier
+LEGACY_SHADOW_METHODS = ('AverageOverDaysInFrequency', 'TimestepFrequency')
+# the ShadowCalculation fields up to the export of results with their defaults
+LEGACY_SHADOW_FIELDS = (
+    ('calculation method', 'AverageOverDaysInFrequency'),
+    ('calculation frequency', 20),
+    ('maximum figures', 15000),
+    ('polygon clipping algorithm', 'SutherlandHodgman'),
+    ('sky diffuse modeling algorithm', 'SimpleSkyDiffuseModeling'),
+    ('external shading calculation method', 'InternalCalculation'),
+    ('output external shading calculation results', 'No'))
+SHADOW_FIELDS = (
+    ('calculation method', 'PolygonClipping'),
+    ('calculation update method', 'Periodic'),
+    ('calculation frequency', 20),
+    ('maximum figures', 15000),
+    ('polygon clipping algorithm', 'SutherlandHodgman'),
+    ('pixel counting resolution', 512),
+    ('sky diffuse modeling algorithm', 'SimpleSkyDiffuseModeling'),
+    ('output external shading calculation results', 'No'))
+
+
+def shading_hash(model, sim_par, epw_file):
+    """Get a hash of all inputs that affect the sunlit fractions of a Model.
+
+    This includes the identifiers, boundary conditions and geometry of all
+    Faces, Apertures and Doors, all Shades, the location of the EPW file, the
+    ShadowCalculation, the timestep and whether the run period is a leap year.
+    """
+    geometry = []
+    for room in model.rooms:
+        geometry.append([shade.to_dict(abridged=True) for shade in room.shades])
+        for face in room.faces:
+            geometry.append((face.identifier, face.boundary_condition.name,
+                             face.geometry.to_dict()))
+            geometry.append([shade.to_dict(abridged=True) for shade in face.shades])
+            for sub_f in face.apertures + face.doors:
+                geometry.append((sub_f.identifier, sub_f.geometry.to_dict()))
+                geometry.append([shade.to_dict(abridged=True) for shade in sub_f.shades])
+    with open(epw_file) as epw:
+        location = epw.readline().strip()
+    return content_hash({
+        'units': model.units,
+        'geometry': geometry,
+        'shades': [shade.to_dict(abridged=True) for shade in model.orphaned_shades],
+        'building': model.properties.energy.building_idf(
+            sim_par.shadow_calculation.solar_distribution),
+        'location': location,
+        'shadow_calculation': sim_par.shadow_calculation.to_dict(),
+        'timestep': sim_par.timestep,
+        'leap_year': sim_par.run_period.is_leap_year
+    })
+
+
+def exterior_surface_names(model):
+    """Get a set of upper case names for the surfaces of a Model that face outdoors."""
+    names = set()
+    for room in model.rooms:
+        for face in room.faces:
+            if isinstance(face.boundary_condition, Outdoors):
+                names.add(face.identifier.upper())
+                for sub_f in face.apertures + face.doors:
+                    names.add(sub_f.identifier.upper())
+    return names
+
+
+def shading_csv_minutes(shading_csv, timestep, leap_year):
+    """Get the minutes per row of an eplusshading.csv with a full year of results.
+
+    This will be None if the file does not contain exactly one year of
+    sunlit fractions at the timestep or at each hour.
+    """
+    with open(shading_csv) as csv_file:
+        row_count = sum(1 for _ in csv_file) - 1  # exclude the header
+    year_hours = 8784 if leap_year else 8760
+    if row_count == year_hours * timestep:
+        return int(60 / timestep)
+    if row_count == year_hours:
+        return 60
+    return None
+
+
+def shadow_calculation_idf(shadow_calc, scheduled):
+    """Get the IDF text of a ShadowCalculation that exports or imports sunlit fractions.
+
+    The fields written by shadow_calc.to_idf() are kept as they are and only
+    the fields of the external shading calculation are changed, such that the
+    text follows the EnergyPlus version that honeybee-energy writes. Fields
+    that are not written by honeybee-energy get their EnergyPlus defaults.
+
+    Args:
+        shadow_calc: The ShadowCalculation of the SimulationParameter.
+        scheduled: Set to True to use the schedules of the SurfaceProperty
+            LocalEnvironment objects as the sunlit fractions of the surfaces.
+            Set to False to calculate the sunlit fractions and write them to
+            an eplusshading.csv file.
+    """
+    lines = shadow_calc.to_idf().split('\n')[1:]
+    values = [line.split('!-')[0].strip().rstrip(',;') for line in lines]
+    comments = [line.split('!-', 1)[-1].strip() for line in lines]
+    if values[0] in LEGACY_SHADOW_METHODS:  # EnergyPlus 9.2 and earlier
+        fields = LEGACY_SHADOW_FIELDS
+        overrides = {5: 'ScheduledShading' if scheduled else 'InternalCalculation'}
+    else:  # the calculation method is the first field in EnergyPlus 9.3 and later
+        fields = SHADOW_FIELDS
+        overrides = {0: 'Scheduled'} if scheduled else {}
+    overrides[len(fields) - 1] = 'No' if scheduled else 'Yes'  # output the results
+    for comment, default in fields[len(values):]:
+        values.append(default)
+        comments.append(comment)
+    for field_i, value in overrides.items():
+        values[field_i] = value
+    return generate_idf_string('ShadowCalculation', values, comments)
+
+
+def scheduled_shading_idf(shading_csv, surface_names, minutes_per_item):
+    """Get IDF strings that assign the columns of an eplusshading.csv to surfaces.
+
+    Args:
+        shading_csv: Path to an eplusshading.csv with a full year of sunlit fractions.
+        surface_names: A set of upper case names for the surfaces that face outdoors.
+        minutes_per_item: The number of minutes of each row in the shading_csv.
+    """
+    with open(shading_csv) as csv_file:
+        header = csv_file.readline().strip().split(',')
+        row_count = sum(1 for _ in csv_file)
+    num_hrs = int(row_count * minutes_per_item / 60)
+    sched_comments = ('schedule name', 'schedule type limits', 'file name',
+                      'column number', 'rows to skip', 'number of hours of data',
+                      'column separator', 'interpolate to timestep', 'minutes per item')
+    env_comments = ('name', 'exterior surface name',
+                    'external shading fraction schedule name')
+    idf_strs = []
+    for col_count, surface in enumerate(header, 1):
+        if surface.upper() not in surface_names:
+            continue
+        sched_id = '{} Sunlit Fraction'.format(surface)
+        idf_strs.append(generate_idf_string(
+            'Schedule:File', (sched_id, '', shading_csv, col_count, 1, num_hrs,
+                              'Comma', 'No', minutes_per_item), sched_comments))
+        idf_strs.append(generate_idf_string(
+            'SurfaceProperty:LocalEnvironment',
+            ('{} Local Environment'.format(surface), surface, sched_id), env_comments))
+    return idf_strs
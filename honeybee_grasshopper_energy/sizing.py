@@ -0,0 +1,109 @@
+# coding=utf-8
+"""Reuse of the HVAC sizing results of previous simulations.
+
+The autosized capacities of the ideal air systems are stored under a hash of
+the inputs that affect sizing such that variants of a Model that only differ
+in their loads or schedules can skip the sizing calculation.
+"""
+import os
+import json
+import sqlite3
+
+from honeybee_grasshopper_energy.writer import content_hash, hard_sized_hvac
+
+
+def sizing_hash(model, sim_par):
+    """Get a hash of the inputs of a Model that affect the sizing of its HVAC.
+
+    This includes the geometry, constructions, HVAC, setpoints, infiltration,
+    ventilation and multipliers of the Rooms along with the context shades, the
+    sizing parameter and the timestep of the simulation. Internal loads and the
+    other schedules are excluded such that variants that only differ in these
+    share the same sizing results.
+    """
+    load_keys = ('program_type', 'people', 'lighting', 'electric_equipment',
+                 'gas_equipment')
+    rooms = []
+    for room in model.rooms:
+        r_dict = room.to_dict(abridged=True)
+        energy_dict = r_dict['properties']['energy']
+        for key in load_keys:
+            energy_dict.pop(key, None)
+        # the envelope loads are resolved since they may come from the program
+        for key in ('setpoint', 'infiltration', 'ventilation'):
+            load = getattr(room.properties.energy, key)
+            energy_dict[key] = load.to_dict() if load is not None else None
+        rooms.append(r_dict)
+    energy_prop = model.properties.energy
+    return content_hash({
+        'units': model.units,
+        'rooms': rooms,
+        'shades': [shade.to_dict(abridged=True) for shade in model.orphaned_shades],
+        'constructions': [constr.to_dict() for constr in energy_prop.constructions],
+        'construction_sets': [c_set.to_dict(abridged=True)
+                              for c_set in energy_prop.construction_sets],
+        'hvacs': [hvac.to_dict(abridged=True) for hvac in energy_prop.hvacs],
+        'sizing_parameter': sim_par.sizing_parameter.to_dict(),
+        'timestep': sim_par.timestep
+    })
+
+
+def hvac_sizes_from_sql(sql):
+    """Get the autosized capacities of all ideal air systems in an SQL result file.
+
+    Returns:
+        A dictionary with upper case zone names as keys and dictionaries of
+        sizes as values, which can be used with hard_sized_hvac.
+    """
+    size_fields = (('Maximum Sensible Heating Capacity', 'max sensible heat capacity'),
+                   ('Maximum Cooling Air Flow Rate', 'max cooling fow rate {m3/s}'),
+                   ('Maximum Total Cooling Capacity', 'max total cooling capacity'))
+    conn = sqlite3.connect(sql)
+    try:
+        c = conn.cursor()
+        c.execute('SELECT CompName, Description, Value FROM ComponentSizes '
+                  'WHERE CompType=?', ('ZoneHVAC:IdealLoadsAirSystem',))
+        comp_sizes = c.fetchall()
+    finally:
+        conn.close()  # ensure connection is always closed
+
+    hvac_sizes = {}
+    for comp_name, description, value in comp_sizes:
+        zone_name = comp_name.upper().replace(' IDEAL LOADS AIR SYSTEM', '')
+        for size_name, comment in size_fields:
+            if size_name in description:
+                hvac_sizes.setdefault(zone_name, {})[comment] = value
+    return hvac_sizes
+
+
+def load_hvac_sizes(size_file, model):
+    """Load the sizes of a previous run if they can replace every Autosize of a Model.
+
+    Args:
+        size_file: Path to a JSON file with the output of hvac_sizes_from_sql.
+        model: The Model into which the sizes will be written.
+
+    Returns:
+        A dictionary of sizes that can be used with hard_sized_hvac. This is
+        None if the size_file does not exist, if it holds no sizes or if any
+        Autosize field of the ideal air systems of the model has no size in
+        it, in which case the sizing calculation has to run again.
+    """
+    if not os.path.isfile(size_file):
+        return None
+    try:
+        with open(size_file) as inf:
+            hvac_sizes = json.load(inf)
+    except ValueError:  # the file was not completely written
+        return None
+    if not hvac_sizes:
+        return None
+    for hvac in model.properties.energy.hvacs:
+        try:
+            hvac_str = hard_sized_hvac(hvac.to_idf(), hvac_sizes)
+        except AttributeError:  # not an ideal air system; it has no sizes in the IDF
+            continue
+        for line in hvac_str.split('\n'):
+            if line.partition('!- ')[0].strip().rstrip(',;').lower() == 'autosize':
+                return None
+    return hvac_sizes
@@ -0,0 +1,316 @@
+# coding=utf-8
+"""Functions to split the run period of a simulation into chunks and merge their results.
+
+The chunks are simulated at the same time and the SQL files of all chunks are
+merged into one SQL file that looks like the result of a single run.
+"""
+import sys
+import shutil
+import sqlite3
+
+from ladybug.dt import Date
+
+# the IntervalType of the Time rows that summarize a whole run period or year
+RUN_PERIOD_INTERVAL = 4
+
+
+def split_run_period(run_period, count, lead_days=7):
+    """Split a RunPeriod into contiguous chunks that each start on the first of a month.
+
+    Every chunk after the first starts its simulation lead_days before its
+    results begin such that the thermal mass of the building has been
+    conditioned by the preceding weather, as it would be in a single run.
+    The run period is split into fewer chunks than the count when it does
+    not have as many months as the count.
+
+    Args:
+        run_period: The RunPeriod to be split.
+        count: The number of chunks into which the run period should be split.
+        lead_days: The number of days that each chunk after the first is
+            simulated before its results begin. (Default: 7).
+
+    Returns:
+        A list with a tuple for each chunk, which contains the RunPeriod to be
+        simulated and the Date on which the results of the chunk begin.
+    """
+    leap_year = run_period.is_leap_year
+    st_date, end_date = run_period.start_date, run_period.end_date
+    starts = [st_date] + [Date(month, 1, leap_year)
+                          for month in range(st_date.month + 1, end_date.month + 1)]
+    count = min(count, len(starts))
+    bounds = [int(round(i * len(starts) / float(count))) for i in range(count)]
+    st_week_day = run_period.DAYS_OF_THE_WEEK.index(run_period.start_day_of_week)
+
+    chunks = []
+    for i, bound in enumerate(bounds):
+        result_start = starts[bound]
+        chunk_end = Date.from_doy(starts[bounds[i + 1]].doy - 1, leap_year) \
+            if i + 1 < count else end_date
+        sim_doy = result_start.doy if i == 0 else max(result_start.doy - lead_days, 1)
+        chunk_period = run_period.duplicate()
+        chunk_period.end_date = chunk_end
+        chunk_period.start_date = Date.from_doy(sim_doy, leap_year)
+        chunk_period.start_day_of_week = run_period.DAYS_OF_THE_WEEK[
+            (st_week_day + sim_doy - st_date.doy) % 7]
+        chunks.append((chunk_period, result_start))
+    return chunks
+
+
+def write_chunk_idf(idf, chunk_idf, prefix, chunk_prefix):
+    """Copy an IDF file while replacing the text at the start of it.
+
+    Args:
+        idf: Path to the IDF file to be copied.
+        chunk_idf: Path to the new IDF file.
+        prefix: The text at the start of the IDF file, which will be replaced.
+        chunk_prefix: The text to be written instead of the prefix.
+    """
+    read_mode = 'rb' if sys.version_info < (3, 0) else 'r'  # match ladybug.futil
+    write_mode = 'wb' if sys.version_info < (3, 0) else 'w'
+    with open(idf, read_mode) as idf_file:
+        assert idf_file.read(len(prefix)) == prefix, \
+            'The start of {} does not match the simulation parameters.'.format(idf)
+        with open(chunk_idf, write_mode, 1048576) as chunk_file:
+            chunk_file.write(chunk_prefix)
+            shutil.copyfileobj(idf_file, chunk_file, 1048576)
+    return chunk_idf
+
+
+def _table_names(cursor):
+    """Get a set of the names of the tables in an SQLite database."""
+    cursor.execute('SELECT name FROM sqlite_master WHERE type=?', ('table',))
+    return set(row[0] for row in cursor.fetchall())
+
+
+def _environments(cursor):
+    """Get the index of the run period environment and a list of all environments."""
+    cursor.execute('SELECT EnvironmentPeriodIndex, EnvironmentName, EnvironmentType '
+                   'FROM EnvironmentPeriods ORDER BY EnvironmentPeriodIndex')
+    envs = cursor.fetchall()
+    run_envs = [env[0] for env in envs if env[2] == 3]  # weather file run period
+    assert len(run_envs) == 1, 'Expected one run period in the SQL file ' \
+        'but found {}.'.format(len(run_envs))
+    return run_envs[0], [env[1:] for env in envs]
+
+
+def stitch_sql(chunk_sqls, chunks, merged_sql):
+    """Merge the run period results of the SQL files of several chunks into one file.
+
+    The SQL of the first chunk is used as the base of the merged file, which
+    keeps its environments along with its design day and sizing results. The
+    timeseries results of the other chunks are appended to it in order from the
+    date on which each chunk begins reporting and their SimulationDays are
+    counted from the start of the whole run period, such that the merged file
+    looks like a single run.
+
+    Results that summarize a whole chunk cannot be merged and they are deleted
+    from the merged file. These are the run period and annual rows of the Time
+    table along with their data and the TabularData of the summary reports.
+
+    Args:
+        chunk_sqls: A list of paths to the SQL files of each chunk in order.
+        chunks: The list of chunks from split_run_period, which contain the
+            RunPeriod simulated by each chunk and the Date on which its
+            results begin.
+        merged_sql: The path to which the merged SQL file will be written.
+    """
+    shutil.copy(chunk_sqls[0], merged_sql)
+    run_start = chunks[0][0].start_date
+    conn = sqlite3.connect(merged_sql)
+    try:
+        c = conn.cursor()
+        tables = _table_names(c)
+        env_index, environments = _environments(c)
+
+        # delete the results that only summarize the first chunk
+        run_period_times = 'SELECT TimeIndex FROM Time WHERE ' \
+            'EnvironmentPeriodIndex=? AND IntervalType>=?'
+        if 'ReportExtendedData' in tables:
+            c.execute('DELETE FROM ReportExtendedData WHERE ReportDataIndex IN ('
+                      'SELECT ReportDataIndex FROM ReportData WHERE TimeIndex IN '
+                      '({}))'.format(run_period_times), (env_index, RUN_PERIOD_INTERVAL))
+        c.execute('DELETE FROM ReportData WHERE TimeIndex IN ({})'.format(
+            run_period_times), (env_index, RUN_PERIOD_INTERVAL))
+        c.execute('DELETE FROM Time WHERE EnvironmentPeriodIndex=? AND '
+                  'IntervalType>=?', (env_index, RUN_PERIOD_INTERVAL))
+        if 'TabularData' in tables:
+            c.execute('DELETE FROM TabularData')
+
+        c.execute('SELECT * FROM ReportDataDictionary')
+        dict_indices = dict((row[1:], row[0]) for row in c.fetchall())
+        c.execute('PRAGMA table_info(Time)')
+        time_cols = [row[1] for row in c.fetchall()]
+        t_i, env_i, month_i, day_i, int_i = (time_cols.index(col) for col in (
+            'TimeIndex', 'EnvironmentPeriodIndex', 'Month', 'Day', 'IntervalType'))
+        warm_i = time_cols.index('WarmupFlag') if 'WarmupFlag' in time_cols else None
+        sim_day_i = time_cols.index('SimulationDays') \
+            if 'SimulationDays' in time_cols else None
+        insert_time = 'INSERT INTO Time ({}) VALUES ({})'.format(
+            ', '.join(time_cols), ', '.join('?' for _ in time_cols))
+        c.execute('SELECT MAX(TimeIndex) FROM Time')
+        next_time = c.fetchone()[0] + 1
+        c.execute('SELECT MAX(ReportDataIndex) FROM ReportData')
+        next_data = (c.fetchone()[0] or 0) + 1
+        extended = 'ReportExtendedData' in tables
+        if extended:  # the minimum and maximum of daily and monthly data
+            c.execute('SELECT MAX(ReportExtendedDataIndex) FROM ReportExtendedData')
+            next_ext = (c.fetchone()[0] or 0) + 1
+
+        for chunk_sql, (chunk_period, start) in zip(chunk_sqls[1:], chunks[1:]):
+            # the days of the chunk are counted from its own simulation start
+            day_shift = chunk_period.start_date.doy - run_start.doy
+            chunk_conn = sqlite3.connect(chunk_sql)
+            try:
+                chunk_c = chunk_conn.cursor()
+                chunk_env, chunk_environments = _environments(chunk_c)
+                assert chunk_environments == environments, 'The environments of ' \
+                    '{} do not match those of {}.'.format(chunk_sql, chunk_sqls[0])
+                chunk_c.execute('SELECT * FROM ReportDataDictionary')
+                chunk_dict = dict((row[0], dict_indices.get(row[1:]))
+                                  for row in chunk_c.fetchall())
+
+                # append the times after the lead-in with new indices
+                chunk_c.execute('SELECT * FROM Time WHERE EnvironmentPeriodIndex=? '
+                                'ORDER BY TimeIndex', (chunk_env,))
+                time_map = {}
+                for row in chunk_c.fetchall():
+                    if row[int_i] >= RUN_PERIOD_INTERVAL or \
+                            (warm_i is not None and row[warm_i]) or \
+                            (row[month_i], row[day_i]) < (start.month, start.day):
+                        continue  # run period totals, warmup or lead-in
+                    new_row = list(row)
+                    new_row[t_i], new_row[env_i] = next_time, env_index
+                    if sim_day_i is not None and row[sim_day_i] is not None:
+                        new_row[sim_day_i] = row[sim_day_i] + day_shift
+                    c.execute(insert_time, new_row)
+                    time_map[row[t_i]] = next_time
+                    next_time += 1
+
+                # append the data of the times in the order they were written
+                chunk_c.execute('SELECT ReportDataIndex, TimeIndex, '
+                                'ReportDataDictionaryIndex, Value '
+                                'FROM ReportData ORDER BY ReportDataIndex')
+                data_rows, data_map = [], {}
+                for row in chunk_c.fetchall():
+                    if row[1] in time_map and chunk_dict[row[2]] is not None:
+                        data_rows.append(
+                            (next_data, time_map[row[1]], chunk_dict[row[2]], row[3]))
+                        data_map[row[0]] = next_data
+                        next_data += 1
+                c.executemany(
+                    'INSERT INTO ReportData (ReportDataIndex, TimeIndex, '
+                    'ReportDataDictionaryIndex, Value) VALUES (?, ?, ?, ?)', data_rows)
+
+                # append the minimum and maximum of the data that has them
+                if extended and 'ReportExtendedData' in _table_names(chunk_c):
+                    chunk_c.execute('SELECT * FROM ReportExtendedData '
+                                    'ORDER BY ReportExtendedDataIndex')
+                    ext_rows = []
+                    for row in chunk_c.fetchall():
+                        if row[1] in data_map:  # ReportDataIndex
+                            ext_rows.append((next_ext, data_map[row[1]]) + row[2:])
+                            next_ext += 1
+                    if len(ext_rows) != 0:
+                        c.executemany('INSERT INTO ReportExtendedData VALUES ({})'.format(
+                            ', '.join('?' for _ in ext_rows[0])), ext_rows)
+            finally:
+                chunk_conn.close()  # ensure connection is always closed
+        conn.commit()
+    finally:
+        conn.close()  # ensure connection is always closed
+    return merged_sql
+
+
+def _run_period_results(sql):
+    """Get the totals and Time rows of the run period environment of an SQL file.
+
+    Returns:
+        A tuple with two items.
+
+        -   totals: A dictionary with (KeyValue, Name, ReportingFrequency) of
+            each output as keys and tuples with the sum and the number of its
+            values as values.
+
+        -   times: A list with the (Month, Day, Hour, Minute, IntervalType,
+            SimulationDays) of each Time row in order.
+    """
+    conn = sqlite3.connect(sql)
+    try:
+        c = conn.cursor()
+        env_index = _environments(c)[0]
+        c.execute(
+            'SELECT d.KeyValue, d.Name, d.ReportingFrequency, SUM(r.Value), '
+            'COUNT(r.Value) FROM ReportData r JOIN ReportDataDictionary d '
+            'ON r.ReportDataDictionaryIndex = d.ReportDataDictionaryIndex '
+            'JOIN Time t ON r.TimeIndex = t.TimeIndex '
+            'WHERE t.EnvironmentPeriodIndex=? AND t.IntervalType < ? '
+            'AND (t.WarmupFlag IS NULL OR t.WarmupFlag=0) '
+            'GROUP BY r.ReportDataDictionaryIndex', (env_index, RUN_PERIOD_INTERVAL))
+        totals = dict((row[:3], row[3:]) for row in c.fetchall())
+        c.execute('SELECT Month, Day, Hour, Minute, IntervalType, SimulationDays '
+                  'FROM Time WHERE EnvironmentPeriodIndex=? AND IntervalType < ? '
+                  'AND (WarmupFlag IS NULL OR WarmupFlag=0) ORDER BY TimeIndex',
+                  (env_index, RUN_PERIOD_INTERVAL))
+        times = c.fetchall()
+    finally:
+        conn.close()  # ensure connection is always closed
+    return totals, times
+
+
+def compare_sql(split_sql, single_sql):
+    """Compare the run period results of each output in a split and a single run.
+
+    Args:
+        split_sql: Path to the SQL file that was merged with stitch_sql.
+        single_sql: Path to the SQL file of a single run of the whole run period.
+
+    Returns:
+        A tuple with six items.
+
+        -   count -- The number of outputs that were compared.
+
+        -   avg_diff -- The average relative difference in the total of each output.
+
+        -   max_diff -- The largest relative difference in the total of an output.
+
+        -   max_output -- Text for the output with the largest relative difference.
+
+        -   mismatched -- A list of text for the outputs of the single run that
+            are missing from the split run or that have a different number
+            of values.
+
+        -   time_mismatch -- The first (Month, Day, Hour, Minute, IntervalType,
+            SimulationDays) of the Time rows that differs between the two runs.
+            This is None if both runs have the same Time rows.
+    """
+    split_totals, split_times = _run_period_results(split_sql)
+    single_totals, single_times = _run_period_results(single_sql)
+
+    diffs, mismatched = [], []
+    for key, (single_total, single_count) in single_totals.items():
+        try:
+            split_total, split_count = split_totals[key]
+        except KeyError:
+            mismatched.append('{} {} ({}) is missing'.format(*key))
+            continue
+        if split_count != single_count:
+            mismatched.append('{} {} ({}) has {} values instead of {}'.format(
+                key[0], key[1], key[2], split_count, single_count))
+            continue
+        diff = abs(split_total - single_total)
+        diffs.append((diff / abs(single_total) if single_total != 0 else diff, key))
+
+    time_mismatch = None
+    for split_time, single_time in zip(split_times, single_times):
+        if split_time != single_time:
+            time_mismatch = split_time
+            break
+    if time_mismatch is None and len(split_times) != len(single_times):
+        time_mismatch = split_times[len(single_times)] \
+            if len(split_times) > len(single_times) else single_times[len(split_times)]
+
+    if len(diffs) == 0:
+        return 0, 0, 0, None, mismatched, time_mismatch
+    max_diff, max_key = max(diffs)
+    return len(diffs), sum(d[0] for d in diffs) / len(diffs), max_diff, \
+        '{} {} ({})'.format(*max_key), mismatched, time_mismatch
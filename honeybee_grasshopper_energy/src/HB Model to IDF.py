@@ -26,6 +26,71 @@ Write a honeybee Model to an IDF file and then run it through EnergyPlus.
         _folder_: An optional folder on your system, into which your IDF and result
             files will be written.  NOTE THAT DIRECTORIES INPUT HERE SHOULD NOT HAVE
             ANY SPACES OR UNDERSCORES IN THE FILE PATH.
+        cache_: An optional number for the maximum size of the simulation cache
+            in gigabytes. When a number is input here, the result files of each
+            EnergyPlus simulation will be stored in a cache folder under a hash
+            of the IDF text, the EPW file and the CSV files of any Schedule:File
+            in the IDF. Any later run with identical files will copy the cached
+            results into the _folder_ without running EnergyPlus again. The
+            least recently used simulations are deleted from the cache whenever
+            it grows beyond this size. If None, no cache will be used and every
+            run will go through EnergyPlus.
+        incremental_: Set to "True" to translate the model incrementally. The IDF
+            text of each Room, schedule, construction and material will be kept
+            in memory under a hash of its properties and only the objects that
+            have changed since the last run of this component will be translated
+            again. This can greatly speed up the translation of large models
+            when only a few objects change between runs. Note that the IDF
+            text of the model is held in memory between runs, which is released
+            when this input is set back to False. Default: False.
+        monitor_: Set to "True" to follow the progress of the EnergyPlus
+            simulation while it runs. The current environment and simulated
+            day will be shown on the Rhino command prompt, which is updated
+            about once a second. The report will also include the CPU time and
+            peak memory of EnergyPlus. Default: False.
+        abort_: An optional list of text patterns (regular expressions) to stop
+            EnergyPlus as soon as any of them appears in the .err file or the
+            EnergyPlus output. For example, "[*][*] Severe" will stop the
+            simulation at the first severe error, instead of letting it run
+            until the end of the run period. Connecting any patterns here will
+            also follow the progress of the simulation as with monitor_.
+        split_: An optional integer greater than 1 to split the run period into
+            this number of chunks, which are simulated at the same time on
+            different CPU cores. The chunks start on the first day of a month and
+            each chunk after the first begins its simulation one week before its
+            results such that the building is conditioned by the preceding
+            weather. The results of all chunks are merged into a single sql
+            file that can be used with all of the components that read results.
+            The sizing results and the zsz, rdd and err files come from the
+            first chunk. The summary reports only cover a single chunk, so the
+            html is None and the TabularData and the run period totals are
+            removed from the merged sql file. Progress is not shown for split
+            runs and Annual reporting frequencies are not supported. If None,
+            the run period will be simulated in a single run.
+        reuse_sizing_: Set to "True" to reuse the HVAC sizing results of previous
+            runs. The autosized capacities of the ideal air systems from each
+            run will be stored in the simulation folder under a hash of the
+            inputs that affect sizing (geometry, constructions, HVAC, setpoints,
+            infiltration, ventilation, timestep and design days). Any later run
+            with the same hash will have these capacities written into the IDF
+            and will skip the sizing calculation, such that variants that only
+            differ in their internal loads or schedules do not repeat it. Note
+            that the sizes will not respond to changes in the internal loads and
+            no zsz file is produced for runs that reuse sizing results.
+            Default: False.
+        shade_cache_: Set to "True" to reuse the sunlit fractions of the exterior
+            shading calculation across runs. The sunlit fractions that EnergyPlus
+            calculates for each outdoor surface over a full year run will be
+            stored in the simulation folder under a hash of the geometry of the
+            model and shades, the site and the shadow calculation settings. Any
+            later run with the same hash will import these as schedules instead
+            of calculating the shading again. Only runs over a whole year are
+            stored. Default: False.
+        check_split_: Set to "True" to also run the whole run period as a single
+            simulation after a split_ run. The time of both runs and the
+            difference in the totals of each output will be written to the
+            report such that the accuracy of the split run can be checked.
+            Default: False.
         _write: Set to "True" to translate the model to an IDF file.
             The file path of the resulting file will appear in the idf output of
             this component.  Note that only setting this to "True" and not setting
@@ -34,7 +99,12 @@ Write a honeybee Model to an IDF file and then run it through EnergyPlus.
             This will ensure that result files appear in their respective outputs.
     
     Returns:
-        report: Check here to see a report of the EnergyPlus run.
+        report: Check here to see a report of the EnergyPlus run. This includes the
+            wall time, CPU time and change in memory of each stage of the solve
+            in Rhino, which are also appended to a simulation_timing.jsonl file
+            in the _folder_ such that they can be compared across runs. The CPU
+            time and peak memory of EnergyPlus are only included when monitor_
+            or abort_ is used.
         idf: The file path of the IDF file that has been generated on your machine.
         sql: The file path of the SQL result file that has been generated on your
             machine. This will be None unless run_ is set to True.
@@ -53,15 +123,22 @@ Write a honeybee Model to an IDF file and then run it through EnergyPlus.
 
 ghenv.Component.Name = "HB Model to IDF"
 ghenv.Component.NickName = 'ModelToIDF'
-ghenv.Component.Message = '0.5.4'
+ghenv.Component.Message = '0.6.15'
 ghenv.Component.Category = 'HB-Energy'
 ghenv.Component.SubCategory = '5 :: Simulate'
 ghenv.Component.AdditionalHelpFromDocStrings = "1"
 
 import os
+import json
+import shutil
+import time
+import itertools
+import scriptcontext as sc
+import Rhino
+import System.Threading.Tasks as tasks
 
 try:
-    from ladybug.futil import write_to_file_by_name, nukedir
+    from ladybug.futil import preparedir, nukedir, write_to_file
 except ImportError as e:
     raise ImportError('\nFailed to import ladybug:\n\t{}'.format(e))
 
@@ -79,21 +156,106 @@ try:
 except ImportError as e:
     raise ImportError('\nFailed to import honeybee_energy:\n\t{}'.format(e))
 
+try:
+    from honeybee_grasshopper_energy.timer import StageTimer
+    from honeybee_grasshopper_energy.designday import design_days_from_ddy
+    from honeybee_grasshopper_energy.preflight import preflight_index, \
+        orphaned_warning
+    from honeybee_grasshopper_energy.parallel import physical_cores
+    from honeybee_grasshopper_energy.run import monitored_run_idf
+    from honeybee_grasshopper_energy.sizing import sizing_hash, \
+        hvac_sizes_from_sql, load_hvac_sizes
+    from honeybee_grasshopper_energy.splitrun import split_run_period, \
+        write_chunk_idf, stitch_sql, compare_sql
+    from honeybee_grasshopper_energy.shading import shading_hash, \
+        exterior_surface_names, shading_csv_minutes, shadow_calculation_idf, \
+        scheduled_shading_idf
+    from honeybee_grasshopper_energy.cache import simulation_hash, cache_results, \
+        restore_results, evict_cache
+    from honeybee_grasshopper_energy.writer import model_to_idf_objects, write_idf
+except ImportError as e:
+    raise ImportError('\nFailed to import honeybee_grasshopper_energy:\n\t{}'.format(e))
+
 try:
     from ladybug_rhino.grasshopper import all_required_inputs, give_warning
 except ImportError as e:
     raise ImportError('\nFailed to import ladybug_rhino:\n\t{}'.format(e))
 
 
-def orphaned_warning(object_type):
-    """Generate an error message for orphaned Faces, Apertures, or Doors."""
-    return 'Input _model contains orphaned {}s. These are not permitted in ' \
-        'Models for energy simulation.\nIf you have geometry that is not a ' \
-        'part of a Room boundary that you want included in the energy simulation, ' \
-        'it should be added as shades.'.format(object_type)
+def show_progress(environment, day):
+    """Write the progress of the simulation to the Rhino command prompt.
+
+    The Rhino message loop is never pumped from here since that could start
+    another solution of Grasshopper while this component is still solving.
+    """
+    Rhino.RhinoApp.SetCommandPrompt('EnergyPlus: {} - {}'.format(environment, day))
+
+
+def run_split_idf(idf, epw_file, prefix, run_period, chunks, abort_patterns=None):
+    """Run an IDF as chunks of its run period in parallel and merge the results.
+
+    Args:
+        idf: Path to an IDF file that starts with the prefix.
+        epw_file: Path to the EPW file to be used in the simulation.
+        prefix: The text at the start of the IDF with the EnergyPlus version and
+            the simulation parameters, which contains the IDF text of the run_period.
+        run_period: The RunPeriod that was written into the IDF.
+        chunks: The list of chunks of the run_period from split_run_period.
+        abort_patterns: An optional list of regular expressions to stop the
+            simulation of a chunk as soon as any of them matches its output.
+
+    Returns:
+        A tuple with seven elements
+
+        -   sql, zsz, rdd, html, err -- The sql is the merged SQL of all chunks
+            and the zsz, rdd and err are those of the first chunk. The sql will
+            be None if any of the chunks failed or was stopped. The html is
+            always None since the summary reports only cover a single chunk.
+
+        -   chunk_errs -- A list of the .err files of the other chunks.
+
+        -   abort_line -- The first line that matched one of the abort_patterns.
+    """
+    # write an IDF for each chunk into its own folder
+    split_dir = os.path.join(os.path.dirname(idf), 'split')
+    nukedir(split_dir, True)
+    run_period_str = run_period.to_idf()[0]
+    chunk_idfs = []
+    for i, (chunk_period, _) in enumerate(chunks):
+        chunk_prefix = prefix.replace(run_period_str, chunk_period.to_idf()[0], 1)
+        chunk_dir = os.path.join(split_dir, 'chunk_{}'.format(i))
+        preparedir(chunk_dir)
+        chunk_idfs.append(write_chunk_idf(
+            idf, os.path.join(chunk_dir, 'in.idf'), prefix, chunk_prefix))
+
+    # run all of the chunks through EnergyPlus at the same time
+    results = [None] * len(chunks)
+
+    def run_chunk(i):
+        if abort_patterns:
+            results[i] = monitored_run_idf(chunk_idfs[i], epw_file, abort_patterns)
+        else:
+            results[i] = tuple(run_idf(chunk_idfs[i], epw_file)) + (None, None, None)
+
+    options = tasks.ParallelOptions()
+    options.MaxDegreeOfParallelism = min(len(chunks), physical_cores())
+    tasks.Parallel.ForEach(range(len(chunks)), options, run_chunk)
+
+    # merge the results of the chunks
+    abort_lines = [res[6] for res in results if res[6] is not None]
+    abort_line = abort_lines[0] if len(abort_lines) != 0 else None
+    chunk_sqls = [res[0] for res in results]
+    sql = None
+    if abort_line is None and all(chunk_sqls):
+        sql = stitch_sql(chunk_sqls, chunks, os.path.join(split_dir, 'eplusout.sql'))
+    zsz, rdd, err = results[0][1], results[0][2], results[0][4]
+    return sql, zsz, rdd, None, err, [res[4] for res in results[1:]], abort_line
 
 
 if all_required_inputs(ghenv.Component) and _write:
+    timer = StageTimer(ghenv.Component.Name, ghenv.Component.Message)
+    timer.start('design days')
+
     # process the simulation parameters
     if _sim_par_ is None:
         _sim_par_ = SimulationParameter()
@@ -104,7 +266,8 @@ if all_required_inputs(ghenv.Component) and _write:
         folder, epw_file_name = os.path.split(_epw_file)
         ddy_file = os.path.join(folder, epw_file_name.replace('.epw', '.ddy'))
         if os.path.isfile(ddy_file):
-            _sim_par_.sizing_parameter.add_from_ddy_996_004(ddy_file)
+            for dday in design_days_from_ddy(ddy_file):
+                _sim_par_.sizing_parameter.add_design_day(dday)
         else:
             raise ValueError('No _ddy_file_ has been input and no .ddy file was '
                              'found next to the _epw_file.')
@@ -117,32 +280,181 @@ if all_required_inputs(ghenv.Component) and _write:
     directory = os.path.join(_folder_, _model.identifier, 'EnergyPlus')
     sch_directory = os.path.join(directory, 'schedules')
     
-    # check the model to be sure there are no orphaned faces, apertures, or doors
-    assert len(_model.orphaned_faces) == 0, orphaned_warning('Face')
-    assert len(_model.orphaned_apertures) == 0, orphaned_warning('Aperture')
-    assert len(_model.orphaned_doors) == 0, orphaned_warning('Door')
+    # check the model to be sure that it can be simulated
+    timer.start('validation')
+    index = preflight_index(_model)
+    assert len(index['orphaned_faces']) == 0, orphaned_warning('Face')
+    assert len(index['orphaned_apertures']) == 0, orphaned_warning('Aperture')
+    assert len(index['orphaned_doors']) == 0, orphaned_warning('Door')
+    assert len(index['duplicate_identifiers']) == 0, 'Input _model contains ' \
+        'objects with duplicate identifiers:\n{}'.format(
+            '\n'.join(index['duplicate_identifiers']))
+    for obj_name in index['zero_area']:
+        give_warning(ghenv.Component, '{} has no area.'.format(obj_name))
+    print('Model contains {}.'.format(', '.join(
+        '{} {}s'.format(index['counts'][obj_type], obj_type)
+        for obj_type in ('Room', 'Face', 'Aperture', 'Door', 'Shade'))))
+    
+    # delete any existing files in the directory and prepare it for the IDF
+    preparedir(directory)
+    
+    # load the sizing results of a model with the same sizing inputs
+    timer.start('cache lookup')
+    hvac_sizes, size_file = None, None
+    if reuse_sizing_:
+        size_folder = os.path.join(folders.default_simulation_folder, 'sizing')
+        size_file = os.path.join(
+            size_folder, '{}.json'.format(sizing_hash(_model, _sim_par_)))
+        hvac_sizes = load_hvac_sizes(size_file, _model)
+        if hvac_sizes is not None:
+            _sim_par_ = _sim_par_.duplicate()  # duplicate to avoid mutating the input
+            sim_control = _sim_par_.simulation_control
+            sim_control.do_zone_sizing = False
+            sim_control.do_system_sizing = False
+            sim_control.do_plant_sizing = False
+            sim_control.run_for_sizing_periods = False
+            print('Sizing results reused from {}.'.format(size_file))
+    
+    # load the sunlit fractions of a model with the same shading geometry
+    shade_strs, shade_file = [], None
+    if shade_cache_:
+        shade_folder = os.path.join(folders.default_simulation_folder, 'shadecache')
+        shade_file = os.path.join(shade_folder, '{}.csv'.format(
+            shading_hash(_model, _sim_par_, _epw_file)))
+        if os.path.isfile(shade_file):
+            minutes = shading_csv_minutes(shade_file, _sim_par_.timestep,
+                                          _sim_par_.run_period.is_leap_year)
+            shade_strs = scheduled_shading_idf(
+                shade_file, exterior_surface_names(_model), minutes)
+            print('Sunlit fractions reused from {}.'.format(shade_file))
     
     # create the strings for simulation paramters and model
     ver_str = energyplus_idf_version() if energy_folders.energyplus_version \
         is not None else energyplus_idf_version((9, 2, 0))
     sim_par_str = _sim_par_.to_idf()
-    model_str = _model.to.idf(_model, schedule_directory=sch_directory,
-                              solar_distribution=_sim_par_.shadow_calculation.solar_distribution)
-    idf_str = '\n\n'.join([ver_str, sim_par_str, model_str, add_str])
+    if shade_file is not None:  # export or import the sunlit fractions
+        sim_par_str = sim_par_str.replace(
+            _sim_par_.shadow_calculation.to_idf(),
+            shadow_calculation_idf(_sim_par_.shadow_calculation, len(shade_strs) != 0))
+    solar_dist = _sim_par_.shadow_calculation.solar_distribution
+    fragments, used_fragments = None, None
+    cache_key = 'hb_idf_fragments_{}'.format(ghenv.Component.InstanceGuid)
+    if incremental_:  # only translate the objects that changed since the last run
+        fragments, used_fragments = sc.sticky.get(cache_key, {}), {}
+    else:  # release the IDF text of any earlier incremental run
+        sc.sticky.pop(cache_key, None)
+    model_strs = model_to_idf_objects(_model, sch_directory, solar_dist,
+                                      fragments, used_fragments, hvac_sizes)
     
-    # delete any existing files in the directory
-    nukedir(directory)
-    
-    # write the final string into an IDF.
+    # stream all of the strings into an IDF
+    timer.start('write')
     idf = os.path.join(directory, 'in.idf')
-    write_to_file_by_name(directory, 'in.idf', idf_str, True)
+    idf_strs = itertools.chain((ver_str, sim_par_str),
+                               timer.timed('translation', model_strs), shade_strs,
+                               (add_str,))
+    write_idf(idf, idf_strs)
+    if incremental_:
+        sc.sticky[cache_key] = used_fragments
     
     if run_:
-        sql, zsz, rdd, html, err = run_idf(idf, _epw_file)
-        if err is not None:
-            err_obj = Err(err)
-            print(err_obj.file_contents)
-            for warn in err_obj.severe_errors:
-                give_warning(ghenv.Component, warn)
-            for error in err_obj.fatal_errors:
-                raise Exception(error)
+        split = split_ is not None and split_ > 1
+        if split:
+            assert _sim_par_.output.reporting_frequency != 'Annual', \
+                'Annual reporting frequencies are not supported for split_ runs.'
+
+        # check whether an identical simulation is already in the cache
+        sim_dir = None
+        if cache_:
+            cache_folder = os.path.join(folders.default_simulation_folder, 'simcache')
+            sim_hash = simulation_hash(idf, _epw_file)
+            if split:  # the merged results differ slightly from a single run
+                sim_hash = '{}_split{}'.format(sim_hash, split_)
+            sim_dir = os.path.join(cache_folder, sim_hash)
+        cache_hit = sim_dir is not None and os.path.isdir(sim_dir)
+        abort_line, chunk_errs = None, []
+
+        # get the results from the cache or run the IDF through EnergyPlus
+        timer.start('energyplus')
+        if cache_hit:
+            sql, zsz, rdd, html, err = restore_results(sim_dir, directory)
+        elif split:
+            split_start = time.time()
+            prefix = '{}\n\n{}\n\n'.format(ver_str, sim_par_str)
+            chunks = split_run_period(_sim_par_.run_period, split_)
+            if len(chunks) < split_:
+                give_warning(ghenv.Component, 'The run period only has {} months '
+                             'and each chunk starts on the first of a month, so it '
+                             'was split into {} chunks instead of {}.'.format(
+                                 len(chunks), len(chunks), split_))
+            sql, zsz, rdd, html, err, chunk_errs, abort_line = run_split_idf(
+                idf, _epw_file, prefix, _sim_par_.run_period, chunks, abort_)
+            split_time = time.time() - split_start
+            print('Split run of {} chunks in {:.1f} seconds.'.format(
+                len(chunk_errs) + 1, split_time))
+        elif monitor_ or abort_:
+            sql, zsz, rdd, html, err, _, abort_line, process_stats = \
+                monitored_run_idf(idf, _epw_file, abort_, show_progress)
+            timer.external('energyplus', *process_stats)
+        else:
+            sql, zsz, rdd, html, err = run_idf(idf, _epw_file)
+        timer.start('err parsing')
+        for err_file in [err] + chunk_errs:
+            if err_file is not None:
+                err_obj = Err(err_file)
+                print(err_obj.file_contents)
+                for warn in err_obj.severe_errors:
+                    give_warning(ghenv.Component, warn)
+                for error in err_obj.fatal_errors:
+                    raise Exception(error)
+        if abort_line is not None:
+            raise Exception('EnergyPlus was stopped because the following line '
+                            'matched the abort_ patterns:\n{}'.format(abort_line))
+
+        # store the sizing results so that they can be used by later runs
+        timer.start('result caching')
+        if size_file is not None and hvac_sizes is None and sql is not None:
+            new_sizes = hvac_sizes_from_sql(sql)
+            if len(new_sizes) != 0:  # an empty file would never skip the sizing
+                preparedir(os.path.dirname(size_file), False)
+                write_to_file(size_file, json.dumps(new_sizes))
+
+        # store the sunlit fractions so that they can be used by later runs
+        if shade_file is not None and len(shade_strs) == 0 and err is not None:
+            shading_csv = os.path.join(os.path.dirname(err), 'eplusshading.csv')
+            if os.path.isfile(shading_csv) and shading_csv_minutes(
+                    shading_csv, _sim_par_.timestep, _sim_par_.run_period.is_leap_year):
+                preparedir(shade_folder, False)
+                shutil.copy(shading_csv, shade_file)
+
+        # compare the split run to a single run of the whole run period
+        if split and check_split_ and not cache_hit and sql is not None:
+            timer.start('split check')
+            single_start = time.time()
+            single_sql = run_idf(idf, _epw_file)[0]
+            single_time = time.time() - single_start
+            print('Single run in {:.1f} seconds. The split run was {:.1f} times '
+                  'faster.'.format(single_time, single_time / split_time))
+            if single_sql is not None:
+                count, avg_diff, max_diff, max_output, mismatched, time_mismatch = \
+                    compare_sql(sql, single_sql)
+                print('Difference in the run period totals of {} outputs: {:.3f}% '
+                      'on average and {:.3f}% at most for {}.'.format(
+                          count, avg_diff * 100, max_diff * 100, max_output))
+                for output in mismatched:
+                    give_warning(ghenv.Component, 'Split run output {}.'.format(output))
+                if time_mismatch is not None:
+                    give_warning(ghenv.Component, 'The time steps of the split run '
+                                 'differ from the single run at (month, day, hour, '
+                                 'minute, interval, day of simulation) {}.'.format(
+                                     time_mismatch))
+
+        # store the results in the cache and remove any old simulations
+        if sim_dir is not None and not cache_hit and sql is not None:
+            timer.start('result caching')
+            cache_results(sim_dir, (sql, zsz, rdd, html, err))
+            evict_cache(cache_folder, cache_ * 1e9)
+
+    # report the time of each stage and log it in the simulation folder
+    timer.stop()
+    timer.report()
+    timer.write_log(_folder_, model=_model.identifier)
@@ -40,7 +40,11 @@ to an IDF file and then run through EnergyPlus.
             EnergyPlus.
     
     Returns:
-        report: Check here to see a report of the EnergyPlus run.
+        report: Check here to see a report of the EnergyPlus run. This includes the
+            wall time, CPU time and change in memory of each stage of the solve
+            in Rhino, which are also appended to a simulation_timing.jsonl file
+            in the _folder_ such that they can be compared across runs. The CPU
+            time and memory of OpenStudio and EnergyPlus are not included.
         jsons: The file paths to the honeybee JSON files that describe the Model and
             SimulationParameter. These will be translated to an OpenStudio
             model using the honeybee energy_model_measure.
@@ -68,7 +72,7 @@ to an IDF file and then run through EnergyPlus.
 
 ghenv.Component.Name = "HB Model to OSM"
 ghenv.Component.NickName = 'ModelToOSM'
-ghenv.Component.Message = '0.4.4'
+ghenv.Component.Message = '0.4.12'
 ghenv.Component.Category = 'HB-Energy'
 ghenv.Component.SubCategory = '5 :: Simulate'
 ghenv.Component.AdditionalHelpFromDocStrings = "1"
@@ -95,21 +99,143 @@ try:
 except ImportError as e:
     raise ImportError('\nFailed to import honeybee_energy:\n\t{}'.format(e))
 
+try:
+    from honeybee_grasshopper_energy.timer import StageTimer
+    from honeybee_grasshopper_energy.designday import design_days_from_ddy
+    from honeybee_grasshopper_energy.preflight import preflight_index, \
+        orphaned_warning
+except ImportError as e:
+    raise ImportError('\nFailed to import honeybee_grasshopper_energy:\n\t{}'.format(e))
+
 try:
     from ladybug_rhino.grasshopper import all_required_inputs, give_warning
 except ImportError as e:
     raise ImportError('\nFailed to import ladybug_rhino:\n\t{}'.format(e))
 
 
-def orphaned_warning(object_type):
-    """Generate an error message for orphaned Faces, Apertures, or Doors."""
-    return 'Input _model contains orphaned {}s. These are not permitted in ' \
-        'Models for energy simulation.\nIf you have geometry that is not a ' \
-        'part of a Room boundary that you want included in the energy simulation, ' \
-        'it should be added as shades.'.format(object_type)
+def triangulate_room_dict(room_dict, tri_sub_faces):
+    """Replace the sub-faces of a Room dictionary that have more than 4 sides.
+
+    Args:
+        room_dict: A dictionary of a Room to be edited.
+        tri_sub_faces: A dictionary of triangulated Apertures and Doors with
+            tuples of ('apertures' or 'doors', sub-face identifier, Face
+            identifier, Room identifier) as keys.
+    """
+    for face in room_dict['faces']:
+        for sub_key in ('apertures', 'doors'):
+            if sub_key not in face:
+                continue
+            sub_faces, tri_dicts = [], []
+            for sub_f in face[sub_key]:
+                edit_key = (sub_key, sub_f['identifier'], face['identifier'],
+                            room_dict['identifier'])
+                try:
+                    tri_objs = tri_sub_faces[edit_key]
+                except KeyError:  # not a triangulated sub-face
+                    sub_faces.append(sub_f)
+                else:
+                    tri_dicts.extend([tri.to_dict(True) for tri in tri_objs])
+            face[sub_key] = sub_faces + tri_dicts
+
+
+def scale_geometry_dict(obj_dict, factor):
+    """Scale all of the Face3D geometry within an object dictionary in place.
+
+    This yields the same dictionary as scaling the object from the World origin
+    before calling to_dict but without copying the object.
+    """
+    for key, value in obj_dict.items():
+        if isinstance(value, dict):
+            if value.get('type') == 'Face3D':
+                value['boundary'] = [[c * factor for c in pt] for pt in value['boundary']]
+                if 'holes' in value:
+                    value['holes'] = [[[c * factor for c in pt] for pt in hole]
+                                      for hole in value['holes']]
+                if 'plane' in value:
+                    value['plane']['o'] = [c * factor for c in value['plane']['o']]
+            else:
+                scale_geometry_dict(value, factor)
+        elif isinstance(value, list):
+            for item in value:
+                if isinstance(item, dict):
+                    scale_geometry_dict(item, factor)
+
+
+def write_model_json(model, file_path, timer=None):
+    """Write a Model into a compact JSON file one object at a time.
+
+    The JSON describes the same dictionary as
+    model.to_dict(triangulate_sub_faces=True) but the dictionary of each Room is
+    only created when it is written, such that the peak memory scales with the
+    largest Room rather than the whole Model. Models that are not in Meters are
+    converted to Meters as each object dictionary is written, which gives the
+    same JSON as convert_to_units('Meters') without copying or mutating the Model.
+    The tolerance is converted along with the geometry.
+    If a StageTimer is input, the time to create the object dictionaries will
+    be charged to its translation stage.
+    """
+    scale_fac = model.conversion_factor_to_meters(model.units)
+
+    # collect the sub-faces with more than 4 sides that must be triangulated
+    tri_sub_faces = {}
+    for sub_key, (tri_objs, parents) in (('apertures', model.triangulated_apertures()),
+                                         ('doors', model.triangulated_doors())):
+        for tri_obj, edit_info in zip(tri_objs, parents):
+            if len(edit_info) == 3:
+                tri_sub_faces[(sub_key,) + tuple(edit_info)] = tri_obj
+
+    # write the model attributes and then each of the model objects
+    def object_dicts(key, objs):
+        for obj in objs:
+            obj_dict = obj.to_dict(True)
+            if key == 'rooms':
+                triangulate_room_dict(obj_dict, tri_sub_faces)
+            if scale_fac != 1:
+                scale_geometry_dict(obj_dict, scale_fac)
+            yield obj_dict
+
+    separators = (',', ':')
+    attributes = [('identifier', model.identifier), ('display_name', model.display_name),
+                  ('units', 'Meters'), ('properties', model.properties.to_dict())]
+    objects = [('rooms', model.rooms), ('orphaned_faces', model.orphaned_faces),
+               ('orphaned_shades', model.orphaned_shades),
+               ('orphaned_apertures', model.orphaned_apertures),
+               ('orphaned_doors', model.orphaned_doors)]
+    with open(file_path, 'w') as fp:
+        fp.write('{"type":"Model"')
+        for key, value in attributes:
+            fp.write(',"{}":'.format(key))
+            json.dump(value, fp, separators=separators)
+        for key, objs in objects:
+            if len(objs) == 0:
+                continue
+            fp.write(',"{}":['.format(key))
+            obj_dicts = object_dicts(key, objs)
+            if timer is not None:
+                obj_dicts = timer.timed('translation', obj_dicts)
+            for i, obj_dict in enumerate(obj_dicts):
+                if i != 0:
+                    fp.write(',')
+                json.dump(obj_dict, fp, separators=separators)
+            fp.write(']')
+        numbers = [('north_angle', getattr(model, 'north_angle', 0)),
+                   ('tolerance', model.tolerance * scale_fac),
+                   ('angle_tolerance', model.angle_tolerance)]
+        for key, value in numbers:
+            if value != 0:
+                fp.write(',"{}":'.format(key))
+                json.dump(value, fp)
+        if getattr(model, 'user_data', None) is not None:
+            fp.write(',"user_data":')
+            json.dump(model.user_data, fp, separators=separators)
+        fp.write('}')
 
 
 if all_required_inputs(ghenv.Component) and _write:
+    timer = StageTimer(ghenv.Component.Name, ghenv.Component.Message)
+    timer.start('design days')
+
     # process the simulation parameters
     if _sim_par_ is None:
         _sim_par_ = SimulationParameter()
@@ -120,7 +246,8 @@ if all_required_inputs(ghenv.Component) and _write:
         folder, epw_file_name = os.path.split(_epw_file)
         ddy_file = os.path.join(folder, epw_file_name.replace('.epw', '.ddy'))
         if os.path.isfile(ddy_file):
-            _sim_par_.sizing_parameter.add_from_ddy_996_004(ddy_file)
+            for dday in design_days_from_ddy(ddy_file):
+                _sim_par_.sizing_parameter.add_design_day(dday)
         else:
             raise ValueError('No _ddy_file_ has been input and no .ddy file was '
                              'found next to the _epw_file.')
@@ -129,25 +256,29 @@ if all_required_inputs(ghenv.Component) and _write:
     _folder_ = hb_config.folders.default_simulation_folder if _folder_ is None else _folder_
     directory = os.path.join(_folder_, _model.identifier, 'OpenStudio')
 
-    # check the model to be sure there are no orphaned faces, apertures, or doors
-    assert len(_model.orphaned_faces) == 0, orphaned_warning('Face')
-    assert len(_model.orphaned_apertures) == 0, orphaned_warning('Aperture')
-    assert len(_model.orphaned_doors) == 0, orphaned_warning('Door')
-
-    # scale the model if the units are not meters
-    if _model.units != 'Meters':
-        _model = _model.duplicate()  # duplicate model to avoid mutating the input
-        _model.convert_to_units('Meters')
+    # check the model to be sure that it can be simulated
+    timer.start('validation')
+    index = preflight_index(_model)
+    assert len(index['orphaned_faces']) == 0, orphaned_warning('Face')
+    assert len(index['orphaned_apertures']) == 0, orphaned_warning('Aperture')
+    assert len(index['orphaned_doors']) == 0, orphaned_warning('Door')
+    assert len(index['duplicate_identifiers']) == 0, 'Input _model contains ' \
+        'objects with duplicate identifiers:\n{}'.format(
+            '\n'.join(index['duplicate_identifiers']))
+    for obj_name in index['zero_area']:
+        give_warning(ghenv.Component, '{} has no area.'.format(obj_name))
+    print('Model contains {}.'.format(', '.join(
+        '{} {}s'.format(index['counts'][obj_type], obj_type)
+        for obj_type in ('Room', 'Face', 'Aperture', 'Door', 'Shade'))))
 
     # delete any existing files in the directory and prepare it for simulation
+    timer.start('write')
     nukedir(directory, True)
     preparedir(directory)
 
-    # write the model parameter JSONs
-    model_dict = _model.to_dict(triangulate_sub_faces=True)
+    # write the model parameter JSONs, converting the units to meters as it is written
     model_json = os.path.join(directory, '{}.json'.format(_model.identifier))
-    with open(model_json, 'w') as fp:
-        json.dump(model_dict, fp)
+    write_model_json(_model, model_json, timer)
 
     # write the simulation parameter JSONs
     sim_par_dict = _sim_par_.to_dict()
@@ -161,6 +292,7 @@ if all_required_inputs(ghenv.Component) and _write:
 
     # run the measure to translate the model JSON to an openstudio measure
     if run_ > 0:
+        timer.start('openstudio')
         osm, idf = run_osw(osw)
         # process the additional strings
         if add_str_ != [] and add_str_[0] is not None and idf is not None:
@@ -170,7 +302,9 @@ if all_required_inputs(ghenv.Component) and _write:
 
     # run the resulting idf throught EnergyPlus
     if run_ == 1:
+        timer.start('energyplus')
         sql, zsz, rdd, html, err = run_idf(idf, _epw_file)
+        timer.start('err parsing')
         if err is not None:
             err_obj = Err(err)
             print(err_obj.file_contents)
@@ -178,3 +312,8 @@ if all_required_inputs(ghenv.Component) and _write:
                 give_warning(ghenv.Component, warn)
             for error in err_obj.fatal_errors:
                 raise Exception(error)
+
+    # report the time of each stage and log it in the simulation folder
+    timer.stop()
+    timer.report()
+    timer.write_log(_folder_, model=_model.identifier)
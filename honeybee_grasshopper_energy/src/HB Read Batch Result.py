@@ -0,0 +1,107 @@
+# Honeybee: A Plugin for Environmental Analysis (GPL)
+# This file is part of Honeybee.
+#
+# Copyright (c) 2019, Ladybug Tools.
+# You should have received a copy of the GNU General Public License
+# along with Honeybee; If not, see <http://www.gnu.org/licenses/>.
+# 
+# @license GPL-3.0+ <http://spdx.org/licenses/GPL-3.0+>
+
+"""
+Parse the annual and monthly totals of outputs from a batch of SQL result files
+that have been generated from parametric energy simulations.
+
+The totals (or averages for outputs like temperature) are computed by SQLite
+such that no time series data is loaded into DataCollections. This makes it
+possible to post-process hundreds of simulations in the time that it would take
+to read the hourly results of a few of them. Use the HB Read Custom Result
+component for the time series of any single SQL file.
+
+-
+    Args:
+        _sqls: A list of file paths to SQL result files that have been generated
+            from energy simulations (eg. the sql output of the HB Run IDF
+            component with a list of IDFs).
+        _output_names: A list of EnergyPlus output names as strings (eg.
+            'Zone Ideal Loads Supply Air Total Cooling Energy'). These will be
+            aggregated for every key (eg. zone or surface) in each SQL file.
+        parallel_: Set to "True" to parse the SQL files in parallel, which can
+            greatly increase the speed of calculation for large batches. If
+            False, the files will be parsed one after the other. Default: False.
+        max_workers_: An optional integer for the maximum number of SQL files to
+            parse at once when parallel_ is True. Default: the number of
+            physical cores on this machine.
+
+    Returns:
+        header: Text for the name of each column of the table.
+        table: A list of text rows with comma-separated values. There is one
+            row for each SQL file, key, output name and reporting frequency
+            with the index of the SQL file in _sqls, the key, the output name,
+            the reporting frequency (eg. Hourly), the unit, the annual value
+            and the value of each month. Energy outputs are summed and
+            converted to kWh while other outputs are averaged over time. Months
+            outside the run period of a simulation are left empty.
+"""
+
+ghenv.Component.Name = 'HB Read Batch Result'
+ghenv.Component.NickName = 'BatchResult'
+ghenv.Component.Message = '0.1.1'
+ghenv.Component.Category = 'HB-Energy'
+ghenv.Component.SubCategory = '6 :: Result'
+ghenv.Component.AdditionalHelpFromDocStrings = '1'
+
+import System.Threading.Tasks as tasks
+
+try:
+    from honeybee_grasshopper_energy.result import sql_aggregates
+    from honeybee_grasshopper_energy.parallel import worker_count
+except ImportError as e:
+    raise ImportError('\nFailed to import honeybee_grasshopper_energy:\n\t{}'.format(e))
+
+try:
+    from ladybug_rhino.grasshopper import all_required_inputs, give_warning
+except ImportError as e:
+    raise ImportError('\nFailed to import ladybug_rhino:\n\t{}'.format(e))
+
+MONTHS = ('Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct',
+          'Nov', 'Dec')
+
+
+def read_sql(i):
+    """Aggregate the outputs of the SQL file at index i, recording any error."""
+    try:
+        aggregates[i] = sql_aggregates(_sqls[i], _output_names)
+    except Exception as e:
+        errors[i] = e
+
+
+if all_required_inputs(ghenv.Component):
+    # global lists of aggregates to be filled in the order of the input SQLs
+    n_sql = len(_sqls)
+    aggregates, errors = [None] * n_sql, [None] * n_sql
+
+    # parse the SQL files
+    if parallel_:
+        workers, warning = worker_count(max_workers_)
+        if warning is not None:
+            give_warning(ghenv.Component, warning)
+        options = tasks.ParallelOptions()
+        options.MaxDegreeOfParallelism = workers
+        tasks.Parallel.ForEach(range(n_sql), options, read_sql)
+    else:
+        for i in range(n_sql):
+            read_sql(i)
+
+    # write the aggregates of all files into a single table
+    header = ','.join(
+        ('variant', 'key', 'output', 'frequency', 'unit', 'annual') + MONTHS)
+    table = []
+    for i, sql_aggs in enumerate(aggregates):
+        if errors[i] is not None:
+            give_warning(ghenv.Component, 'Failed to read {}:\n{}'.format(
+                _sqls[i], errors[i]))
+            continue
+        for key, name, frequency, unit, annual, monthly in sql_aggs:
+            values = [annual] + monthly
+            table.append(','.join([str(i), key, name, frequency, unit] + [
+                '' if val is None else str(val) for val in values]))
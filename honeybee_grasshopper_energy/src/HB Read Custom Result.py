@@ -17,6 +17,29 @@ Parse any time series data from an energy simulation SQL result file.
         _output_names: A list of EnergyPlus output names as strings (eg.
             'Surface Window System Solar Transmittance'. These data corresponding
             to these outputs will be returned from this component.
+        keys_: An optional list of zone or surface names to which the results
+            will be limited. These can include * and ? wildcards to match
+            several zones or surfaces (eg. 'FACADE_SOUTH_*'). Names are matched
+            regardless of case and only the data of the matching zones or
+            surfaces is read from the SQL file, which is much faster than
+            reading all of them for large models.
+        aggregation_: Optional text to have the results aggregated over the run
+            period by SQLite rather than returned as the time series that was
+            reported by the simulation. This is much faster and uses far less
+            memory for large models. Results like energy are summed while
+            results like temperature are averaged over time. Any design days
+            in the SQL file are excluded. Choose from the following.
+                * Annual - a single number for each room or surface
+                * Monthly - MonthlyCollections for each month
+                * Daily - DailyCollections for each day
+                * Peak - MonthlyCollections of the highest value in each month
+        sidecar_: Set to True to convert all of the time series in the SQL file
+            into a columnar sidecar next to it (eplusout.columns) if it does not
+            already have one. Any result component that reads the file later
+            will load its values from the sidecar, which is much faster than
+            reading the SQL file for large sub-hourly results. The sidecar
+            is ignored if the SQL file is overwritten by a new simulation.
+            Default: False.
     
     Returns:
         results: DataCollections for the output_names.
@@ -24,15 +47,15 @@ Parse any time series data from an energy simulation SQL result file.
 
 ghenv.Component.Name = 'HB Read Custom Result'
 ghenv.Component.NickName = 'RoomCustomResult'
-ghenv.Component.Message = '0.1.1'
+ghenv.Component.Message = '0.1.8'
 ghenv.Component.Category = 'HB-Energy'
 ghenv.Component.SubCategory = '6 :: Result'
 ghenv.Component.AdditionalHelpFromDocStrings = '1'
 
 try:
-    from honeybee_energy.result.sql import SQLiteResult
+    from honeybee_grasshopper_energy.result import sql_reader
 except ImportError as e:
-    raise ImportError('\nFailed to import honeybee_energy:\n\t{}'.format(e))
+    raise ImportError('\nFailed to import honeybee_grasshopper_energy:\n\t{}'.format(e))
 
 try:
     from ladybug_rhino.grasshopper import all_required_inputs
@@ -41,8 +64,13 @@ except ImportError as e:
 
 
 if all_required_inputs(ghenv.Component):
-    # create the SQL result parsing object
-    sql_obj = SQLiteResult(_sql)
+    # get the SQL result parsing object shared by all components
+    sql_obj = sql_reader(_sql)
+    if sidecar_ and sql_obj.sidecar is None:
+        sql_obj.write_sidecar()
+    aggregation = aggregation_.title() if aggregation_ is not None else None
+    keys = keys_ if len(keys_) != 0 else None
     
     # get all of the results
-    results = sql_obj.data_collections_by_output_name(_output_names)
+    results = sql_obj.data_collections_by_output_name(
+        _output_names, aggregation, keys)
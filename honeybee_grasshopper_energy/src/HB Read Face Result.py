@@ -15,6 +15,31 @@ file that has been generated from an energy simulation.
     Args:
         _sql: The file path of the SQL result file that has been generated from
             an energy simulation.
+        keys_: An optional list of surface names to which the results will be
+            limited. These can include * and ? wildcards to match several
+            surfaces (eg. 'FACADE_SOUTH_*'). Names are matched regardless of
+            case and only the data of the matching surfaces is read from the
+            SQL file, which is much faster than reading all of them for large
+            models.
+        aggregation_: Optional text to have the results aggregated over the run
+            period by SQLite rather than returned as the time series that was
+            reported by the simulation. This is much faster and uses far less
+            memory for large models. Results like energy are summed while
+            results like temperature are averaged over time. Any design days
+            in the SQL file are excluded. Choose from the following.
+                * Annual - a single number for each room or surface
+                * Monthly - MonthlyCollections for each month
+                * Daily - DailyCollections for each day
+                * Peak - MonthlyCollections of the highest value in each month
+            Note that the window_energy_flow combines gains and losses and so it
+            is not output for Peak (face_energy_flow only includes opaque faces).
+        sidecar_: Set to True to convert all of the time series in the SQL file
+            into a columnar sidecar next to it (eplusout.columns) if it does not
+            already have one. Any result component that reads the file later
+            will load its values from the sidecar, which is much faster than
+            reading the SQL file for large sub-hourly results. The sidecar
+            is ignored if the SQL file is overwritten by a new simulation.
+            Default: False.
     
     Returns:
         face_indoor_temp: DataCollections for the indoor surface temperature of
@@ -33,15 +58,16 @@ file that has been generated from an energy simulation.
 
 ghenv.Component.Name = 'HB Read Face Result'
 ghenv.Component.NickName = 'FaceResult'
-ghenv.Component.Message = '0.1.1'
+ghenv.Component.Message = '0.1.9'
 ghenv.Component.Category = 'HB-Energy'
 ghenv.Component.SubCategory = '6 :: Result'
 ghenv.Component.AdditionalHelpFromDocStrings = '1'
 
 try:
-    from honeybee_energy.result.sql import SQLiteResult
+    from honeybee_grasshopper_energy.result import sql_reader, \
+        subtract_loss_from_gain
 except ImportError as e:
-    raise ImportError('\nFailed to import honeybee_energy:\n\t{}'.format(e))
+    raise ImportError('\nFailed to import honeybee_grasshopper_energy:\n\t{}'.format(e))
 
 try:
     from ladybug_rhino.grasshopper import all_required_inputs
@@ -49,35 +75,28 @@ except ImportError as e:
     raise ImportError('\nFailed to import ladybug_rhino:\n\t{}'.format(e))
 
 
-def subtract_loss_from_gain(gain_load, loss_load):
-    """Create a single DataCollection from gains and losses."""
-    total_loads = []
-    for gain, loss in zip(gain_load, loss_load):
-        total_load = gain - loss
-        total_load.header.metadata['type'] = \
-            total_load.header.metadata['type'].replace('Gain ', '')
-        total_loads.append(total_load)
-    return total_loads
-
-
 if all_required_inputs(ghenv.Component):
-    # create the SQL result parsing object
-    sql_obj = SQLiteResult(_sql)
+    # get the SQL result parsing object shared by all components
+    sql_obj = sql_reader(_sql)
+    if sidecar_ and sql_obj.sidecar is None:
+        sql_obj.write_sidecar()
+    aggregation = aggregation_.title() if aggregation_ is not None else None
+    keys = keys_ if len(keys_) != 0 else None
     
     # get all of the results
     face_indoor_temp = sql_obj.data_collections_by_output_name(
-        'Surface Inside Face Temperature')
+        'Surface Inside Face Temperature', aggregation, keys)
     face_outdoor_temp = sql_obj.data_collections_by_output_name(
-        'Surface Outside Face Temperature')
+        'Surface Outside Face Temperature', aggregation, keys)
     opaque_energy_flow = sql_obj.data_collections_by_output_name(
-        'Surface Average Face Conduction Heat Transfer Energy')
+        'Surface Average Face Conduction Heat Transfer Energy', aggregation, keys)
     
     window_loss = sql_obj.data_collections_by_output_name(
-        'Surface Window Heat Loss Energy')
+        'Surface Window Heat Loss Energy', aggregation, keys)
     window_gain = sql_obj.data_collections_by_output_name(
-        'Surface Window Heat Gain Energy')
+        'Surface Window Heat Gain Energy', aggregation, keys)
     window_energy_flow = []
-    if len(window_gain) == len(window_loss):
+    if len(window_gain) == len(window_loss) and aggregation != 'Peak':
         window_energy_flow = subtract_loss_from_gain(window_gain, window_loss)
     
     face_energy_flow = opaque_energy_flow + window_energy_flow
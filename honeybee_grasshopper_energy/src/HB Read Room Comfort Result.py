@@ -15,6 +15,23 @@ file that has been generated from an energy simulation.
     Args:
         _sql: The file path of the SQL result file that has been generated from
             an energy simulation.
+        aggregation_: Optional text to have the results aggregated over the run
+            period by SQLite rather than returned as the time series that was
+            reported by the simulation. This is much faster and uses far less
+            memory for large models. Results like energy are summed while
+            results like temperature are averaged over time. Any design days
+            in the SQL file are excluded. Choose from the following.
+                * Annual - a single number for each room or surface
+                * Monthly - MonthlyCollections for each month
+                * Daily - DailyCollections for each day
+                * Peak - MonthlyCollections of the highest value in each month
+        sidecar_: Set to True to convert all of the time series in the SQL file
+            into a columnar sidecar next to it (eplusout.columns) if it does not
+            already have one. Any result component that reads the file later
+            will load its values from the sidecar, which is much faster than
+            reading the SQL file for large sub-hourly results. The sidecar
+            is ignored if the SQL file is overwritten by a new simulation.
+            Default: False.
     
     Returns:
         oper_temp: DataCollections for the mean operative temperature of each room (C).
@@ -25,15 +42,15 @@ file that has been generated from an energy simulation.
 
 ghenv.Component.Name = 'HB Read Room Comfort Result'
 ghenv.Component.NickName = 'RoomComfortResult'
-ghenv.Component.Message = '0.1.1'
+ghenv.Component.Message = '0.1.7'
 ghenv.Component.Category = 'HB-Energy'
 ghenv.Component.SubCategory = '6 :: Result'
 ghenv.Component.AdditionalHelpFromDocStrings = '1'
 
 try:
-    from honeybee_energy.result.sql import SQLiteResult
+    from honeybee_grasshopper_energy.result import sql_reader
 except ImportError as e:
-    raise ImportError('\nFailed to import honeybee_energy:\n\t{}'.format(e))
+    raise ImportError('\nFailed to import honeybee_grasshopper_energy:\n\t{}'.format(e))
 
 try:
     from ladybug_rhino.grasshopper import all_required_inputs
@@ -42,15 +59,18 @@ except ImportError as e:
 
 
 if all_required_inputs(ghenv.Component):
-    # create the SQL result parsing object
-    sql_obj = SQLiteResult(_sql)
+    # get the SQL result parsing object shared by all components
+    sql_obj = sql_reader(_sql)
+    if sidecar_ and sql_obj.sidecar is None:
+        sql_obj.write_sidecar()
+    aggregation = aggregation_.title() if aggregation_ is not None else None
     
     # get all of the results
     oper_temp = sql_obj.data_collections_by_output_name(
-        'Zone Operative Temperature')
+        'Zone Operative Temperature', aggregation)
     air_temp = sql_obj.data_collections_by_output_name(
-        'Zone Mean Air Temperature')
+        'Zone Mean Air Temperature', aggregation)
     rad_temp = sql_obj.data_collections_by_output_name(
-        'Zone Mean Radiant Temperature')
+        'Zone Mean Radiant Temperature', aggregation)
     rel_humidity = sql_obj.data_collections_by_output_name(
-        'Zone Air Relative Humidity')
+        'Zone Air Relative Humidity', aggregation)
@@ -15,6 +15,25 @@ that has been generated from an energy simulation.
     Args:
         _sql: The file path of the SQL result file that has been generated from
             an energy simulation.
+        aggregation_: Optional text to have the results aggregated over the run
+            period by SQLite rather than returned as the time series that was
+            reported by the simulation. This is much faster and uses far less
+            memory for large models. Results like energy are summed while
+            results like temperature are averaged over time. Any design days
+            in the SQL file are excluded. Choose from the following.
+                * Annual - a single number for each room or surface
+                * Monthly - MonthlyCollections for each month
+                * Daily - DailyCollections for each day
+                * Peak - MonthlyCollections of the highest value in each month
+            Note that the infiltration_load, mech_vent_load and nat_vent_load
+            combine gains and losses and so they are not output for Peak.
+        sidecar_: Set to True to convert all of the time series in the SQL file
+            into a columnar sidecar next to it (eplusout.columns) if it does not
+            already have one. Any result component that reads the file later
+            will load its values from the sidecar, which is much faster than
+            reading the SQL file for large sub-hourly results. The sidecar
+            is ignored if the SQL file is overwritten by a new simulation.
+            Default: False.
     
     Returns:
         cooling: DataCollections for the cooling energy in kWh. For Ideal Air
@@ -49,124 +68,146 @@ that has been generated from an energy simulation.
 
 ghenv.Component.Name = 'HB Read Room Energy Result'
 ghenv.Component.NickName = 'RoomEnergyResult'
-ghenv.Component.Message = '0.1.2'
+ghenv.Component.Message = '0.1.9'
 ghenv.Component.Category = 'HB-Energy'
 ghenv.Component.SubCategory = '6 :: Result'
 ghenv.Component.AdditionalHelpFromDocStrings = '1'
 
+import operator
+
 try:
-    from honeybee_energy.result.sql import SQLiteResult
+    from honeybee_grasshopper_energy.result import sql_reader, \
+        subtract_loss_from_gain, subtract_values, check_aligned, collection_like
 except ImportError as e:
-    raise ImportError('\nFailed to import honeybee_energy:\n\t{}'.format(e))
+    raise ImportError('\nFailed to import honeybee_grasshopper_energy:\n\t{}'.format(e))
 
 try:
     from ladybug_rhino.grasshopper import all_required_inputs
 except ImportError as e:
     raise ImportError('\nFailed to import ladybug_rhino:\n\t{}'.format(e))
 
+# EnergyPlus outputs that are combined into each output of the component
+COOLING = (
+    'Zone Ideal Loads Supply Air Total Cooling Energy',
+    'Zone Ideal Loads Zone Sensible Cooling Energy',
+    'Zone Ideal Loads Zone Latent Cooling Energy',
+    'Cooling Coil Electric Energy',
+    'Chiller Electric Energy',
+    'Zone VRF Air Terminal Cooling Electric Energy',
+    'VRF Heat Pump Cooling Electric Energy',
+    'Chiller Heater System Cooling Electric Energy')
+HEATING = (
+    'Zone Ideal Loads Supply Air Total Heating Energy',
+    'Zone Ideal Loads Zone Sensible Heating Energy',
+    'Zone Ideal Loads Zone Latent Heating Energy',
+    'Boiler Gas Energy',
+    'Heating Coil Total Heating Energy',
+    'Heating Coil Gas Energy',
+    'Heating Coil Electric Energy',
+    'Humidifier Electric Energy',
+    'Zone VRF Air Terminal Heating Electric Energy',
+    'VRF Heat Pump Heating Electric Energy',
+    'Chiller Heater System Heating Electric Energy')
+LIGHTING = (
+    'Zone Lights Electric Energy',
+    'Zone Lights Total Heating Energy')
+ELECTRIC_EQUIP = (
+    'Zone Electric Equipment Electric Energy',
+    'Zone Electric Equipment Total Heating Energy',
+    'Zone Electric Equipment Radiant Heating Energy',
+    'Zone Electric Equipment Convective Heating Energy',
+    'Zone Electric Equipment Latent Gain Energy')
+GAS_EQUIP = (
+    'Zone Gas Equipment Gas Energy',
+    'Zone Gas Equipment Total Heating Energy',
+    'Zone Gas Equipment Radiant Heating Energy',
+    'Zone Gas Equipment Convective Heating Energy',
+    'Zone Gas Equipment Latent Gain Energy')
+FAN_ELECTRIC = (
+    'Zone Ventilation Fan Electric Energy',
+    'Fan Electric Energy',
+    'Cooling Tower Fan Electric Energy')
+PUMP_ELECTRIC = 'Pump Electric Energy'
+PEOPLE_GAIN = (
+    'Zone People Total Heating Energy',
+    'Zone People Sensible Heating Energy',
+    'Zone People Sensible Latent Energy')
+SOLAR_GAIN = 'Zone Windows Total Transmitted Solar Radiation Energy'
+INFIL_GAIN = (
+    'Zone Infiltration Total Heat Gain Energy',
+    'Zone Infiltration Sensible Heat Gain Energy',
+    'Zone Infiltration Latent Heat Gain Energy')
+INFIL_LOSS = (
+    'Zone Infiltration Total Heat Loss Energy',
+    'Zone Infiltration Sensible Heat Loss Energy',
+    'Zone Infiltration Latent Heat Loss Energy')
+VENT_LOSS = (
+    'Zone Ideal Loads Zone Total Heating Energy',
+    'Zone Ideal Loads Zone Sensible Heating Energy',
+    'Zone Ideal Loads Zone Latent Heating Energy')
+VENT_GAIN = (
+    'Zone Ideal Loads Zone Total Cooling Energy',
+    'Zone Ideal Loads Zone Sensible Cooling Energy',
+    'Zone Ideal Loads Zone Latent Cooling Energy')
+NAT_VENT_GAIN = (
+    'Zone Ventilation Total Heat Gain Energy',
+    'Zone Ventilation Sensible Heat Gain Energy',
+    'Zone Ventilation Latent Heat Gain Energy')
+NAT_VENT_LOSS = (
+    'Zone Ventilation Total Heat Loss Energy',
+    'Zone Ventilation Sensible Heat Loss Energy',
+    'Zone Ventilation Latent Heat Loss Energy')
+ALL_OUTPUTS = COOLING + HEATING + LIGHTING + ELECTRIC_EQUIP + GAS_EQUIP + \
+    FAN_ELECTRIC + (PUMP_ELECTRIC,) + PEOPLE_GAIN + (SOLAR_GAIN,) + INFIL_GAIN + \
+    INFIL_LOSS + VENT_LOSS + VENT_GAIN + NAT_VENT_GAIN + NAT_VENT_LOSS
 
-def subtract_loss_from_gain(gain_load, loss_load):
-    """Create a single DataCollection from gains and losses."""
-    total_loads = []
-    for gain, loss in zip(gain_load, loss_load):
-        total_load = gain - loss
-        total_load.header.metadata['type'] = \
-            total_load.header.metadata['type'].replace('Gain ', '')
-        total_loads.append(total_load)
-    return total_loads
 
 
 if all_required_inputs(ghenv.Component):
-    # create the SQL result parsing object
-    sql_obj = SQLiteResult(_sql)
+    # get the SQL result parsing object shared by all components
+    sql_obj = sql_reader(_sql)
+    if sidecar_ and sql_obj.sidecar is None:
+        sql_obj.write_sidecar()
+    aggregation = aggregation_.title() if aggregation_ is not None else None
+
+    # load all of the results with a single pass over the ReportData
+    if aggregation is None:
+        sql_obj.preload(ALL_OUTPUTS)
     
     # get all of the results relevant for energy use
-    cooling = sql_obj.data_collections_by_output_name((
-        'Zone Ideal Loads Supply Air Total Cooling Energy',
-        'Zone Ideal Loads Zone Sensible Cooling Energy',
-        'Zone Ideal Loads Zone Latent Cooling Energy',
-        'Cooling Coil Electric Energy',
-        'Chiller Electric Energy',
-        'Zone VRF Air Terminal Cooling Electric Energy',
-        'VRF Heat Pump Cooling Electric Energy',
-        'Chiller Heater System Cooling Electric Energy'))
-    heating = sql_obj.data_collections_by_output_name((
-        'Zone Ideal Loads Supply Air Total Heating Energy',
-        'Zone Ideal Loads Zone Sensible Heating Energy',
-        'Zone Ideal Loads Zone Latent Heating Energy',
-        'Boiler Gas Energy',
-        'Heating Coil Total Heating Energy',
-        'Heating Coil Gas Energy',
-        'Heating Coil Electric Energy',
-        'Humidifier Electric Energy',
-        'Zone VRF Air Terminal Heating Electric Energy',
-        'VRF Heat Pump Heating Electric Energy',
-        'Chiller Heater System Heating Electric Energy'))
-    lighting = sql_obj.data_collections_by_output_name((
-        'Zone Lights Electric Energy',
-        'Zone Lights Total Heating Energy'))
-    electric_equip = sql_obj.data_collections_by_output_name((
-        'Zone Electric Equipment Electric Energy',
-        'Zone Electric Equipment Total Heating Energy',
-        'Zone Electric Equipment Radiant Heating Energy',
-        'Zone Electric Equipment Convective Heating Energy',
-        'Zone Electric Equipment Latent Gain Energy'))
-    gas_equip = sql_obj.data_collections_by_output_name((
-        'Zone Gas Equipment Gas Energy',
-        'Zone Gas Equipment Total Heating Energy',
-        'Zone Gas Equipment Radiant Heating Energy',
-        'Zone Gas Equipment Convective Heating Energy',
-        'Zone Gas Equipment Latent Gain Energy'))
-    fan_electric = sql_obj.data_collections_by_output_name((
-        'Zone Ventilation Fan Electric Energy',
-        'Fan Electric Energy',
-        'Cooling Tower Fan Electric Energy'))
-    pump_electric = sql_obj.data_collections_by_output_name(
-        'Pump Electric Energy')
+    cooling = sql_obj.data_collections_by_output_name(COOLING, aggregation)
+    heating = sql_obj.data_collections_by_output_name(HEATING, aggregation)
+    lighting = sql_obj.data_collections_by_output_name(LIGHTING, aggregation)
+    electric_equip = sql_obj.data_collections_by_output_name(ELECTRIC_EQUIP, aggregation)
+    gas_equip = sql_obj.data_collections_by_output_name(GAS_EQUIP, aggregation)
+    fan_electric = sql_obj.data_collections_by_output_name(FAN_ELECTRIC, aggregation)
+    pump_electric = sql_obj.data_collections_by_output_name(PUMP_ELECTRIC, aggregation)
     
     # get all of the results relevant for gains and losses
-    people_gain = sql_obj.data_collections_by_output_name((
-        'Zone People Total Heating Energy',
-        'Zone People Sensible Heating Energy',
-        'Zone People Sensible Latent Energy'))
-    solar_gain = sql_obj.data_collections_by_output_name(
-        'Zone Windows Total Transmitted Solar Radiation Energy')
+    people_gain = sql_obj.data_collections_by_output_name(PEOPLE_GAIN, aggregation)
+    solar_gain = sql_obj.data_collections_by_output_name(SOLAR_GAIN, aggregation)
     
-    infil_gain = sql_obj.data_collections_by_output_name((
-        'Zone Infiltration Total Heat Gain Energy',
-        'Zone Infiltration Sensible Heat Gain Energy',
-        'Zone Infiltration Latent Heat Gain Energy'))
-    infil_loss = sql_obj.data_collections_by_output_name((
-        'Zone Infiltration Total Heat Loss Energy',
-        'Zone Infiltration Sensible Heat Loss Energy',
-        'Zone Infiltration Latent Heat Loss Energy'))
-    if len(infil_gain) == len(infil_loss):
+    infil_gain = sql_obj.data_collections_by_output_name(INFIL_GAIN, aggregation)
+    infil_loss = sql_obj.data_collections_by_output_name(INFIL_LOSS, aggregation)
+    if len(infil_gain) == len(infil_loss) and aggregation != 'Peak':
         infiltration_load = subtract_loss_from_gain(infil_gain, infil_loss)
     
-    vent_loss = sql_obj.data_collections_by_output_name((
-        'Zone Ideal Loads Zone Total Heating Energy',
-        'Zone Ideal Loads Zone Sensible Heating Energy',
-        'Zone Ideal Loads Zone Latent Heating Energy'))
-    vent_gain = sql_obj.data_collections_by_output_name((
-        'Zone Ideal Loads Zone Total Cooling Energy',
-        'Zone Ideal Loads Zone Sensible Cooling Energy',
-        'Zone Ideal Loads Zone Latent Cooling Energy'))
-    if len(vent_gain) == len(vent_loss) == len(cooling) == len(heating):
-        mech_vent_loss = subtract_loss_from_gain(heating, vent_loss)
-        mech_vent_gain = subtract_loss_from_gain(cooling, vent_gain)
-        mech_vent_load = [data.duplicate() for data in
-                          subtract_loss_from_gain(mech_vent_gain, mech_vent_loss)]
-        for load in mech_vent_load:
-            load.header.metadata['type'] = \
-                'Zone Ideal Loads Ventilation Heat Energy'
+    vent_loss = sql_obj.data_collections_by_output_name(VENT_LOSS, aggregation)
+    vent_gain = sql_obj.data_collections_by_output_name(VENT_GAIN, aggregation)
+    if len(vent_gain) == len(vent_loss) == len(cooling) == len(heating) and \
+            aggregation != 'Peak':
+        mech_vent_load = []
+        for cool, v_gain, heat, v_loss in zip(cooling, vent_gain, heating, vent_loss):
+            if aggregation == 'Annual':
+                mech_vent_load.append((cool - v_gain) - (heat - v_loss))
+                continue
+            check_aligned(cool, heat)
+            values = map(operator.sub, subtract_values(cool, v_gain),
+                         subtract_values(heat, v_loss))
+            mech_vent_load.append(collection_like(
+                cool, list(values), 'Zone Ideal Loads Ventilation Heat Energy'))
     
-    nat_vent_gain = sql_obj.data_collections_by_output_name((
-        'Zone Ventilation Total Heat Gain Energy',
-        'Zone Ventilation Sensible Heat Gain Energy',
-        'Zone Ventilation Latent Heat Gain Energy'))
-    nat_vent_loss = sql_obj.data_collections_by_output_name((
-        'Zone Ventilation Total Heat Loss Energy',
-        'Zone Ventilation Sensible Heat Loss Energy',
-        'Zone Ventilation Latent Heat Loss Energy'))
-    if len(nat_vent_gain) == len(nat_vent_loss):
+    nat_vent_gain = sql_obj.data_collections_by_output_name(NAT_VENT_GAIN, aggregation)
+    nat_vent_loss = sql_obj.data_collections_by_output_name(NAT_VENT_LOSS, aggregation)
+    if len(nat_vent_gain) == len(nat_vent_loss) and aggregation != 'Peak':
         nat_vent_load = subtract_loss_from_gain(nat_vent_gain, nat_vent_loss)
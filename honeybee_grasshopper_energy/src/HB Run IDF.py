@@ -19,10 +19,33 @@ Run an IDF file through EnergyPlus.
             in parallel, which can greatly increase the speed of calculation but
             may not be desired when other processes are running. If False, all
             EnergyPlus simulations will be be run on a single core. Default: False.
+        max_workers_: An optional integer for the maximum number of EnergyPlus
+            simulations to run at once when parallel_ is True. IDF files beyond
+            this number will wait in a queue until a previous simulation has
+            finished. Default: the number of physical cores on this machine.
+        resume_: Set to "True" to record each simulation in a job ledger, which
+            is an SQLite database in the default simulation folder with the
+            input hash, status, timings and output files of every job. Any IDF
+            that has already been simulated with the same EPW and the same CSV
+            files for its Schedule:File objects will be skipped and the outputs
+            of the previous simulation will be returned, such that an
+            interrupted batch only runs the pending or failed IDFs when it is
+            run again. Default: False.
+        abort_: An optional list of text patterns (regular expressions) to stop
+            each EnergyPlus simulation as soon as any of them appears in its
+            .err file or EnergyPlus output. For example, "[*][*] Severe" will
+            stop a simulation at its first severe error, freeing the core for
+            the next IDF in the batch. When patterns are connected, the report
+            will also include the last environment and day of each simulation.
         run_: Set to "True" to run the IDF through EnergyPlus.
     
     Returns:
-        report: Check here to see a report of the EnergyPlus run.
+        report: Check here to see a report of the EnergyPlus run. This includes
+            the wall time and status of each simulation as well as the wall
+            time, CPU time and change in memory of each stage of the solve in
+            Rhino, which are also appended to a simulation_timing.jsonl file in
+            the default simulation folder such that they can be compared across
+            runs. The CPU time and memory of EnergyPlus are not included.
         sql: The file path of the SQL result file that has been generated on your
             machine.
         zsz: Path to a .csv file containing detailed zone load information recorded
@@ -39,59 +62,132 @@ Run an IDF file through EnergyPlus.
 
 ghenv.Component.Name = "HB Run IDF"
 ghenv.Component.NickName = 'RunIDF'
-ghenv.Component.Message = '0.1.0'
+ghenv.Component.Message = '0.1.8'
 ghenv.Component.Category = 'HB-Energy'
 ghenv.Component.SubCategory = '5 :: Simulate'
 ghenv.Component.AdditionalHelpFromDocStrings = "0"
 
 import os
+import time
 import System.Threading.Tasks as tasks
 
+try:
+    from honeybee.config import folders
+except ImportError as e:
+    raise ImportError('\nFailed to import honeybee:\n\t{}'.format(e))
+
 try:
     from honeybee_energy.run import run_idf
     from honeybee_energy.result.err import Err
 except ImportError as e:
     raise ImportError('\nFailed to import honeybee_energy:\n\t{}'.format(e))
 
+try:
+    from honeybee_grasshopper_energy.timer import StageTimer
+    from honeybee_grasshopper_energy.parallel import worker_count
+    from honeybee_grasshopper_energy.ledger import job_hash, completed_job, record_job
+    from honeybee_grasshopper_energy.run import monitored_run_idf
+except ImportError as e:
+    raise ImportError('\nFailed to import honeybee_grasshopper_energy:\n\t{}'.format(e))
+
 try:
     from ladybug_rhino.grasshopper import all_required_inputs, give_warning
 except ImportError as e:
     raise ImportError('\nFailed to import ladybug_rhino:\n\t{}'.format(e))
 
+
 def run_idf_and_report_errors(i):
-    """Run an IDF file through EnergyPlus and report errors/warnings on this component."""
+    """Run an IDF file through EnergyPlus and write the results to index i."""
     idf = _idf[i]
-    sql_i, zsz_i, rdd_i, html_i, err_i = run_idf(idf, _epw_file)
+    start_time = time.time()
+
+    # skip the simulation if it has already been completed
+    if resume_:
+        input_hash = job_hash((idf, _epw_file))
+        done_job = completed_job(input_hash)
+        if done_job is not None:
+            sql[i], zsz[i], rdd[i], html[i], err[i] = done_job[2:]
+            if err[i] is not None:
+                err_objs[i] = Err(err[i])
+            job_reports[i] = (time.time() - start_time, 'Resumed')
+            return
+        record_job(ghenv.Component.Name, input_hash, idf, 'Running', start_time)
 
-    # report any errors on this component
+    if abort_:
+        sql_i, zsz_i, rdd_i, html_i, err_i, last_progress, abort_lines[i], _ = \
+            monitored_run_idf(idf, _epw_file, abort_)
+    else:
+        sql_i, zsz_i, rdd_i, html_i, err_i = run_idf(idf, _epw_file)
+
+    # collect any errors to be reported on this component
+    status = 'Completed' if sql_i is not None else 'No Results'
+    if abort_lines[i] is not None:
+        status = 'Aborted during {} - {}'.format(*last_progress)
     if err_i is not None:
         err_obj = Err(err_i)
-        err_objs.append(err_obj)
-        for warn in err_obj.severe_errors:
-            give_warning(ghenv.Component, warn)
-        for error in err_obj.fatal_errors:
-            raise Exception(error)
+        err_objs[i] = err_obj
+        if len(err_obj.fatal_errors) != 0 and abort_lines[i] is None:
+            status = 'Fatal Error'
 
-    # append everything to the global lists
-    sql.append(sql_i)
-    zsz.append(zsz_i)
-    rdd.append(rdd_i)
-    html.append(html_i)
-    err.append(err_i)
+    # write everything to the input index of the global lists
+    sql[i], zsz[i], rdd[i], html[i], err[i] = sql_i, zsz_i, rdd_i, html_i, err_i
+    job_reports[i] = (time.time() - start_time, status)
+    if resume_:
+        record_job(ghenv.Component.Name, input_hash, idf, status, start_time, 0,
+                   job_reports[i][0], (None, idf, sql_i, zsz_i, rdd_i, html_i, err_i))
 
 
 if all_required_inputs(ghenv.Component) and _run:
-    # global lists of outputs to be filled
-    sql, zsz, rdd, html, err, err_objs = [], [], [], [], [], []
+    # global lists of outputs to be filled in the order of the input IDFs
+    n_idf = len(_idf)
+    sql, zsz, rdd, html, err, err_objs, job_reports, abort_lines = \
+        ([None] * n_idf for _ in range(8))
+    timer = StageTimer(ghenv.Component.Name, ghenv.Component.Message)
 
     # run the IDF files through E+
+    timer.start('simulation')
     if parallel_:
-        tasks.Parallel.ForEach(range(len(_idf)), run_idf_and_report_errors)
+        options = tasks.ParallelOptions()
+        workers, warning = worker_count(max_workers_)
+        if warning is not None:
+            give_warning(ghenv.Component, warning)
+        options.MaxDegreeOfParallelism = workers
+        tasks.Parallel.ForEach(range(n_idf), options, run_idf_and_report_errors)
     else:
-        for i in range(len(_idf)):
+        for i in range(n_idf):
             run_idf_and_report_errors(i)
 
+    # report the wall time and status of each simulation
+    timer.start('report')
+    for i, (wall_time, status) in enumerate(job_reports):
+        print('{}: {} in {:.1f} seconds'.format(_idf[i], status, wall_time))
+    if resume_:
+        print('Job ledger: {}'.format(
+            os.path.join(folders.default_simulation_folder, 'simulation_jobs.db')))
+
     # print out error report if it's only one
     # otherwise it's too much data to be read-able
+    err_objs = [err_obj for err_obj in err_objs if err_obj is not None]
     if len(err_objs) == 1:
         print(err_objs[0].file_contents)
+
+    # report any errors on this component once all simulations are finished
+    timer.start('err parsing')
+    for i, abort_line in enumerate(abort_lines):
+        if abort_line is not None:
+            give_warning(ghenv.Component, 'EnergyPlus was stopped for {} because the '
+                         'following line matched the abort_ patterns:\n{}'.format(
+                             _idf[i], abort_line))
+    for err_obj in err_objs:
+        for warn in err_obj.severe_errors:
+            give_warning(ghenv.Component, warn)
+
+    # report the time of each stage and log it in the simulation folder
+    timer.stop()
+    timer.report()
+    timer.write_log(folders.default_simulation_folder, jobs=n_idf)
+
+    # stop the component at the first fatal error
+    for err_obj in err_objs:
+        for error in err_obj.fatal_errors:
+            raise Exception(error)
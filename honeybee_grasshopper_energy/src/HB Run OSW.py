@@ -24,14 +24,37 @@ EnergyPlus.
         parallel_: Set to "True" to run execute simulations of multiple IDF files
             in parallel, which can greatly increase the speed of calculation but
             may not be desired when other processes are running. If False, all
-            EnergyPlus simulations will be be run on a single core. Default: False.
+            EnergyPlus simulations will be be run on a single core. When running
+            in parallel, the OSW files are translated and simulated in a
+            pipeline such that one OSW can be translated with OpenStudio
+            while the IDF of another is running through EnergyPlus. Default: False.
+        max_workers_: An optional integer for the maximum number of EnergyPlus
+            simulations to run at once when parallel_ is True.
+            Default: the number of physical cores on this machine.
+        max_translators_: An optional integer for the maximum number of OSW
+            files to translate with the OpenStudio CLI at once when parallel_
+            is True. Default: half the number of physical cores on this machine.
+        resume_: Set to "True" to record each OSW in a job ledger, which is an
+            SQLite database in the default simulation folder with the input
+            hash, status, timings and output files of every job. Any OSW that
+            has already been run with the same honeybee JSONs, EPW and add_str_
+            (including the CSV files of any Schedule:File in add_str_) will be
+            skipped and the outputs of the previous run will be returned, such
+            that an interrupted batch only runs the pending or failed OSWs
+            when it is run again. Default: False.
         _translate: Set to "True" to execute the ows  using the OpenStudio command
             line interface (CLI). This will translate any honeybee jsons referenced
             in the osw to an osm and idf file.
         run_: Set to "True" to run the resulting IDF through EnergyPlus.
     
     Returns:
-        report: Check here to see a report of the EnergyPlus run.
+        report: Check here to see a report of the EnergyPlus run. This includes
+            the translation and simulation time of each OSW as well as the wall
+            time, CPU time and change in memory of each stage of the solve in
+            Rhino, which are also appended to a simulation_timing.jsonl file in
+            the default simulation folder such that they can be compared across
+            runs. The CPU time and memory of OpenStudio and EnergyPlus are not
+            included.
         osm: The file path to the OpenStudio Model (OSM) that has been generated
             on this computer.
         idf: The file path of the IDF file that has been generated on this computer.
@@ -52,13 +75,20 @@ EnergyPlus.
 
 ghenv.Component.Name = "HB Run OSW"
 ghenv.Component.NickName = 'RunOSW'
-ghenv.Component.Message = '0.1.0'
+ghenv.Component.Message = '0.1.6'
 ghenv.Component.Category = 'HB-Energy'
 ghenv.Component.SubCategory = '5 :: Simulate'
 ghenv.Component.AdditionalHelpFromDocStrings = "0"
 
 import os
+import time
 import System.Threading.Tasks as tasks
+from System.Threading import SemaphoreSlim
+
+try:
+    from honeybee.config import folders
+except ImportError as e:
+    raise ImportError('\nFailed to import honeybee:\n\t{}'.format(e))
 
 try:
     from honeybee_energy.run import run_osw, run_idf
@@ -66,56 +96,152 @@ try:
 except ImportError as e:
     raise ImportError('\nFailed to import honeybee_energy:\n\t{}'.format(e))
 
+try:
+    from honeybee_grasshopper_energy.timer import StageTimer
+    from honeybee_grasshopper_energy.parallel import physical_cores, worker_count
+    from honeybee_grasshopper_energy.ledger import job_hash, completed_job, record_job
+    from honeybee_grasshopper_energy.run import schedule_files
+except ImportError as e:
+    raise ImportError('\nFailed to import honeybee_grasshopper_energy:\n\t{}'.format(e))
+
 try:
     from ladybug_rhino.grasshopper import all_required_inputs, give_warning
 except ImportError as e:
     raise ImportError('\nFailed to import ladybug_rhino:\n\t{}'.format(e))
 
+
+def osw_input_files(osw):
+    """Get the OSW file and the honeybee JSON files next to it, which it uses as input."""
+    osw_dir = os.path.dirname(osw)
+    jsons = sorted(os.path.join(osw_dir, f) for f in os.listdir(osw_dir)
+                   if f.endswith('.json'))
+    return [osw] + jsons
+
+
 def run_osw_and_report_errors(i):
-    """Run an OSW through OpenStudio CLI."""
+    """Run an OSW through OpenStudio CLI and the resulting IDF through EnergyPlus.
+
+    Each of the two stages waits for a free slot of its own semaphore such that
+    one OSW can be translated while the IDF of another OSW is simulated.
+    """
     osw = _osw[i]
-    osm_i, idf_i = run_osw(osw)
+
+    # skip the OSW if it has already been completed
+    if resume_:
+        job_start = time.time()
+        add_str = '/n'.join(add_str_) if add_str_ != [] and add_str_[0] is not None \
+            else ''
+        add_str_files = schedule_files(
+            [line for obj in add_str_ if obj is not None for line in obj.splitlines()],
+            os.path.dirname(osw))
+        input_hash = job_hash(osw_input_files(osw) + [_epw_file] + add_str_files,
+                              '{}{}'.format(bool(run_), add_str))
+        done_job = completed_job(input_hash)
+        if done_job is not None:
+            osm[i], idf[i], sql[i], zsz[i], rdd[i], html[i], err[i] = done_job
+            if err[i] is not None:
+                err_objs[i] = Err(err[i])
+            job_reports[i] = (0, 0, 'Resumed')
+            return
+        record_job(ghenv.Component.Name, input_hash, osw, 'Running', job_start)
+
+    translate_slots.Wait()
+    start_time = time.time()
+    try:
+        osm_i, idf_i = run_osw(osw)
+    finally:
+        translate_slots.Release()
     # process the additional strings
-    if add_str_ != [] and add_str_[0] is not None and idf is not None:
+    if add_str_ != [] and add_str_[0] is not None and idf_i is not None:
         add_str = '/n'.join(add_str_)
-        with open(idf, "a") as idf_file:
+        with open(idf_i, "a") as idf_file:
             idf_file.write(add_str)
-    osm.append(osm_i)
-    idf.append(idf_i)
+    osm[i], idf[i] = osm_i, idf_i
+    translate_time = time.time() - start_time
+    status = 'Translated' if idf_i is not None else 'Translation Failed'
 
     # run the IDF through EnergyPlus
-    if run_:
-        sql_i, zsz_i, rdd_i, html_i, err_i = run_idf(idf_i, _epw_file)
+    sim_time = 0
+    if run_ and idf_i is not None:
+        sim_slots.Wait()
+        start_time = time.time()
+        try:
+            sql_i, zsz_i, rdd_i, html_i, err_i = run_idf(idf_i, _epw_file)
+        finally:
+            sim_slots.Release()
+        sim_time = time.time() - start_time
 
-        # report any errors on this component
+        # collect any errors to be reported on this component
+        status = 'Completed' if sql_i is not None else 'No Results'
         if err_i is not None:
             err_obj = Err(err_i)
-            err_objs.append(err_obj)
-            for warn in err_obj.severe_errors:
-                give_warning(ghenv.Component, warn)
-            for error in err_obj.fatal_errors:
-                raise Exception(error)
+            err_objs[i] = err_obj
+            if len(err_obj.fatal_errors) != 0:
+                status = 'Fatal Error'
 
-        # append everything to the global lists
-        sql.append(sql_i)
-        zsz.append(zsz_i)
-        rdd.append(rdd_i)
-        html.append(html_i)
-        err.append(err_i)
+        # write everything to the input index of the global lists
+        sql[i], zsz[i], rdd[i], html[i], err[i] = sql_i, zsz_i, rdd_i, html_i, err_i
+    job_reports[i] = (translate_time, sim_time, status)
+    if resume_:
+        record_job(ghenv.Component.Name, input_hash, osw, status, job_start,
+                   translate_time, sim_time,
+                   (osm[i], idf[i], sql[i], zsz[i], rdd[i], html[i], err[i]))
 
 
 if all_required_inputs(ghenv.Component) and _translate:
-    # global lists of outputs to be filled
-    osm, idf, sql, zsz, rdd, html, err, err_objs = [], [], [], [], [], [], [], []
+    # global lists of outputs to be filled in the order of the input OSWs
+    n_osw = len(_osw)
+    osm, idf, sql, zsz, rdd, html, err, err_objs, job_reports = \
+        ([None] * n_osw for _ in range(9))
+    timer = StageTimer(ghenv.Component.Name, ghenv.Component.Message)
 
     # run the OSW files through OpenStudio CLI
+    timer.start('simulation')
     if parallel_:
-        tasks.Parallel.ForEach(range(len(_osw)), run_osw_and_report_errors)
+        cores = physical_cores()
+        max_sim, sim_warning = worker_count(max_workers_, cores)
+        max_trans, trans_warning = \
+            worker_count(max_translators_, cores // 2, 'max_translators_')
+        for warning in (sim_warning, trans_warning):
+            if warning is not None:
+                give_warning(ghenv.Component, warning)
+        translate_slots = SemaphoreSlim(max_trans, max_trans)
+        sim_slots = SemaphoreSlim(max_sim, max_sim)
+        options = tasks.ParallelOptions()
+        options.MaxDegreeOfParallelism = max_trans + max_sim
+        tasks.Parallel.ForEach(range(n_osw), options, run_osw_and_report_errors)
     else:
-        for i in range(len(_osw)):
+        translate_slots, sim_slots = SemaphoreSlim(1, 1), SemaphoreSlim(1, 1)
+        for i in range(n_osw):
             run_osw_and_report_errors(i)
 
+    # report the translation time, simulation time and status of each OSW
+    timer.start('report')
+    for i, (translate_time, sim_time, status) in enumerate(job_reports):
+        print('{}: {} (translation {:.1f} seconds, simulation {:.1f} seconds)'.format(
+            _osw[i], status, translate_time, sim_time))
+    if resume_:
+        print('Job ledger: {}'.format(
+            os.path.join(folders.default_simulation_folder, 'simulation_jobs.db')))
+
     # print out error report if it's only one file
     # otherwise it's too much data to be read-able
+    err_objs = [err_obj for err_obj in err_objs if err_obj is not None]
     if len(err_objs) == 1:
         print(err_objs[0].file_contents)
+
+    # report any errors on this component once all simulations are finished
+    timer.start('err parsing')
+    for err_obj in err_objs:
+        for warn in err_obj.severe_errors:
+            give_warning(ghenv.Component, warn)
+
+    # report the time of each stage and log it in the simulation folder
+    timer.stop()
+    timer.report()
+    timer.write_log(folders.default_simulation_folder, jobs=n_osw)
+
+    # stop the component at the first fatal error
+    for err_obj in err_objs:
+        for error in err_obj.fatal_errors:
+            raise Exception(error)
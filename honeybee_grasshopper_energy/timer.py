@@ -0,0 +1,217 @@
+# coding=utf-8
+"""Timing of the stages of a component solve."""
+from __future__ import division
+
+import os
+import json
+import time
+
+try:  # the process of Rhino in .NET
+    from System.Diagnostics import Process
+except ImportError:  # outside of .NET
+    Process = None
+
+
+class StageTimer(object):
+    """Record the wall time, CPU time and memory change of each stage of a solve.
+
+    Starting a stage ends the previous one such that the stages can be marked
+    along the main flow of a component. The CPU time and the change in the
+    working set memory are those of the Rhino process. Processes that are run
+    outside of Rhino (eg. EnergyPlus) are only included for the stages in
+    which their statistics are recorded with the external method.
+
+    Args:
+        component: The name of the component that is timed.
+        version: The version of the component that is timed.
+
+    Properties:
+        * component
+        * version
+        * stages
+        * totals
+    """
+
+    def __init__(self, component, version):
+        self.component = component
+        self.version = version
+        self.stages = []  # stage names in the order that they were first started
+        self.totals = {}  # dictionaries of the statistics by stage
+        self._process = Process.GetCurrentProcess() if Process is not None else None
+        self._current, self._wall, self._cpu = None, None, None
+        self._memory_stage, self._memory = None, None
+
+    def start(self, stage):
+        """End the current stage and start a new one."""
+        self._switch(stage, True)
+
+    def stop(self):
+        """End the current stage without starting a new one."""
+        self._switch(None, True)
+
+    def timed(self, stage, iterable, batch_size=100):
+        """Yield the items of an iterable, charging the time to produce them to a stage.
+
+        The time spent by the consumer of the items stays with the current stage.
+        Reading the CPU time of the process is much slower than reading the
+        clock, so only the wall time is measured around each item. The CPU time
+        is read once per batch of items and it is split between the two stages
+        in proportion to their wall time within the batch. Any change in memory
+        stays with the current stage as well since the working set is only
+        measured when a stage is started or stopped.
+
+        Args:
+            stage: The name of the stage that is charged with producing the items.
+            iterable: An iterable of the items, which is usually a generator.
+            batch_size: The number of items after which the CPU time is read.
+        """
+        self._switch(self._current)  # start the first batch from now
+        self._totals(stage)
+        iterator = iter(iterable)
+        stage_wall, count = 0., 0
+        try:
+            while True:
+                start = time.time()
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    stage_wall += time.time() - start
+                    return
+                stage_wall += time.time() - start
+                count += 1
+                if count == batch_size:
+                    self._split(stage, stage_wall)
+                    stage_wall, count = 0., 0
+                yield item
+        finally:
+            self._split(stage, stage_wall)
+
+    def external(self, stage, cpu_time, peak_memory):
+        """Record the statistics of a process that was run outside of Rhino.
+
+        Args:
+            stage: The name of the stage in which the process was run.
+            cpu_time: The CPU time of the process in seconds.
+            peak_memory: The peak working set of the process in MB.
+        """
+        totals = self._totals(stage)
+        totals['external_cpu_time'] = totals.get('external_cpu_time', 0.) + cpu_time
+        totals['external_peak_memory'] = \
+            max(totals.get('external_peak_memory', 0.), peak_memory)
+
+    def report(self):
+        """Print the statistics of each stage to the report."""
+        for stage in self.stages:
+            totals = self.totals[stage]
+            message = '{}: {:.2f} seconds wall, {:.2f} seconds CPU, {:+.0f} MB'.format(
+                stage, totals['wall_time'], totals['cpu_time'], totals['memory_change'])
+            if 'external_cpu_time' in totals:
+                message += ' (external process: {:.2f} seconds CPU, {:.0f} MB ' \
+                    'peak)'.format(totals['external_cpu_time'],
+                                   totals['external_peak_memory'])
+            print(message)
+
+    def write_log(self, folder, **info):
+        """Append the stage statistics as one JSON line to a log file in a folder.
+
+        Args:
+            folder: The folder in which the simulation_timing.jsonl is written.
+            info: Any other keyword arguments to be written with the stage times.
+        """
+        stages = []
+        for stage in self.stages:
+            stage_log = {'stage': stage}
+            stage_log.update(self.totals[stage])
+            stages.append(stage_log)
+        log = {
+            'component': self.component,
+            'version': self.version,
+            'date': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'stages': stages
+        }
+        log.update(info)
+        if not os.path.isdir(folder):
+            os.makedirs(folder)
+        with open(os.path.join(folder, 'simulation_timing.jsonl'), 'a') as log_file:
+            log_file.write(json.dumps(log) + '\n')
+
+    def _totals(self, stage):
+        """Get the dictionary of statistics of a stage, adding the stage if it is new."""
+        if stage not in self.totals:
+            self.stages.append(stage)
+            self.totals[stage] = {'wall_time': 0., 'cpu_time': 0., 'memory_change': 0.}
+        return self.totals[stage]
+
+    def _switch(self, stage, memory=False):
+        """Charge the time since the last switch to the current stage.
+
+        Args:
+            stage: The name of the stage to be charged from now on. None to stop.
+            memory: Boolean to note whether the working set of the process should
+                be measured and its change charged to the stage that was last
+                started. This is slower than getting the time and so it is only
+                done when stages are started or stopped.
+        """
+        wall, cpu = time.time(), self._cpu_time()
+        if self._current is not None:
+            totals = self.totals[self._current]
+            totals['wall_time'] += wall - self._wall
+            totals['cpu_time'] += cpu - self._cpu
+        if memory:
+            working_set = self._working_set()
+            if self._memory_stage is not None:
+                self.totals[self._memory_stage]['memory_change'] += \
+                    working_set - self._memory
+            self._memory_stage, self._memory = stage, working_set
+        if stage is not None:
+            self._totals(stage)
+        self._current, self._wall, self._cpu = stage, wall, cpu
+
+    def _split(self, stage, stage_wall):
+        """Split the time since the last switch between a stage and the current stage.
+
+        Args:
+            stage: The name of the stage that produced items since the last switch.
+            stage_wall: The wall time in seconds that was spent producing them.
+        """
+        wall, cpu = time.time(), self._cpu_time()
+        batch_wall, batch_cpu = wall - self._wall, cpu - self._cpu
+        fraction = min(stage_wall / batch_wall, 1.) if batch_wall > 0 else 1.
+        totals = self.totals[stage]
+        totals['wall_time'] += stage_wall
+        totals['cpu_time'] += batch_cpu * fraction
+        if self._current is not None:
+            totals = self.totals[self._current]
+            totals['wall_time'] += max(batch_wall - stage_wall, 0.)
+            totals['cpu_time'] += batch_cpu * (1 - fraction)
+        self._wall, self._cpu = wall, cpu
+
+    def _cpu_time(self):
+        """Get the CPU time of the current process in seconds."""
+        if self._process is not None:
+            return self._process.TotalProcessorTime.TotalSeconds
+        times = os.times()
+        return times[0] + times[1]
+
+    def _working_set(self):
+        """Get the working set memory of the current process in MB.
+
+        Outside of .NET, this is the resident memory on Linux and it is 0 on
+        other systems, where no change in memory is recorded.
+        """
+        if self._process is not None:
+            self._process.Refresh()
+            return self._process.WorkingSet64 / 1048576.
+        try:
+            with open('/proc/self/statm') as statm:
+                pages = int(statm.read().split()[1])
+            return pages * os.sysconf('SC_PAGE_SIZE') / 1048576.
+        except (IOError, OSError, ValueError, AttributeError):
+            return 0.
+
+    def ToString(self):
+        """Overwrite .NET ToString."""
+        return self.__repr__()
+
+    def __repr__(self):
+        return 'StageTimer: {}'.format(self.component)
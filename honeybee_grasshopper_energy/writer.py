@@ -0,0 +1,350 @@
+# coding=utf-8
+"""Streaming IDF writer built from the object writers of honeybee_energy.
+
+The objects of a Model are yielded in the same order as
+honeybee_energy.writer.model_to_idf and the IDF text of each object comes from
+the same library functions and methods, such that the streamed IDF matches the
+text of model.to.idf.
+"""
+import os
+import sys
+import json
+import hashlib
+
+from honeybee.facetype import AirBoundary
+
+from honeybee_energy.construction.shade import ShadeConstruction
+from honeybee_energy.writer import generate_idf_string, room_to_idf, face_to_idf, \
+    aperture_to_idf, door_to_idf, shade_to_idf
+
+# the loads of a Room that are written into its IDF text
+LOAD_TYPES = ('people', 'lighting', 'electric_equipment', 'gas_equipment',
+              'infiltration', 'ventilation')
+
+
+def content_hash(obj_dict):
+    """Get a hash for the content of an object's dictionary representation."""
+    return hashlib.md5(json.dumps(obj_dict, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def cached_fragment(get_key, translate, fragments, used_fragments):
+    """Get the IDF text of an object from the fragment cache or by translating it.
+
+    Args:
+        get_key: A function with no arguments that returns the cache key of
+            the object, which should change whenever its IDF text changes.
+        translate: A function with no arguments that returns the IDF text of
+            the object. This is only called if the key is not in the cache.
+        fragments: A dictionary of IDF text from the previous translation. If
+            None, the object will always be translated.
+        used_fragments: A dictionary to which the IDF text will be added
+            so that it can be used as the cache of the next translation.
+    """
+    if fragments is None:
+        return translate()
+    key = get_key()
+    try:
+        idf_str = fragments[key]
+    except KeyError:
+        idf_str = translate()
+    used_fragments[key] = idf_str
+    return idf_str
+
+
+def fixed_interval_to_idf(schedule, schedule_directory, written_csvs):
+    """Get the Schedule:File text of a ScheduleFixedInterval, writing its CSV once.
+
+    Schedules with the same values at their timestep share a single CSV file,
+    which is written by the first schedule that uses it.
+
+    Args:
+        schedule: A ScheduleFixedInterval to be translated to IDF.
+        schedule_directory: The directory to which the CSV files are written.
+        written_csvs: A dictionary of the CSV files written so far, with hashes
+            of their contents as keys. Any new CSV file will be added to it.
+    """
+    values = schedule.values_at_timestep(schedule.timestep)
+    csv_str = ',\n'.join(str(val) for val in values)
+    csv_hash = hashlib.md5(csv_str.encode('utf-8')).hexdigest()
+    try:
+        file_path = written_csvs[csv_hash]
+    except KeyError:  # the first schedule with these values writes the CSV
+        written_csvs[csv_hash] = os.path.join(schedule_directory, '{}.csv'.format(
+            schedule.identifier.replace(' ', '_')))
+        return schedule.to_idf(schedule_directory)
+
+    # generate the IDF string pointing to the CSV of the first schedule
+    shc_typ = schedule.schedule_type_limit.identifier if \
+        schedule.schedule_type_limit is not None else ''
+    num_hrs = 8760 if not schedule.is_leap_year else 8784
+    interp = 'No' if not schedule.interpolate else 'Yes'
+    min_per_step = int(60 / schedule.timestep)
+    fields = (schedule.identifier, shc_typ, file_path, 1, 0, num_hrs, 'Comma',
+              interp, min_per_step)
+    comments = ('schedule name', 'schedule type limits', 'file name', 'column number',
+                'rows to skip', 'number of hours of data', 'column separator',
+                'interpolate to timestep', 'minutes per item')
+    return generate_idf_string('Schedule:File', fields, comments)
+
+
+def object_key(obj):
+    """Get a cache key for a schedule, construction or material.
+
+    The key uses the __hash__ of the honeybee_energy object, which covers all of
+    the properties that are compared by its __eq__. This is much faster than
+    serializing the object to build the key.
+    """
+    return obj.__class__.__name__, obj.identifier, hash(obj)
+
+
+def shared_key(obj, shared_keys):
+    """Get the hash of an object that is shared by many Rooms, computing it once.
+
+    Args:
+        obj: An object with a __hash__ such as a load or a construction. None
+            is also accepted.
+        shared_keys: A dictionary of hashes computed during the current
+            translation, with the id of each object as keys. The objects are all
+            held by the Model during the translation so their ids are unique.
+    """
+    if obj is None:
+        return None
+    try:
+        return shared_keys[id(obj)]
+    except KeyError:
+        obj_hash = shared_keys[id(obj)] = hash(obj)
+        return obj_hash
+
+
+def boundary_condition_key(bc):
+    """Get a tuple of the properties of a boundary condition written into the IDF."""
+    return (bc.name, bc.sun_exposure_idf, bc.wind_exposure_idf, str(bc.view_factor),
+            getattr(bc, 'boundary_condition_objects', None))
+
+
+def shade_key(shade, shared_keys):
+    """Get a tuple of the Shade content that affects its IDF text.
+
+    This includes the hash of the construction since its reflectances are
+    written into the ShadingProperty:Reflectance of the Shade. The parent of
+    the Shade is not included and must be covered by the key of the parent.
+    """
+    energy_prop = shade.properties.energy
+    trans_sch = energy_prop.transmittance_schedule
+    return (shade.identifier, shade.vertices, energy_prop.construction.is_default,
+            shared_key(energy_prop.construction, shared_keys),
+            trans_sch.identifier if trans_sch is not None else None)
+
+
+def room_key(room, shared_keys):
+    """Get a cache key for all of the Room content that affects its IDF text.
+
+    Only small inputs are hashed: the identifiers, vertices and boundary
+    conditions of the geometry along with the hashes of the loads, setpoint and
+    constructions. The loads and constructions are usually shared by many Rooms
+    so their hashes are only computed once per translation. The hashes cover
+    the values of the loads and their schedules, so editing a ProgramType in
+    place changes the key even though the identifiers of the Room stay the same.
+
+    Args:
+        room: A honeybee Room.
+        shared_keys: A dictionary of the hashes of shared objects, which is
+            passed to shared_key.
+    """
+    energy_prop = room.properties.energy
+    loads = [getattr(energy_prop, load_type) for load_type in LOAD_TYPES]
+    setpoint = energy_prop.setpoint if energy_prop.is_conditioned else None
+    content = [room.display_name, room.multiplier, shared_key(setpoint, shared_keys),
+               tuple(shared_key(load, shared_keys) for load in loads)]
+    for face in room.faces:
+        sub_faces = tuple(
+            (sub_f.identifier, getattr(sub_f, 'is_glass', None), sub_f.vertices,
+             shared_key(sub_f.properties.energy.construction, shared_keys),
+             boundary_condition_key(sub_f.boundary_condition),
+             tuple(shade_key(shade, shared_keys) for shade in sub_f.outdoor_shades))
+            for sub_f in face.apertures + face.doors)
+        content.append((
+            face.identifier, face.type.name, face.vertices,
+            shared_key(face.properties.energy.construction, shared_keys),
+            boundary_condition_key(face.boundary_condition), sub_faces,
+            tuple(shade_key(shade, shared_keys) for shade in face.outdoor_shades)))
+    content.extend(shade_key(shade, shared_keys) for shade in room.outdoor_shades)
+    return room.identifier, hash(tuple(content))
+
+
+def room_idf_strings(room):
+    """Get a list of IDF strings for a Room and all of its Faces and sub-faces."""
+    room_str = [room_to_idf(room)]
+    for face in room.faces:
+        room_str.append(face_to_idf(face))
+        if isinstance(face.type, AirBoundary):  # write the air mixing objects
+            air_constr = face.properties.energy.construction
+            adj_room = face.boundary_condition.boundary_condition_objects[-1]
+            room_str.append(air_constr.to_air_mixing_idf(face, adj_room))
+        for ap in face.apertures:
+            room_str.append(aperture_to_idf(ap))
+            room_str.extend(shade_to_idf(shade) for shade in ap.outdoor_shades)
+        for dr in face.doors:
+            room_str.append(door_to_idf(dr))
+            room_str.extend(shade_to_idf(shade) for shade in dr.outdoor_shades)
+        room_str.extend(shade_to_idf(shade) for shade in face.outdoor_shades)
+    room_str.extend(shade_to_idf(shade) for shade in room.outdoor_shades)
+    return room_str
+
+
+def hard_sized_hvac(hvac_str, hvac_sizes):
+    """Replace the Autosize fields in the IDF text of an ideal air system with sizes.
+
+    Args:
+        hvac_str: The IDF text of a HVACTemplate:Zone:IdealLoadsAirSystem.
+        hvac_sizes: A dictionary with upper case zone names as keys and
+            dictionaries of sizes as values. The keys of each of the sizes are
+            the comments of the IDF fields to which they are assigned. The
+            hvac_str is returned as it is if its zone is not in the dictionary.
+    """
+    lines = hvac_str.split('\n')
+    zone_name = [line.split(',')[0].strip() for line in lines
+                 if line.endswith('!- zone name')][0]
+    sizes = hvac_sizes.get(zone_name.upper())
+    if sizes is None:  # no sizes for the zone; leave it to be autosized
+        return hvac_str
+    for i, line in enumerate(lines):
+        value, _, comment = line.partition('!- ')
+        value = value.strip().rstrip(',;')
+        if comment in sizes and value.lower() == 'autosize':
+            lines[i] = line.replace(value, str(sizes[comment]), 1)
+    return '\n'.join(lines)
+
+
+def model_to_idf_objects(model, schedule_directory, solar_distribution,
+                         fragments=None, used_fragments=None, hvac_sizes=None):
+    """Yield the IDF text of a Model one object at a time.
+
+    Joining the yielded strings with blank lines gives the same text as
+    model.to.idf, except that ScheduleFixedIntervals with the same values share
+    a single CSV file. When fragments are input, only the IDF text of objects
+    whose keys are not found in the fragments is translated again. The keys
+    come from object_key and room_key, which are much faster than translating
+    the objects.
+    ScheduleFixedIntervals are always translated since this also writes their
+    CSV files.
+
+    Args:
+        model: A honeybee Model to be translated to IDF.
+        schedule_directory: A directory to which any file-based schedules are written.
+        solar_distribution: Text for the solar distribution of the Building object.
+        fragments: An optional dictionary of IDF text from the previous
+            translation, with the cache keys of each object as keys.
+        used_fragments: An optional dictionary to be filled with the IDF text of
+            all objects in the model, which should be used as the fragments
+            of the next translation.
+        hvac_sizes: An optional dictionary of sizes from hvac_sizes_from_sql,
+            which will be written into the ideal air systems in place of Autosize.
+    """
+    # make sure the model is in meters and, if it's not, duplicate and scale it
+    if model.units != 'Meters':
+        model = model.duplicate()  # duplicate the model to avoid mutating the input
+        model.convert_to_units('Meters')
+
+    # write the building object into the string
+    yield '!-   =======================================\n' \
+        '!-   ================ MODEL ================\n' \
+        '!-   =======================================\n'
+    yield model.properties.energy.building_idf(solar_distribution)
+
+    # write all of the schedules and type limits
+    sched_strs, type_limits, used_day_sched_ids, written_csvs = [], [], set(), {}
+    shared_keys = {}
+    for sched in model.properties.energy.schedules:
+        t_lim = sched.schedule_type_limit
+        try:  # ScheduleRuleset or ScheduleConstant
+            day_scheds = sched.day_schedules
+        except AttributeError:  # ScheduleFixedInterval
+            sched_strs.append(
+                fixed_interval_to_idf(sched, schedule_directory, written_csvs))
+        else:
+            year_schedule, week_schedules = cached_fragment(
+                lambda: object_key(sched), sched.to_idf, fragments, used_fragments)
+            if week_schedules is None:  # ScheduleConstant
+                sched_strs.append(year_schedule)
+            else:  # ScheduleYear
+                # check that day schedules aren't referenced by other model schedules
+                day_strs = []
+                for day in day_scheds:
+                    if day.identifier not in used_day_sched_ids:
+                        t_lim_id = t_lim.identifier if t_lim is not None else None
+                        day_strs.append(cached_fragment(
+                            lambda: (object_key(day), t_lim_id),
+                            lambda: day.to_idf(t_lim), fragments, used_fragments))
+                        used_day_sched_ids.add(day.identifier)
+                sched_strs.extend([year_schedule] + week_schedules + day_strs)
+        if t_lim is not None and not any(t is t_lim for t in type_limits):
+            type_limits.append(t_lim)
+    yield '!-   ========= SCHEDULE TYPE LIMITS =========\n'
+    for type_limit in set(type_limits):
+        yield type_limit.to_idf()
+    yield '!-   ============== SCHEDULES ==============\n'
+    for sched_str in sched_strs:
+        yield sched_str
+
+    # write all of the materials and constructions
+    materials = []
+    construction_strs = []
+    for constr in model.properties.energy.constructions:
+        if isinstance(constr, ShadeConstruction):
+            continue  # ShadeConstructions are written with the shades
+        try:
+            materials.extend(constr.materials)
+        except AttributeError:  # AirBoundaryConstruction
+            pass
+        construction_strs.append(cached_fragment(
+            lambda: object_key(constr), constr.to_idf, fragments, used_fragments))
+    yield '!-   ============== MATERIALS ==============\n'
+    for mat in set(materials):
+        yield cached_fragment(lambda: object_key(mat), mat.to_idf, fragments,
+                              used_fragments)
+    yield '!-   ============ CONSTRUCTIONS ============\n'
+    for constr_str in construction_strs:
+        yield constr_str
+
+    # write all of the HVAC systems
+    yield '!-   ============ HVAC SYSTEMS ============\n'
+    for hvac in model.properties.energy.hvacs:
+        try:
+            hvac_str = hvac.to_idf()
+        except AttributeError:
+            raise AttributeError(
+                'HVAC system type "{}" does not support direct translation to IDF. '
+                'Try using the export to OpenStudio workflow.'.format(
+                    hvac.__class__.__name__))
+        yield hvac_str if hvac_sizes is None else hard_sized_hvac(hvac_str, hvac_sizes)
+
+    # write all of the zone geometry
+    yield '!-   ============ ZONE GEOMETRY ============\n'
+    for room in model.rooms:
+        for room_str in cached_fragment(
+                lambda: room_key(room, shared_keys), lambda: room_idf_strings(room),
+                fragments, used_fragments):
+            yield room_str
+
+    # write all context shade geometry
+    yield '!-   ========== CONTEXT GEOMETRY ==========\n'
+    for shade in model.orphaned_shades:
+        yield cached_fragment(
+            lambda: (shade.identifier, hash(shade_key(shade, shared_keys))),
+            lambda: shade_to_idf(shade), fragments, used_fragments)
+
+
+def write_idf(idf_path, idf_strs):
+    """Stream IDF strings into a file, separating each of them with a blank line.
+
+    The file is written through a buffered handle so that the full IDF text is
+    never held in memory. The result is the same as writing '\\n\\n'.join(idf_strs).
+    """
+    write_mode = 'wb' if sys.version_info < (3, 0) else 'w'  # match ladybug.futil
+    with open(idf_path, write_mode, 1048576) as idf_file:
+        for i, idf_str in enumerate(idf_strs):
+            if i != 0:
+                idf_file.write('\n\n')
+            idf_file.write(str(idf_str))
+    return idf_path
@@ -1 +0,0 @@
-"""Disregard test running on Travis for now."""
@@ -0,0 +1,266 @@
+# coding=utf-8
+"""Benchmark of the energy modeling workflow of the sample files, run headlessly.
+
+The samples (eg. shoe_box_energy_model.gh) assign loads, schedules and
+constructions to Rooms, write an IDF and read the results of the simulation.
+This script does the same with Models of 1, 10, 100 and 1000 boxes, which are
+pushed through the component sources with the harness. The time and the peak
+memory of each component are compared to a stored baseline. EnergyPlus is not
+run; the results are read from an SQL file with the tables of EnergyPlus and
+made-up values for one zone per Room.
+
+The translation of the Model by model.to.idf is also compared to the incremental
+translation of HB Model to IDF, once with an empty cache (cold) and once with
+the cache of the run before it (warm). The warm run must be faster than
+model.to.idf, which is checked with --check.
+
+Usage:
+    python tests/benchmark.py [--scales 1 10] [--repeat 3] [--save] [--check]
+"""
+from __future__ import division
+
+import os
+import gc
+import sys
+import json
+import shutil
+import platform
+import argparse
+import tempfile
+import tracemalloc
+from timeit import default_timer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import harness  # noqa: E402
+harness.install_stubs()
+
+from ladybug.dt import Date  # noqa: E402
+from ladybug.location import Location  # noqa: E402
+from ladybug.designday import DesignDay  # noqa: E402
+from ladybug.ddy import DDY  # noqa: E402
+from ladybug_geometry.geometry3d.pointvector import Point3D  # noqa: E402
+from honeybee.model import Model  # noqa: E402
+from honeybee.room import Room  # noqa: E402
+
+from honeybee_grasshopper_energy.writer import model_to_idf_objects  # noqa: E402
+
+import sqlfiles  # noqa: E402
+
+SCALES = (1, 10, 100, 1000)
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                        'benchmark_baseline.json')
+RESULT_DAYS = 31  # days of results in the SQL file, which grows with every Room
+MIN_SECONDS = 0.01  # differences in time below this are noise and never reported
+SOLAR_DISTRIBUTION = 'FullInteriorAndExteriorWithReflections'
+
+
+def shoe_box_rooms(count):
+    """Get a list of 5 x 5 x 3 meter Rooms with a south window on a square grid."""
+    columns = int(round(count ** 0.5)) or 1
+    rooms = []
+    for i in range(count):
+        origin = Point3D((i % columns) * 5, (i // columns) * 5, 0)
+        room = Room.from_box('Shoe_Box_{}'.format(i), 5, 5, 3, origin=origin)
+        room.faces[1].apertures_by_ratio(0.4, 0.01)
+        rooms.append(room)
+    return rooms
+
+
+def write_weather(folder):
+    """Write the .ddy file of a weather file into a folder and get the EPW path."""
+    location = Location('Boston', latitude=42.4, longitude=-71.0, time_zone=-5)
+    heating = DesignDay.from_design_day_properties(
+        'Heating 99.6%', 'WinterDesignDay', location, Date(1, 21), -15, 0,
+        'Wetbulb', -15, 101325, 4, 300, 'ASHRAEClearSky', [0])
+    cooling = DesignDay.from_design_day_properties(
+        'Cooling .4%', 'SummerDesignDay', location, Date(7, 21), 33, 9,
+        'Wetbulb', 23, 101325, 4, 230, 'ASHRAETau', [0.45, 2.1])
+    DDY(location, [heating, cooling]).save(os.path.join(folder, 'boston.ddy'))
+    return os.path.join(folder, 'boston.epw')
+
+
+def workflow(count, folder):
+    """Yield the component runs of the workflow of the samples for a number of Rooms.
+
+    Each item is a tuple of the component name and a function without inputs
+    that runs the component. Each function uses the outputs of the one
+    before it, so the functions must be run in order.
+    """
+    state = {'rooms': shoe_box_rooms(count)}
+    epw_file = write_weather(folder)
+    sql = sqlfiles.result_sql(os.path.join(folder, 'eplusout.sql'), zones=count,
+                              surfaces=0, days=RESULT_DAYS)
+
+    def run(name, inputs, output=None):
+        outputs, _ = harness.run_component(name, inputs)
+        if output is not None:
+            state[output[1]] = outputs[output[0]]
+
+    def translate(fragments=None):
+        used_fragments = {} if fragments is not None else None
+        for _ in model_to_idf_objects(state['model'], folder, SOLAR_DISTRIBUTION,
+                                      fragments, used_fragments):
+            pass
+        state['fragments'] = used_fragments
+
+    yield 'HB Apply ProgramType', lambda: run(
+        'HB Apply ProgramType',
+        {'_rooms': state['rooms'], '_program': 'Generic Office Program'},
+        ('rooms', 'rooms'))
+    yield 'HB Apply Load Values', lambda: run(
+        'HB Apply Load Values',
+        {'_room_or_program': state['rooms'], 'lighting_per_floor_': 8.0,
+         'electric_per_floor_': 10.0}, ('mod_obj', 'rooms'))
+    yield 'HB Weekly Schedule', lambda: run(
+        'HB Weekly Schedule',
+        dict([(day, [0.1] * 8 + [1] * 10 + [0.1] * 6) for day in
+              ('_mon', '_tue', '_wed', '_thu', '_fri')] +
+             [('_sun', [0.1]), ('_sat', [0.1]), ('_holiday_', []),
+              ('_summer_des_', []), ('_winter_des_', []), ('_name', 'Office Lights')]),
+        ('schedule', 'schedule'))
+    yield 'HB Apply Room Schedules', lambda: run(
+        'HB Apply Room Schedules',
+        {'_room_or_program': state['rooms'], 'lighting_sch_': state['schedule']},
+        ('mod_obj', 'rooms'))
+    yield 'HB Apply ConstructionSet', lambda: run(
+        'HB Apply ConstructionSet',
+        {'_rooms': state['rooms'], '_constr_set': 'Default Generic Construction Set'},
+        ('rooms', 'rooms'))
+    yield 'HB IdealAir', lambda: run(
+        'HB IdealAir', {'_rooms': state['rooms']}, ('rooms', 'rooms'))
+    yield 'HB Model to IDF', lambda: run(
+        'HB Model to IDF',
+        {'_model': state.setdefault(
+            'model', Model('Shoe_Box_{}'.format(count), state['rooms'])),
+         '_epw_file': epw_file, '_folder_': folder, '_write': True})
+    yield 'model.to.idf', lambda: state['model'].to.idf(
+        state['model'], schedule_directory=folder,
+        solar_distribution=SOLAR_DISTRIBUTION)
+    yield 'Incremental IDF (cold)', lambda: translate({})
+    yield 'Incremental IDF (warm)', lambda: translate(state['fragments'])
+    yield 'HB Read Room Energy Result', lambda: run(
+        'HB Read Room Energy Result', {'_sql': sql})
+    yield 'HB Read Batch Result', lambda: run(
+        'HB Read Batch Result',
+        {'_sqls': [sql], '_output_names': [row[1] for row in sqlfiles.ZONE_OUTPUTS]})
+
+
+def measure(count, repeat):
+    """Get the fastest time and the peak memory of each component for a number of Rooms.
+
+    The time is measured without tracing the memory, which slows Python down,
+    and the memory is then traced in a separate run of the workflow. The
+    cache of the SQL readers is cleared before each run such that each
+    result component reads its file from scratch.
+
+    Returns:
+        A dictionary with the name of each component as keys and dictionaries
+        with its seconds and peak_mb as values.
+    """
+    results = {}
+    for trace in [False] * repeat + [True]:
+        folder = tempfile.mkdtemp()
+        try:
+            harness.sticky.clear()
+            for name, run in workflow(count, folder):
+                gc.collect()
+                if trace:
+                    tracemalloc.start()
+                start = default_timer()
+                run()
+                seconds = default_timer() - start
+                stage = results.setdefault(name, {'seconds': seconds, 'peak_mb': 0})
+                if trace:
+                    peak = tracemalloc.get_traced_memory()[1] / 1048576.
+                    stage['peak_mb'] = round(peak, 2)
+                    tracemalloc.stop()
+                else:
+                    stage['seconds'] = round(min(stage['seconds'], seconds), 4)
+        finally:
+            shutil.rmtree(folder)
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """Get the lines of a report that compares results with a baseline.
+
+    Returns:
+        A tuple with two items.
+
+        -   lines: A list of text for the lines of the report.
+        -   slower: A list of text for the components that took longer than
+            the baseline by more than the tolerance and MIN_SECONDS, along with
+            any warm incremental translation that was slower than model.to.idf.
+    """
+    lines = ['{:>5}  {:<28}{:>10}{:>10}{:>8}{:>10}{:>10}'.format(
+        'rooms', 'component', 'seconds', 'baseline', 'ratio', 'peak MB', 'baseline')]
+    slower = []
+    for scale in sorted(results, key=int):
+        for name, stage in results[scale].items():
+            base = baseline.get(scale, {}).get(name)
+            ratio = stage['seconds'] / base['seconds'] \
+                if base is not None and base['seconds'] > 0 else None
+            lines.append('{:>5}  {:<28}{:>10.3f}{:>10}{:>8}{:>10.1f}{:>10}'.format(
+                scale, name, stage['seconds'],
+                '-' if base is None else '{:.3f}'.format(base['seconds']),
+                '-' if ratio is None else '{:.2f}'.format(ratio), stage['peak_mb'],
+                '-' if base is None else '{:.1f}'.format(base['peak_mb'])))
+            if ratio is not None and ratio > 1 + tolerance and \
+                    stage['seconds'] - base['seconds'] > MIN_SECONDS:
+                slower.append('{} with {} rooms ({:.2f}x)'.format(name, scale, ratio))
+        warm, full = results[scale].get('Incremental IDF (warm)'), \
+            results[scale].get('model.to.idf')
+        if warm is not None and full is not None and \
+                warm['seconds'] - full['seconds'] > MIN_SECONDS:
+            slower.append('Incremental IDF (warm) with {} rooms is slower than '
+                          'model.to.idf'.format(scale))
+    return lines, slower
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--scales', type=int, nargs='+', default=SCALES,
+                        help='The numbers of Rooms of the Models. '
+                        '(Default: %(default)s).')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='The number of timed runs of which the fastest is '
+                        'reported. (Default: %(default)s).')
+    parser.add_argument('--baseline', default=BASELINE,
+                        help='Path to the JSON file of the baseline.')
+    parser.add_argument('--save', action='store_true',
+                        help='Write the results to the baseline file.')
+    parser.add_argument('--check', action='store_true',
+                        help='Exit with an error if any component is slower than '
+                        'the baseline by more than the tolerance.')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='The fraction by which a component can be slower '
+                        'than the baseline. (Default: %(default)s).')
+    args = parser.parse_args(args)
+
+    baseline = {}
+    if os.path.isfile(args.baseline):
+        with open(args.baseline) as base_file:
+            baseline = json.load(base_file)['results']
+    results = {}
+    for scale in args.scales:
+        results[str(scale)] = measure(scale, args.repeat)
+
+    lines, slower = compare(results, baseline, args.tolerance)
+    print('Python {} on {}'.format(platform.python_version(), platform.platform()))
+    print('\n'.join(lines))
+    if args.save:
+        with open(args.baseline, 'w') as base_file:
+            json.dump({'python': platform.python_version(),
+                       'platform': platform.platform(), 'results': results},
+                      base_file, indent=2, sort_keys=True)
+        print('Baseline written to {}'.format(args.baseline))
+    if len(slower) != 0:
+        print('Slower than expected:\n{}'.format('\n'.join(slower)))
+        if args.check:
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,11 @@
+# coding=utf-8
+"""Setup of the tests that run the package and the components outside of Rhino."""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import harness  # noqa: E402
+
+# stub the Rhino modules before honeybee_grasshopper_energy is first imported
+harness.install_stubs()
@@ -0,0 +1,239 @@
+# coding=utf-8
+"""Run the Python source of a component outside of Rhino and Grasshopper.
+
+The harness stubs the modules that only exist in Rhino such that a component
+script can be run in CPython with a dictionary of inputs. The ladybug_rhino
+geometry converters pass their input through unchanged, Parallel.ForEach runs
+its items one after the other and the warnings of give_warning are collected.
+Everything in honeybee_grasshopper_energy and the core libraries is the real
+code, which makes it possible to check and profile the components on any machine.
+"""
+import io
+import os
+import re
+import ast
+import sys
+import uuid
+import types
+import contextlib
+import multiprocessing
+
+SRC_FOLDER = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    'honeybee_grasshopper_energy', 'src')
+
+# the name of an input or output at the start of a line of a component docstring
+IO_NAME = re.compile(r'^ {8,11}(\w+):')
+
+sticky = {}  # the scriptcontext.sticky shared by all components that are run
+warnings = []  # the warnings given by the component that was last run
+
+
+class Component(object):
+    """Stand-in for the GH_Component that a component script can decorate."""
+
+    def __init__(self):
+        self.InstanceGuid = uuid.uuid4()
+
+    def AddRuntimeMessage(self, level, message):
+        warnings.append(message)
+
+
+class GhEnv(object):
+    """Stand-in for the ghenv global of a GhPython component."""
+
+    def __init__(self):
+        self.Component = Component()
+
+
+class Environment(object):
+    """Stand-in for System.Environment."""
+    ProcessorCount = multiprocessing.cpu_count()
+
+
+class RhinoApp(object):
+    """Stand-in for Rhino.RhinoApp, which has no command prompt outside of Rhino."""
+
+    @staticmethod
+    def SetCommandPrompt(prompt):
+        pass
+
+
+class ParallelOptions(object):
+    """Stand-in for System.Threading.Tasks.ParallelOptions."""
+    MaxDegreeOfParallelism = -1
+
+
+class Parallel(object):
+    """Stand-in for System.Threading.Tasks.Parallel that runs items in order."""
+
+    @staticmethod
+    def ForEach(items, *args):
+        body = args[-1]
+        for item in items:
+            body(item)
+
+
+class SemaphoreSlim(object):
+    """Stand-in for System.Threading.SemaphoreSlim without any other threads."""
+
+    def __init__(self, initial_count, max_count=None):
+        self.CurrentCount = initial_count
+
+    def Wait(self):
+        self.CurrentCount -= 1
+
+    def Release(self):
+        self.CurrentCount += 1
+
+
+def _module(name, **attributes):
+    """Register a stub module under a name unless a real module can be imported."""
+    if name in sys.modules:
+        return sys.modules[name]
+    module = types.ModuleType(name)
+    module.__dict__.update(attributes)
+    sys.modules[name] = module
+    if '.' in name:
+        parent, child = name.rsplit('.', 1)
+        setattr(_module(parent), child, module)
+    return module
+
+
+def _passthrough(name):
+    """Get a stand-in for a ladybug_rhino function that returns its first input."""
+    def passthrough(*args, **kwargs):
+        return args[0] if len(args) != 0 else None
+    passthrough.__name__ = name
+    return passthrough
+
+
+def _converters(name):
+    """Register a ladybug_rhino module where every function passes its input through."""
+    module = _module(name)
+    if not hasattr(module, '__getattr__'):
+        module.__getattr__ = _passthrough
+    return module
+
+
+def _required_inputs(component):
+    """Get the names of the required inputs of a component (eg. _model)."""
+    return [name for name in component.Inputs
+            if name.startswith('_') and not name.endswith('_')]
+
+
+def all_required_inputs(component):
+    """Check that all of the required inputs of a component have data."""
+    is_input = True
+    for name in _required_inputs(component):
+        if component.Values.get(name) in (None, []):
+            warnings.append('Input parameter {} failed to collect data!'.format(name))
+            is_input = False
+    return is_input
+
+
+def give_warning(component, message):
+    """Collect a warning that would be shown on the component."""
+    warnings.append(message)
+
+
+def install_stubs():
+    """Register the stand-ins for the modules that only exist in Rhino.
+
+    Modules that can already be imported (eg. when run in Rhino) are left as
+    they are. The stubs are installed before honeybee_grasshopper_energy is
+    imported such that its sticky is the sticky of the harness.
+    """
+    try:
+        import scriptcontext  # noqa: F401
+    except ImportError:
+        _module('scriptcontext', sticky=sticky, doc=None)
+    try:
+        import ladybug_rhino.grasshopper  # noqa: F401
+    except ImportError:
+        _module('ladybug_rhino.grasshopper', all_required_inputs=all_required_inputs,
+                give_warning=give_warning)
+        _module('ladybug_rhino.config', units_abbreviation=lambda: 'm',
+                units_system=lambda: 'Meters', tolerance=0.01, angle_tolerance=1.0)
+        for name in ('togeometry', 'fromgeometry', 'fromobjects', 'text',
+                     'intersect', 'colorize'):
+            _converters('ladybug_rhino.{}'.format(name))
+    try:
+        import System  # noqa: F401
+    except ImportError:
+        _module('System', Environment=Environment)
+        _module('System.Threading', SemaphoreSlim=SemaphoreSlim)
+        _module('System.Threading.Tasks', Parallel=Parallel,
+                ParallelOptions=ParallelOptions)
+    try:
+        import Rhino  # noqa: F401
+    except ImportError:
+        _module('Rhino', RhinoApp=RhinoApp)
+
+
+def component_path(name):
+    """Get the path to the source of a component from its name (eg. HB Run IDF)."""
+    return os.path.join(SRC_FOLDER, '{}.py'.format(name))
+
+
+def component_io(source):
+    """Get the names of the inputs and outputs in the docstring of a component source.
+
+    Returns:
+        A tuple with two items.
+
+        -   inputs: A list of the input names under the Args of the docstring.
+        -   outputs: A list of the output names under the Returns of the docstring.
+    """
+    inputs, outputs, names = [], [], None
+    for line in (ast.get_docstring(ast.parse(source)) or '').splitlines():
+        if line.strip() == 'Args:':
+            names = inputs
+        elif line.strip() == 'Returns:':
+            names = outputs
+        elif names is not None:
+            match = IO_NAME.match(line)
+            if match is not None:
+                names.append(match.group(1))
+    return inputs, outputs
+
+
+def run_component(name, inputs=None):
+    """Run the source of a component with a dictionary of inputs.
+
+    Args:
+        name: The name of the component (eg. HB Read Custom Result) or the full
+            path to its Python source.
+        inputs: A dictionary with the values of the component inputs under
+            their names. Inputs that are not in the dictionary are None, like
+            the item inputs of a component that are not connected in Grasshopper.
+            List inputs that are not connected should be input as empty lists.
+
+    Returns:
+        A tuple with two items.
+
+        -   outputs: A dictionary with the value of each output of the component
+            under its name. Outputs that were not set by the script are None.
+            The text printed by the script is the value of the report output.
+        -   warnings: A list of the warnings given by the component.
+    """
+    install_stubs()
+    path = name if os.path.isfile(name) else component_path(name)
+    with open(path) as src_file:
+        source = src_file.read()
+    input_names, output_names = component_io(source)
+    ghenv = GhEnv()
+    ghenv.Component.Inputs = input_names
+    ghenv.Component.Values = dict((key, None) for key in input_names)
+    ghenv.Component.Values.update(inputs or {})
+
+    del warnings[:]
+    namespace = {'ghenv': ghenv, '__name__': '__main__', '__file__': path}
+    namespace.update(ghenv.Component.Values)
+    report = io.StringIO()
+    with contextlib.redirect_stdout(report):
+        exec(compile(source, path, 'exec'), namespace)
+    outputs = dict((key, namespace.get(key)) for key in output_names)
+    if 'report' in outputs:
+        outputs['report'] = report.getvalue()
+    return outputs, list(warnings)
@@ -0,0 +1,176 @@
+# coding=utf-8
+import os
+import json
+
+import pytest
+
+from ladybug.dt import Date
+from ladybug.location import Location
+from ladybug.designday import DesignDay
+from ladybug.ddy import DDY
+from ladybug_geometry.geometry3d.pointvector import Point3D
+from ladybug_geometry.geometry3d.face import Face3D
+from honeybee.model import Model
+from honeybee.room import Room
+from honeybee.aperture import Aperture
+import honeybee_energy.run
+from honeybee_energy.lib.programtypes import office_program
+
+from honeybee_grasshopper_energy.result import SQLiteReader, sql_aggregates
+
+from harness import run_component, component_path, component_io
+import sqlfiles
+
+OUTPUT_NAMES = ['Zone Mean Air Temperature', 'Surface Window Heat Loss Energy']
+
+
+@pytest.fixture
+def hourly_sql(tmpdir):
+    return sqlfiles.result_sql(str(tmpdir.join('hourly.sql')))
+
+
+@pytest.fixture
+def epw_file(tmpdir):
+    """Get the path to an EPW with a .ddy file of design days next to it."""
+    location = Location('Test', latitude=42.4, longitude=-71.0, time_zone=-5)
+    heating = DesignDay.from_design_day_properties(
+        'Heating 99.6%', 'WinterDesignDay', location, Date(1, 21), -15, 0,
+        'Wetbulb', -15, 101325, 4, 300, 'ASHRAEClearSky', [0])
+    cooling = DesignDay.from_design_day_properties(
+        'Cooling .4%', 'SummerDesignDay', location, Date(7, 21), 33, 9,
+        'Wetbulb', 23, 101325, 4, 230, 'ASHRAETau', [0.45, 2.1])
+    DDY(location, [heating, cooling]).save(str(tmpdir.join('test.ddy')))
+    return str(tmpdir.join('test.epw'))
+
+
+def test_component_io():
+    """Test that the inputs and outputs are read from the docstring of a component."""
+    with open(component_path('HB Read Batch Result')) as src_file:
+        inputs, outputs = component_io(src_file.read())
+    assert inputs == ['_sqls', '_output_names', 'parallel_', 'max_workers_']
+    assert outputs == ['header', 'table']
+
+
+def test_missing_required_inputs():
+    """Test that a component without its required inputs gives warnings only."""
+    outputs, warnings = run_component('HB Read Custom Result', {'_sql': None})
+    assert outputs == {'results': None}
+    assert warnings == ['Input parameter _sql failed to collect data!',
+                        'Input parameter _output_names failed to collect data!']
+
+
+def test_read_custom_result(hourly_sql):
+    """Test that the results of the component are those of the SQLiteReader."""
+    outputs, warnings = run_component(
+        'HB Read Custom Result',
+        {'_sql': hourly_sql, '_output_names': OUTPUT_NAMES, 'keys_': []})
+    assert warnings == []
+    expected = SQLiteReader(hourly_sql).data_collections_by_output_name(OUTPUT_NAMES)
+    assert [list(data.values) for data in outputs['results']] == \
+        [list(data.values) for data in expected]
+
+    outputs, _ = run_component(
+        'HB Read Custom Result', {'_sql': hourly_sql, '_output_names': OUTPUT_NAMES,
+                                  'keys_': ['ZONE_1'], 'aggregation_': 'annual'})
+    assert len(outputs['results']) == 1
+    assert isinstance(outputs['results'][0], float)
+
+
+@pytest.mark.parametrize('aggregation', [None, 'Monthly', 'Annual'])
+def test_read_room_energy_result(hourly_sql, aggregation):
+    """Test the energy results of the component and their ventilation loads."""
+    outputs, warnings = run_component(
+        'HB Read Room Energy Result', {'_sql': hourly_sql, 'aggregation_': aggregation})
+    assert warnings == []
+    assert len(outputs['cooling']) == len(outputs['heating']) == 2
+    assert len(outputs['mech_vent_load']) == len(outputs['infiltration_load']) == 2
+    assert outputs['fan_electric'] == []
+    reader = SQLiteReader(hourly_sql)
+    lighting = reader.data_collections_by_output_name(
+        'Zone Lights Electric Energy', aggregation)
+    if aggregation == 'Annual':
+        assert outputs['lighting'] == pytest.approx(lighting)
+    else:
+        assert [list(data.values) for data in outputs['lighting']] == \
+            [list(data.values) for data in lighting]
+
+
+def test_read_batch_result(tmpdir):
+    """Test that the parallel and serial batch tables hold the aggregates."""
+    sqls = [sqlfiles.result_sql(str(tmpdir.join('{}.sql'.format(i))), zones=i + 1)
+            for i in range(3)]
+    serial, warnings = run_component(
+        'HB Read Batch Result', {'_sqls': sqls, '_output_names': OUTPUT_NAMES})
+    assert warnings == []
+    parallel, _ = run_component(
+        'HB Read Batch Result', {'_sqls': sqls, '_output_names': OUTPUT_NAMES,
+                                 'parallel_': True, 'max_workers_': 2})
+    assert parallel == serial
+    assert len(serial['header'].split(',')) == 18
+    assert len(serial['table']) == sum(len(sql_aggregates(sql, OUTPUT_NAMES))
+                                       for sql in sqls)
+    assert [row.split(',')[0] for row in serial['table']] == \
+        ['0'] * 3 + ['1'] * 6 + ['2'] * 9
+
+    outputs, warnings = run_component(
+        'HB Read Batch Result',
+        {'_sqls': sqls[:1] + [str(tmpdir.join('missing.sql'))],
+         '_output_names': OUTPUT_NAMES})
+    assert len(outputs['table']) == 3
+    assert len(warnings) == 1
+
+
+def test_model_to_idf(tmpdir, epw_file):
+    """Test that the component writes the IDF of a Model without running it."""
+    rooms = []
+    for i in range(3):
+        room = Room.from_box('Room_{}'.format(i), 5, 5, 3, origin=Point3D(i * 5, 0, 0))
+        room.properties.energy.program_type = office_program
+        room.properties.energy.add_default_ideal_air()
+        rooms.append(room)
+    inputs = {'_model': Model('Harness_Model', rooms), '_epw_file': epw_file,
+              '_folder_': str(tmpdir), '_write': True}
+    outputs, warnings = run_component('HB Model to IDF', inputs)
+    assert warnings == []
+    assert outputs['idf'] == os.path.join(
+        str(tmpdir), 'Harness_Model', 'EnergyPlus', 'in.idf')
+    with open(outputs['idf']) as idf_file:
+        idf_str = idf_file.read()
+    assert idf_str.count('\nZone,') == 3
+    assert idf_str.count('SizingPeriod:DesignDay,') == 2
+    assert outputs['sql'] is None
+    assert 'Model contains 3 Rooms' in outputs['report']
+    assert 'translation:' in outputs['report']
+
+
+def test_model_to_osm_json(tmpdir, epw_file, monkeypatch):
+    """Test that the streamed JSON of a Model matches the dictionary of the Model."""
+    # the OSW needs the OpenStudio measures, which are not needed for the JSON
+    monkeypatch.setattr(honeybee_energy.run, 'to_openstudio_osw', lambda *args: None)
+    room = Room.from_box('Pentagon_Room', 10, 10, 10)
+    pentagon = Face3D([Point3D(2, 0, 2), Point3D(8, 0, 2), Point3D(8, 0, 6),
+                       Point3D(5, 0, 8), Point3D(2, 0, 6)])
+    room[3].add_aperture(Aperture('Pentagon_Window', pentagon))
+    room.properties.energy.program_type = office_program
+    room.properties.energy.add_default_ideal_air()
+    model = Model('Rotated_Model', [room], units='Feet', tolerance=0.01,
+                  angle_tolerance=1)
+    model.north_angle = 30
+    inputs = {'_model': model, '_epw_file': epw_file, '_folder_': str(tmpdir),
+              '_write': True, 'add_str_': [], 'run_': 0}
+    outputs, warnings = run_component('HB Model to OSM', inputs)
+    assert warnings == []
+    with open(outputs['jsons'][0]) as model_json:
+        model_dict = json.load(model_json)
+
+    meters_model = model.duplicate()
+    meters_model.convert_to_units('Meters')
+    expected = json.loads(json.dumps(meters_model.to_dict(triangulate_sub_faces=True)))
+    # older versions of honeybee-core do not convert the tolerance with the units
+    expected['tolerance'] = model.tolerance * model.conversion_factor_to_meters('Feet')
+    assert sorted(model_dict) == sorted(expected)
+    for key in expected:
+        assert model_dict[key] == expected[key], key
+    assert model_dict['north_angle'] == 30
+    apertures = model_dict['rooms'][0]['faces'][3]['apertures']
+    assert len(apertures) == 3
@@ -0,0 +1,31 @@
+# coding=utf-8
+from ladybug_geometry.geometry3d.pointvector import Point3D
+from honeybee.model import Model
+from honeybee.room import Room
+from honeybee.shade import Shade
+
+from honeybee_grasshopper_energy.preflight import preflight_index
+
+
+def test_preflight_index():
+    """Test the counts and the checks of the index of a Model."""
+    room = Room.from_box('Box', 5, 5, 3)
+    room.faces[1].apertures_by_ratio(0.4, 0.01)
+    shade = Shade.from_vertices('Context', [(0, -5, 0), (5, -5, 0), (5, -5, 3)])
+    index = preflight_index(Model('Preflight_Model', [room], orphaned_shades=[shade]))
+    assert index['counts'] == {'Room': 1, 'Face': 6, 'Aperture': 1, 'Door': 0,
+                               'Shade': 1}
+    assert index['duplicate_identifiers'] == []
+    assert index['zero_area'] == []
+
+
+def test_preflight_duplicate_surfaces():
+    """Test that all surface types share their identifiers but Rooms do not."""
+    room = Room.from_box('Box', 5, 5, 3)
+    shade = Shade.from_vertices(room.faces[0].identifier,
+                                [(0, -5, 0), (5, -5, 0), (5, -5, 3)])
+    other_room = Room.from_box(room.faces[1].identifier, 5, 5, 3, origin=Point3D(5, 0, 0))
+    model = Model('Preflight_Model', [room, other_room], orphaned_shades=[shade])
+    index = preflight_index(model)
+    assert index['duplicate_identifiers'] == \
+        ['Shade "{}"'.format(room.faces[0].display_name)]
@@ -0,0 +1,162 @@
+# coding=utf-8
+import os
+
+import pytest
+
+from honeybee_energy.result.sql import SQLiteResult
+from ladybug.datacollection import HourlyContinuousCollection, DailyCollection, \
+    MonthlyCollection
+
+from honeybee_grasshopper_energy.result import SQLiteReader, sql_reader, \
+    sql_aggregates
+
+import sqlfiles
+
+ENERGY = 'Zone Lights Electric Energy'
+TEMPERATURE = 'Zone Mean Air Temperature'
+SURFACE = 'Surface Window Heat Loss Energy'
+
+
+def _summary(data_collections):
+    """Get the parts of DataCollections that should match for the same results."""
+    return [(type(data).__name__, data.header.unit, str(data.header.analysis_period),
+             sorted(data.header.metadata.items()), list(data.values))
+            for data in data_collections]
+
+
+def _grouped(data, attribute):
+    """Group the values of a collection by the month or doy of their datetimes."""
+    groups = {}
+    for value, date_time in zip(data.values, data.datetimes):
+        groups.setdefault(getattr(date_time, attribute), []).append(value)
+    return [groups[key] for key in sorted(groups)]
+
+
+@pytest.fixture
+def hourly_sql(tmpdir):
+    return sqlfiles.result_sql(str(tmpdir.join('hourly.sql')))
+
+
+@pytest.mark.parametrize('frequency,days', [
+    ('Hourly', 365), ('Zone Timestep', 31), ('Monthly', 365), ('Hourly', 45)])
+def test_reader_matches_sqliteresult(tmpdir, frequency, days):
+    """Test that the series of the SQLiteReader match those of honeybee-energy."""
+    sql = sqlfiles.result_sql(str(tmpdir.join('result.sql')), frequency=frequency,
+                              days=days)
+    reader, result = SQLiteReader(sql), SQLiteResult(sql)
+    for output_name in (ENERGY, TEMPERATURE, SURFACE):
+        assert _summary(reader.data_collections_by_output_name(output_name)) == \
+            _summary(result.data_collections_by_output_name(output_name))
+    assert reader.data_collections_by_output_name('Not An Output') == []
+
+
+def test_reader_cache(hourly_sql):
+    """Test that the values are only read once and that collections are copies."""
+    reader = SQLiteReader(hourly_sql)
+    reader.preload((ENERGY, TEMPERATURE))
+    assert reader.size == 4 * 8760 * 8
+    data = reader.data_collections_by_output_name(TEMPERATURE)
+    original = list(data[0].values)
+    data[0].values = [0] * 8760
+    assert list(reader.data_collections_by_output_name(TEMPERATURE)[0].values) == \
+        original
+    assert reader.size == 4 * 8760 * 8
+
+    reader.trim(8760 * 8)
+    assert reader.size == 8760 * 8
+    reader.max_size = 0
+    reader.data_collections_by_output_name(ENERGY)
+    assert reader.size == 0
+
+
+def test_reader_output_list_and_keys(hourly_sql):
+    """Test the request of several outputs and of the keys that match a pattern."""
+    reader = SQLiteReader(hourly_sql)
+    data = reader.data_collections_by_output_name((ENERGY, TEMPERATURE))
+    assert len(data) == 4
+    data = reader.data_collections_by_output_name(SURFACE, keys=['face_1_*'])
+    assert [d.header.metadata['Surface'] for d in data] == ['FACE_1_0', 'FACE_1_1']
+    data = reader.data_collections_by_output_name(TEMPERATURE, keys=['ZONE_?'])
+    assert [d.header.metadata['Zone'] for d in data] == ['ZONE_0', 'ZONE_1']
+
+
+@pytest.mark.parametrize('output_name', [ENERGY, TEMPERATURE])
+def test_reader_aggregation(hourly_sql, output_name):
+    """Test that the aggregations of SQLite match those of the hourly collections."""
+    reader = SQLiteReader(hourly_sql)
+    hourly = reader.data_collections_by_output_name(output_name)[0]
+    is_total = output_name == ENERGY
+
+    annual = reader.data_collections_by_output_name(output_name, 'Annual')[0]
+    assert annual == pytest.approx(hourly.total if is_total else hourly.average)
+
+    def aggregate(values):
+        return sum(values) if is_total else sum(values) / len(values)
+
+    monthly = reader.data_collections_by_output_name(output_name, 'Monthly')[0]
+    assert isinstance(monthly, MonthlyCollection)
+    assert monthly.header.metadata == hourly.header.metadata
+    assert list(monthly.values) == \
+        pytest.approx([aggregate(vals) for vals in _grouped(hourly, 'month')])
+
+    daily = reader.data_collections_by_output_name(output_name, 'Daily')[0]
+    assert isinstance(daily, DailyCollection)
+    assert list(daily.values) == \
+        pytest.approx([aggregate(vals) for vals in _grouped(hourly, 'doy')])
+
+    peak = reader.data_collections_by_output_name(output_name, 'Peak')[0]
+    assert list(peak.values) == \
+        pytest.approx([max(vals) for vals in _grouped(hourly, 'month')])
+
+    with pytest.raises(AssertionError):
+        reader.data_collections_by_output_name(output_name, 'Weekly')
+
+
+def test_reader_sidecar(hourly_sql):
+    """Test that the columnar sidecar gives the same series as the SQL file."""
+    reader = SQLiteReader(hourly_sql)
+    assert reader.sidecar is None
+    expected = _summary(reader.data_collections_by_output_name(SURFACE))
+    reader.write_sidecar()
+    assert os.path.isfile(reader.sidecar_path)
+
+    sidecar_reader = SQLiteReader(hourly_sql)
+    assert sidecar_reader.sidecar is not None
+    assert _summary(sidecar_reader.data_collections_by_output_name(SURFACE)) == \
+        expected
+
+    # a sidecar of an earlier version of the file is never used
+    stat = os.stat(hourly_sql)
+    os.utime(hourly_sql, (stat.st_atime, stat.st_mtime + 10))
+    assert SQLiteReader(hourly_sql).sidecar is None
+
+
+def test_sql_reader_shared(hourly_sql):
+    """Test that the components share one reader until the file is overwritten."""
+    reader = sql_reader(hourly_sql)
+    assert sql_reader(hourly_sql) is reader
+    sqlfiles.result_sql(hourly_sql, zones=1)
+    stat = os.stat(hourly_sql)
+    os.utime(hourly_sql, (stat.st_atime, stat.st_mtime + 10))
+    assert sql_reader(hourly_sql) is not reader
+
+
+def test_sql_aggregates(tmpdir):
+    """Test that the aggregates of a batch file match the aggregated series."""
+    sql = sqlfiles.result_sql(str(tmpdir.join('partial.sql')), days=45)
+    reader = SQLiteReader(sql)
+    aggregates = sql_aggregates(sql, (ENERGY, TEMPERATURE, 'Not An Output'))
+    assert len(aggregates) == 4
+    for key, name, frequency, unit, annual, monthly in aggregates:
+        hourly = reader.data_collections_by_output_name(name, keys=[key])[0]
+        assert isinstance(hourly, HourlyContinuousCollection)
+        assert (frequency, unit) == ('Hourly', hourly.header.unit)
+        if name == ENERGY:
+            assert annual == pytest.approx(hourly.total)
+            expected = [sum(vals) for vals in _grouped(hourly, 'month')]
+        else:
+            assert annual == pytest.approx(hourly.average)
+            expected = [sum(vals) / len(vals) for vals in _grouped(hourly, 'month')]
+        assert monthly[:2] == pytest.approx(expected)
+        assert monthly[2:] == [None] * 10
+    assert sql_aggregates(sql, ('Not An Output',)) == []
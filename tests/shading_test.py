@@ -0,0 +1,110 @@
+# coding=utf-8
+import pytest
+
+from ladybug_geometry.geometry3d.pointvector import Vector3D
+from honeybee.model import Model
+from honeybee.room import Room
+from honeybee.shade import Shade
+from honeybee.boundarycondition import boundary_conditions
+from honeybee_energy.lib.programtypes import office_program, plenum_program
+from honeybee_energy.simulation.parameter import SimulationParameter
+
+from honeybee_grasshopper_energy.shading import shading_hash, exterior_surface_names, \
+    shading_csv_minutes, shadow_calculation_idf, scheduled_shading_idf
+
+
+@pytest.fixture
+def model():
+    room = Room.from_box('Shade_Room', 5, 5, 3)
+    room.faces[1].apertures_by_ratio(0.4, 0.01)
+    room.faces[0].boundary_condition = boundary_conditions.ground
+    room.properties.energy.program_type = office_program
+    shade = Shade.from_vertices(
+        'Context', [(0, -5, 0), (5, -5, 0), (5, -5, 3), (0, -5, 3)])
+    return Model('Shade_Model', [room], orphaned_shades=[shade])
+
+
+@pytest.fixture
+def epw_file(tmpdir):
+    epw = tmpdir.join('test.epw')
+    epw.write('LOCATION,Boston,MA,USA,TMY3,725090,42.37,-71.02,-5.0,6.0\n')
+    return str(epw)
+
+
+def _shading_csv(path, surfaces, rows):
+    with open(path, 'w') as csv_file:
+        csv_file.write(','.join(['Surface Name'] + surfaces) + '\n')
+        for i in range(rows):
+            csv_file.write(','.join(['01/01 {}'.format(i)] + ['0.5'] * len(surfaces)))
+            csv_file.write('\n')
+    return path
+
+
+def test_shading_hash(model, epw_file, tmpdir):
+    """Test that the hash only changes with the inputs that affect sunlit fractions."""
+    sim_par = SimulationParameter()
+    base_hash = shading_hash(model, sim_par, epw_file)
+    assert shading_hash(model.duplicate(), sim_par, epw_file) == base_hash
+
+    load_model = model.duplicate()
+    load_model.rooms[0].properties.energy.program_type = plenum_program
+    assert shading_hash(load_model, sim_par, epw_file) == base_hash
+
+    shade_model = model.duplicate()
+    shade_model.orphaned_shades[0].move(Vector3D(0, -1, 0))
+    assert shading_hash(shade_model, sim_par, epw_file) != base_hash
+    window_model = model.duplicate()
+    window_model.rooms[0].faces[1].apertures[0].move(Vector3D(0, 0, 0.1))
+    assert shading_hash(window_model, sim_par, epw_file) != base_hash
+
+    other_epw = tmpdir.join('other.epw')
+    other_epw.write('LOCATION,Denver,CO,USA,TMY3,725650,39.83,-104.65,-7.0,1650.0\n')
+    assert shading_hash(model, sim_par, str(other_epw)) != base_hash
+    sim_par.timestep = 4
+    assert shading_hash(model, sim_par, epw_file) != base_hash
+
+
+def test_exterior_surface_names(model):
+    """Test that only the surfaces with an Outdoors boundary condition are named."""
+    room = model.rooms[0]
+    names = exterior_surface_names(model)
+    assert len(names) == 6
+    assert room.faces[0].identifier.upper() not in names
+    assert room.faces[1].apertures[0].identifier.upper() in names
+    assert all(name == name.upper() for name in names)
+
+
+@pytest.mark.parametrize('rows,minutes', [
+    (8760, 60), (8760 * 6, 10), (8784 * 6, None), (24, None)])
+def test_shading_csv_minutes(tmpdir, rows, minutes):
+    """Test that only files with a full year of results are accepted."""
+    csv = _shading_csv(str(tmpdir.join('eplusshading.csv')), ['FACE'], rows)
+    assert shading_csv_minutes(csv, 6, False) == minutes
+
+
+def test_scheduled_shading_idf(model, tmpdir):
+    """Test that each column of an outdoor surface is scheduled on that surface."""
+    names = exterior_surface_names(model)
+    surfaces = sorted(names) + ['SHADE_ROOM_BOTTOM']
+    csv = _shading_csv(str(tmpdir.join('eplusshading.csv')), surfaces, 8760)
+    idf_strs = scheduled_shading_idf(csv, names, 60)
+    assert len(idf_strs) == 2 * len(names)
+    schedules = [idf_str for idf_str in idf_strs if idf_str.startswith('Schedule:File')]
+    for col_count, (surface, sched) in enumerate(zip(sorted(names), schedules), 2):
+        assert '{} Sunlit Fraction,'.format(surface) in sched
+        assert ' {},'.format(col_count) in sched
+        assert ' 8760,' in sched
+    assert not any('SHADE_ROOM_BOTTOM' in idf_str for idf_str in idf_strs)
+
+
+@pytest.mark.parametrize('scheduled', [True, False])
+def test_shadow_calculation_idf(scheduled):
+    """Test the fields of a ShadowCalculation that exports or imports the results."""
+    shadow_calc = SimulationParameter().shadow_calculation
+    idf_str = shadow_calculation_idf(shadow_calc, scheduled)
+    assert idf_str.startswith('ShadowCalculation,')
+    assert shadow_calc.to_idf().split('\n')[1] in idf_str  # calculation method kept
+    lines = idf_str.split('\n')
+    assert len(lines) == 8
+    assert ('ScheduledShading' if scheduled else 'InternalCalculation') in lines[6]
+    assert lines[-1].strip().startswith('No;' if scheduled else 'Yes;')
@@ -0,0 +1,104 @@
+# coding=utf-8
+import json
+
+import pytest
+
+from ladybug_geometry.geometry3d.pointvector import Point3D, Vector3D
+from honeybee.model import Model
+from honeybee.room import Room
+from honeybee_energy.lib.programtypes import office_program, plenum_program
+from honeybee_energy.simulation.parameter import SimulationParameter
+
+from honeybee_grasshopper_energy.sizing import sizing_hash, hvac_sizes_from_sql, \
+    load_hvac_sizes
+from honeybee_grasshopper_energy.writer import hard_sized_hvac
+
+import sqlfiles
+
+SIZES = {'ZONE1': (1000.0, 0.1, 2000.0), 'ZONE2': (1500.0, 0.2, 2500.0)}
+
+
+@pytest.fixture
+def model():
+    rooms = []
+    for i, name in enumerate(('Zone1', 'Zone2')):
+        room = Room.from_box(name, 5, 5, 3, origin=Point3D(0, i * 5, 0))
+        room.properties.energy.program_type = office_program
+        room.properties.energy.add_default_ideal_air()
+        rooms.append(room)
+    return Model('Sizing_Model', rooms)
+
+
+def test_hvac_sizes_from_sql(tmpdir):
+    """Test that the sizes of the ideal air systems are read from ComponentSizes."""
+    sql = sqlfiles.sizes_sql(str(tmpdir.join('eplusout.sql')), SIZES)
+    hvac_sizes = hvac_sizes_from_sql(sql)
+    assert sorted(hvac_sizes) == ['ZONE1', 'ZONE2']
+    assert hvac_sizes['ZONE1'] == {'max sensible heat capacity': 1000.0,
+                                   'max cooling fow rate {m3/s}': 0.1,
+                                   'max total cooling capacity': 2000.0}
+    empty_sql = sqlfiles.sizes_sql(str(tmpdir.join('empty.sql')), {})
+    assert hvac_sizes_from_sql(empty_sql) == {}
+
+
+def test_hard_sized_hvac(tmpdir, model):
+    """Test that the sizes replace the Autosize fields of the matching zone only."""
+    sql = sqlfiles.sizes_sql(str(tmpdir.join('eplusout.sql')), SIZES)
+    hvac_sizes = hvac_sizes_from_sql(sql)
+    hvac_str = model.rooms[0].properties.energy.hvac.to_idf()
+    sized_str = hard_sized_hvac(hvac_str, {'ZONE1': hvac_sizes['ZONE1']})
+    assert 'autosize' in hvac_str.lower()
+    assert 'autosize' not in sized_str.lower()
+    assert '2000.0' in sized_str
+    assert hard_sized_hvac(hvac_str, {'ZONE2': hvac_sizes['ZONE2']}) == hvac_str
+
+
+def test_load_hvac_sizes(tmpdir, model):
+    """Test that sizes are only loaded when they replace every Autosize of a model."""
+    size_file = str(tmpdir.join('sizes.json'))
+    assert load_hvac_sizes(size_file, model) is None
+    with open(size_file, 'w'):
+        pass
+    assert load_hvac_sizes(size_file, model) is None
+    for sizes in ({}, {'ZONE1': {'max sensible heat capacity': 1000.0}}):
+        with open(size_file, 'w') as outf:
+            json.dump(sizes, outf)
+        assert load_hvac_sizes(size_file, model) is None
+
+    sql = sqlfiles.sizes_sql(str(tmpdir.join('eplusout.sql')), SIZES)
+    with open(size_file, 'w') as outf:
+        json.dump(hvac_sizes_from_sql(sql), outf)
+    assert load_hvac_sizes(size_file, model) == hvac_sizes_from_sql(sql)
+
+
+def test_sizing_hash(model):
+    """Test that the hash only changes with the inputs that affect sizing."""
+    sim_par = SimulationParameter()
+    base_hash = sizing_hash(model, sim_par)
+    assert sizing_hash(model.duplicate(), sim_par) == base_hash
+
+    load_model = model.duplicate()
+    load_model.rooms[0].properties.energy.program_type = plenum_program
+    load_model.rooms[0].properties.energy.setpoint = \
+        model.rooms[0].properties.energy.setpoint
+    load_model.rooms[0].properties.energy.infiltration = \
+        model.rooms[0].properties.energy.infiltration
+    load_model.rooms[0].properties.energy.ventilation = \
+        model.rooms[0].properties.energy.ventilation
+    assert sizing_hash(load_model, sim_par) == base_hash
+
+    infiltration = model.rooms[0].properties.energy.infiltration.duplicate()
+    infiltration.flow_per_exterior_area = 0.0001
+    leaky_model = model.duplicate()
+    leaky_model.rooms[0].properties.energy.infiltration = infiltration
+    assert sizing_hash(leaky_model, sim_par) != base_hash
+
+    geo_model = model.duplicate()
+    geo_model.rooms[0].move(Vector3D(0, 0, 1))
+    assert sizing_hash(geo_model, sim_par) != base_hash
+
+    sim_par.timestep = 4
+    assert sizing_hash(model, sim_par) != base_hash
+    sim_par.timestep = SimulationParameter().timestep
+    sim_par.sizing_parameter.heating_factor = 1.5
+    assert sizing_hash(model, sim_par) != base_hash
@@ -0,0 +1,139 @@
+# coding=utf-8
+import sqlite3
+
+import pytest
+
+from ladybug.dt import Date
+from honeybee_energy.simulation.runperiod import RunPeriod
+
+from honeybee_grasshopper_energy.splitrun import split_run_period, write_chunk_idf, \
+    stitch_sql, compare_sql
+
+import sqlfiles
+
+
+def _query(sql, statement, args=()):
+    conn = sqlite3.connect(sql)
+    try:
+        return conn.execute(statement, args).fetchall()
+    finally:
+        conn.close()
+
+
+def _series(sql, name, frequency):
+    """Get the values and times of an output in the run period of a chunk_sql file."""
+    return _query(
+        sql, 'SELECT r.Value, t.Month, t.Day, t.Hour, t.SimulationDays FROM ReportData r '
+        'JOIN ReportDataDictionary d ON r.ReportDataDictionaryIndex = '
+        'd.ReportDataDictionaryIndex JOIN Time t ON r.TimeIndex = t.TimeIndex '
+        'WHERE d.Name=? AND d.ReportingFrequency=? AND t.IntervalType < 4 AND '
+        't.WarmupFlag=0 AND t.EnvironmentPeriodIndex=2 ORDER BY r.ReportDataIndex',
+        (name, frequency))
+
+
+def test_split_run_period():
+    """Test that the chunks of a run period are contiguous and start on a month."""
+    run_period = RunPeriod(Date(1, 1), Date(12, 31), 'Sunday')
+    chunks = split_run_period(run_period, 4)
+    assert len(chunks) == 4
+    assert [result_start for _, result_start in chunks] == \
+        [Date(1, 1), Date(4, 1), Date(7, 1), Date(10, 1)]
+    assert chunks[0][0].start_date == Date(1, 1)
+    assert chunks[-1][0].end_date == Date(12, 31)
+    for (chunk, _), (_, next_start) in zip(chunks[:-1], chunks[1:]):
+        assert chunk.end_date.doy + 1 == next_start.doy
+    for chunk, result_start in chunks[1:]:
+        assert chunk.start_date.doy == result_start.doy - 7
+        days = chunk.start_date.doy - run_period.start_date.doy
+        assert chunk.start_day_of_week == \
+            RunPeriod.DAYS_OF_THE_WEEK[(RunPeriod.DAYS_OF_THE_WEEK.index('Sunday') +
+                                        days) % 7]
+
+
+def test_split_run_period_short():
+    """Test the split of run periods with fewer months than chunks."""
+    assert len(split_run_period(RunPeriod(Date(1, 1), Date(1, 31)), 4)) == 1
+    chunks = split_run_period(RunPeriod(Date(3, 15), Date(5, 10)), 6)
+    assert [result_start for _, result_start in chunks] == \
+        [Date(3, 15), Date(4, 1), Date(5, 1)]
+    assert chunks[0][0].start_date == Date(3, 15)
+    chunks = split_run_period(RunPeriod(Date(1, 1), Date(2, 28)), 2, lead_days=60)
+    assert chunks[1][0].start_date == Date(1, 1)
+
+
+def test_write_chunk_idf(tmpdir):
+    """Test that the start of an IDF is replaced in the IDF of a chunk."""
+    idf = str(tmpdir.join('in.idf'))
+    with open(idf, 'w') as idf_file:
+        idf_file.write('RunPeriod,1;\nZone,A;\n')
+    chunk_idf = write_chunk_idf(idf, str(tmpdir.join('chunk.idf')), 'RunPeriod,1;',
+                                'RunPeriod,2;')
+    with open(chunk_idf) as chunk_file:
+        assert chunk_file.read() == 'RunPeriod,2;\nZone,A;\n'
+    with pytest.raises(AssertionError):
+        write_chunk_idf(idf, chunk_idf, 'RunPeriod,3;', 'RunPeriod,2;')
+
+
+@pytest.fixture
+def stitched(tmpdir):
+    """Get the merged SQL of a run split in two chunks and the SQL of a single run."""
+    chunks = split_run_period(RunPeriod(Date(1, 1), Date(3, 31), 'Sunday'), 2)
+    single_sql = sqlfiles.chunk_sql(str(tmpdir.join('single.sql')), 1, 90)
+    chunk_sqls = [
+        sqlfiles.chunk_sql(str(tmpdir.join('chunk_{}.sql'.format(i))),
+                           chunk.start_date.doy, chunk.end_date.doy, i == 1)
+        for i, (chunk, _) in enumerate(chunks)]
+    merged_sql = stitch_sql(chunk_sqls, chunks, str(tmpdir.join('merged.sql')))
+    return merged_sql, single_sql, chunk_sqls
+
+
+def test_stitch_sql(stitched):
+    """Test that the merged results of the chunks match the results of a single run."""
+    merged_sql, single_sql, _ = stitched
+    for name, frequency in (('Cooling', 'Hourly'), ('Temp', 'Hourly'),
+                            ('Cooling', 'Monthly')):
+        assert _series(merged_sql, name, frequency) == \
+            _series(single_sql, name, frequency)
+    assert len(_series(merged_sql, 'Cooling', 'Hourly')) == 90 * 24
+
+    # results that only cover a chunk are dropped
+    assert _query(merged_sql, 'SELECT COUNT(*) FROM Time WHERE IntervalType >= 4') == \
+        [(0,)]
+    assert _query(merged_sql, 'SELECT COUNT(*) FROM TabularData') == [(0,)]
+    # the design day of the first chunk is kept
+    assert _query(merged_sql, 'SELECT COUNT(*) FROM Time t JOIN EnvironmentPeriods e '
+                  'ON t.EnvironmentPeriodIndex = e.EnvironmentPeriodIndex WHERE '
+                  'e.EnvironmentType = 1') == [(24,)]
+    # the extended data follows the monthly values that it belongs to
+    extended = _query(merged_sql, 'SELECT e.MaxValue = r.Value, e.MaxMonth FROM '
+                      'ReportExtendedData e JOIN ReportData r ON '
+                      'e.ReportDataIndex = r.ReportDataIndex')
+    assert extended == [(1, 1), (1, 2), (1, 3)]
+
+
+def test_stitch_sql_environments(tmpdir, stitched):
+    """Test that chunks with different environments cannot be merged."""
+    _, _, chunk_sqls = stitched
+    conn = sqlite3.connect(chunk_sqls[1])
+    conn.execute("UPDATE EnvironmentPeriods SET EnvironmentName='OTHER' "
+                 "WHERE EnvironmentType=1")
+    conn.commit()
+    conn.close()
+    chunks = split_run_period(RunPeriod(Date(1, 1), Date(3, 31), 'Sunday'), 2)
+    with pytest.raises(AssertionError):
+        stitch_sql(chunk_sqls, chunks, str(tmpdir.join('merged_2.sql')))
+
+
+def test_compare_sql(stitched):
+    """Test the comparison of the merged results with those of a single run."""
+    merged_sql, single_sql, chunk_sqls = stitched
+    count, avg_diff, max_diff, _, mismatched, time_mismatch = \
+        compare_sql(merged_sql, single_sql)
+    assert (count, avg_diff, max_diff, mismatched, time_mismatch) == \
+        (3, 0, 0, [], None)
+
+    # the first chunk alone is missing the values of the second chunk
+    count, _, _, _, mismatched, time_mismatch = compare_sql(chunk_sqls[0], single_sql)
+    assert count == 0
+    assert len(mismatched) == 3
+    assert time_mismatch is not None
@@ -0,0 +1,239 @@
+# coding=utf-8
+"""Writers of small SQLite files with the tables of EnergyPlus results.
+
+The files hold made-up values in the layout of the tables that EnergyPlus writes
+such that the result readers can be checked without running a simulation.
+"""
+import os
+import sqlite3
+import datetime
+
+ENVIRONMENTS = 'CREATE TABLE EnvironmentPeriods (EnvironmentPeriodIndex INTEGER ' \
+    'PRIMARY KEY, SimulationIndex INTEGER, EnvironmentName TEXT, ' \
+    'EnvironmentType INTEGER)'
+TIME = 'CREATE TABLE Time (TimeIndex INTEGER PRIMARY KEY, Year INTEGER, ' \
+    'Month INTEGER, Day INTEGER, Hour INTEGER, Minute INTEGER, Dst INTEGER, ' \
+    'Interval INTEGER, IntervalType INTEGER, SimulationDays INTEGER, DayType TEXT, ' \
+    'EnvironmentPeriodIndex INTEGER, WarmupFlag INTEGER)'
+DICTIONARY = 'CREATE TABLE ReportDataDictionary (ReportDataDictionaryIndex ' \
+    'INTEGER PRIMARY KEY, IsMeter INTEGER, Type TEXT, IndexGroup TEXT, ' \
+    'TimestepType TEXT, KeyValue TEXT, Name TEXT, ReportingFrequency TEXT, ' \
+    'ScheduleName TEXT, Units TEXT)'
+DATA = 'CREATE TABLE ReportData (ReportDataIndex INTEGER PRIMARY KEY, ' \
+    'TimeIndex INTEGER, ReportDataDictionaryIndex INTEGER, Value REAL)'
+EXTENDED_DATA = 'CREATE TABLE ReportExtendedData (ReportExtendedDataIndex INTEGER ' \
+    'PRIMARY KEY, ReportDataIndex INTEGER, MaxValue REAL, MaxMonth INTEGER, ' \
+    'MaxDay INTEGER, MaxHour INTEGER, MaxStartMinute INTEGER, MaxMinute INTEGER, ' \
+    'MinValue REAL, MinMonth INTEGER, MinDay INTEGER, MinHour INTEGER, ' \
+    'MinStartMinute INTEGER, MinMinute INTEGER)'
+TABULAR_DATA = 'CREATE TABLE TabularData (TabularDataIndex INTEGER PRIMARY KEY, ' \
+    'Value TEXT)'
+COMPONENT_SIZES = 'CREATE TABLE ComponentSizes (ComponentSizesIndex INTEGER ' \
+    'PRIMARY KEY, CompType TEXT, CompName TEXT, Description TEXT, Value REAL, ' \
+    'Units TEXT)'
+
+ZONE_OUTPUTS = (
+    ('Sum', 'Zone Ideal Loads Supply Air Total Cooling Energy', 'J'),
+    ('Sum', 'Zone Ideal Loads Supply Air Total Heating Energy', 'J'),
+    ('Sum', 'Zone Ideal Loads Zone Total Heating Energy', 'J'),
+    ('Sum', 'Zone Ideal Loads Zone Total Cooling Energy', 'J'),
+    ('Sum', 'Zone Lights Electric Energy', 'J'),
+    ('Sum', 'Zone Electric Equipment Electric Energy', 'J'),
+    ('Sum', 'Zone People Total Heating Energy', 'J'),
+    ('Sum', 'Zone Windows Total Transmitted Solar Radiation Energy', 'J'),
+    ('Sum', 'Zone Infiltration Total Heat Gain Energy', 'J'),
+    ('Sum', 'Zone Infiltration Total Heat Loss Energy', 'J'),
+    ('Avg', 'Zone Operative Temperature', 'C'),
+    ('Avg', 'Zone Mean Air Temperature', 'C'),
+    ('Avg', 'Zone Air Relative Humidity', '%'))
+SURFACE_OUTPUTS = (
+    ('Avg', 'Surface Inside Face Temperature', 'C'),
+    ('Sum', 'Surface Window Heat Loss Energy', 'J'))
+
+
+def _connect(path, tables):
+    """Create a new SQLite file at a path with a list of tables."""
+    if os.path.isfile(path):
+        os.remove(path)
+    conn = sqlite3.connect(path)
+    for table in tables:
+        conn.execute(table)
+    return conn
+
+
+def _value(row, time_index):
+    """Get a made-up value of a ReportDataDictionary row at a TimeIndex."""
+    value = (row[0] * 7919 + time_index * 104729) % 1000
+    return value * 100. if row[9] == 'J' else value / 100.
+
+
+def result_sql(path, zones=2, surfaces=2, frequency='Hourly', days=365):
+    """Write an SQL file of zone and surface outputs over one run period.
+
+    Args:
+        path: The path to the SQL file, which is overwritten if it exists.
+        zones: The number of zones, which are named ZONE_0, ZONE_1 and so on.
+        surfaces: The number of surfaces of each zone, which are named
+            FACE_0_0, FACE_0_1 and so on.
+        frequency: Text for the reporting frequency of all outputs. Choose from
+            Hourly, Zone Timestep (4 per hour) and Monthly.
+        days: The number of days of the run period, which starts on Jan 1st.
+
+    Returns:
+        The path to the SQL file.
+    """
+    conn = _connect(path, (ENVIRONMENTS, TIME, DICTIONARY, DATA))
+    c = conn.cursor()
+    c.execute("INSERT INTO EnvironmentPeriods VALUES (1, 1, 'SUMMER DAY', 1)")
+    c.execute("INSERT INTO EnvironmentPeriods VALUES (2, 1, 'RUN PERIOD 1', 3)")
+    series = []
+    for sum_type, name, unit in ZONE_OUTPUTS:
+        for zone in range(zones):
+            series.append((sum_type, 'ZONE_{}'.format(zone), name, unit))
+    for sum_type, name, unit in SURFACE_OUTPUTS:
+        for zone in range(zones):
+            for surface in range(surfaces):
+                key = 'FACE_{}_{}'.format(zone, surface)
+                series.append((sum_type, key, name, unit))
+    rows = [(i + 1, 0, sum_type, 'Zone', 'Zone', key, name, frequency, '', unit)
+            for i, (sum_type, key, name, unit) in enumerate(series)]
+    c.executemany('INSERT INTO ReportDataDictionary VALUES (?,?,?,?,?,?,?,?,?,?)', rows)
+
+    def report(month, day, hour, minute, interval, interval_type, sim_day):
+        c.execute('INSERT INTO Time VALUES (NULL,2017,?,?,?,?,0,?,?,?,?,?,0)',
+                  (month, day, hour, minute, interval, interval_type, sim_day,
+                   'Monday' if interval_type <= 1 else None, 2))
+        time_index = c.lastrowid
+        c.executemany(
+            'INSERT INTO ReportData (TimeIndex, ReportDataDictionaryIndex, Value) '
+            'VALUES (?,?,?)', [(time_index, row[0], _value(row, time_index))
+                               for row in rows])
+
+    steps = 4 if frequency == 'Zone Timestep' else 1
+    start = datetime.date(2017, 1, 1)
+    for doy in range(days):
+        date = start + datetime.timedelta(doy)
+        if frequency == 'Monthly':
+            next_date = date + datetime.timedelta(1)
+            if next_date.month != date.month or doy == days - 1:
+                report(date.month, date.day, 24, 0, 44640, 3, doy + 1)
+            continue
+        for hour in range(1, 25):
+            for step in range(steps):
+                minute = (60 // steps) * (step + 1)
+                report(date.month, date.day, hour, minute % 60, 60 // steps,
+                       1 if steps == 1 else 0, doy + 1)
+    conn.commit()
+    conn.close()
+    return path
+
+
+def chunk_sql(path, start_doy, end_doy, reversed_dictionary=False):
+    """Write an SQL file of hourly, monthly and run period outputs from doy to doy.
+
+    The file looks like the result of a simulation of one chunk of a split
+    run period. It includes a design day, a warmup day, the extended data of
+    the monthly and run period values and a row of tabular data. The values
+    only depend on the day and hour such that chunks of one year can be
+    compared to the file of the year.
+
+    Args:
+        path: The path to the SQL file, which is overwritten if it exists.
+        start_doy: The day of the year on which the run period starts.
+        end_doy: The day of the year on which the run period ends.
+        reversed_dictionary: Set to True to number the ReportDataDictionary
+            in the opposite order, like a simulation with other outputs would.
+
+    Returns:
+        The path to the SQL file.
+    """
+    conn = _connect(path, (ENVIRONMENTS, TIME, DICTIONARY, DATA, EXTENDED_DATA,
+                           TABULAR_DATA))
+    c = conn.cursor()
+    c.execute("INSERT INTO TabularData VALUES (1, 'total')")
+    c.execute("INSERT INTO EnvironmentPeriods VALUES (1, 1, 'DD', 1)")
+    c.execute("INSERT INTO EnvironmentPeriods VALUES (2, 1, 'CUSTOMRUNPERIOD', 3)")
+    rows = [(1, 0, 'Sum', 'Zone', 'Zone', 'Z1', 'Cooling', 'Hourly', '', 'J'),
+            (2, 0, 'Avg', 'Zone', 'Zone', 'Z1', 'Temp', 'Hourly', '', 'C'),
+            (3, 0, 'Sum', 'Zone', 'Zone', 'Z1', 'Cooling', 'Monthly', '', 'J'),
+            (4, 0, 'Sum', 'Zone', 'Zone', 'Z1', 'Cooling', 'Run Period', '', 'J')]
+    if reversed_dictionary:
+        rows = [(5 - row[0],) + row[1:] for row in rows]
+    c.executemany('INSERT INTO ReportDataDictionary VALUES (?,?,?,?,?,?,?,?,?,?)', rows)
+    indices = dict(((row[6], row[7]), row[0]) for row in rows)
+
+    def time(month, day, hour, interval, interval_type, sim_day, env=2, warmup=0):
+        c.execute('INSERT INTO Time VALUES (NULL,2017,?,?,?,0,0,?,?,?,?,?,?)',
+                  (month, day, hour, interval, interval_type, sim_day,
+                   'Monday' if interval_type <= 1 else None, env, warmup))
+        return c.lastrowid
+
+    def data(time_index, name, frequency, value):
+        c.execute('INSERT INTO ReportData (TimeIndex, ReportDataDictionaryIndex, '
+                  'Value) VALUES (?,?,?)',
+                  (time_index, indices[(name, frequency)], value))
+        return c.lastrowid
+
+    for hour in range(1, 25):
+        time_index = time(7, 21, hour, 60, 1, 1, env=1)
+        data(time_index, 'Cooling', 'Hourly', 99.0)
+        data(time_index, 'Temp', 'Hourly', 30.0)
+    for hour in range(1, 25):
+        data(time(1, 1, hour, 60, 1, 1, warmup=1), 'Cooling', 'Hourly', -5.0)
+    month_total, run_total = 0, 0
+    for doy in range(start_doy, end_doy + 1):
+        date = datetime.date(2017, 1, 1) + datetime.timedelta(doy - 1)
+        sim_day = doy - start_doy + 1
+        for hour in range(1, 25):
+            time_index = time(date.month, date.day, hour, 60, 1, sim_day)
+            value = doy * 100 + hour
+            data(time_index, 'Cooling', 'Hourly', float(value))
+            data(time_index, 'Temp', 'Hourly', value / 1000.)
+            month_total += value
+            run_total += value
+        next_date = date + datetime.timedelta(1)
+        if next_date.month != date.month or doy == end_doy:
+            time_index = time(date.month, date.day, 24, 0, 3, sim_day)
+            data_index = data(time_index, 'Cooling', 'Monthly', float(month_total))
+            c.execute('INSERT INTO ReportExtendedData VALUES '
+                      '(NULL,?,?,?,1,1,0,60,?,?,1,1,0,60)',
+                      (data_index, float(month_total), date.month, 0.0, date.month))
+            month_total = 0
+    time_index = time(date.month, date.day, 24, 0, 4, end_doy - start_doy + 1)
+    data_index = data(time_index, 'Cooling', 'Run Period', float(run_total))
+    c.execute('INSERT INTO ReportExtendedData VALUES (NULL,?,1,1,1,1,0,60,0,1,1,1,0,60)',
+              (data_index,))
+    conn.commit()
+    conn.close()
+    return path
+
+
+def sizes_sql(path, zone_sizes):
+    """Write an SQL file with the ComponentSizes of ideal air systems.
+
+    Args:
+        path: The path to the SQL file, which is overwritten if it exists.
+        zone_sizes: A dictionary with zone names as keys and tuples of the
+            heating capacity, cooling air flow rate and cooling capacity as values.
+
+    Returns:
+        The path to the SQL file.
+    """
+    conn = _connect(path, (COMPONENT_SIZES,))
+    comp_type = 'ZoneHVAC:IdealLoadsAirSystem'
+    for zone, (heating, flow_rate, cooling) in zone_sizes.items():
+        comp_name = '{} Ideal Loads Air System'.format(zone)
+        conn.executemany(
+            'INSERT INTO ComponentSizes VALUES (NULL,?,?,?,?,?)',
+            [(comp_type, comp_name, 'Design Size Maximum Sensible Heating Capacity',
+              heating, 'W'),
+             (comp_type, comp_name, 'Design Size Maximum Cooling Air Flow Rate',
+              flow_rate, 'm3/s'),
+             (comp_type, comp_name, 'Design Size Maximum Total Cooling Capacity',
+              cooling, 'W')])
+    conn.execute('INSERT INTO ComponentSizes VALUES (NULL,?,?,?,?,?)',
+                 ('Fan:ConstantVolume', 'SUPPLY FAN', 'Design Size Maximum Flow Rate',
+                  1.0, 'm3/s'))
+    conn.commit()
+    conn.close()
+    return path
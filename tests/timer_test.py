@@ -0,0 +1,48 @@
+# coding=utf-8
+import json
+import time
+
+from honeybee_grasshopper_energy.timer import StageTimer
+
+
+def _slow_items(count, seconds):
+    for i in range(count):
+        time.sleep(seconds)
+        yield i
+
+
+def test_stage_timer(tmpdir):
+    """Test the stages of a timer and the log that it writes."""
+    timer = StageTimer('HB Test', '0.1.0')
+    timer.start('first')
+    time.sleep(0.02)
+    timer.start('second')
+    timer.stop()
+    assert timer.stages == ['first', 'second']
+    assert timer.totals['first']['wall_time'] >= 0.02
+    assert timer.totals['second']['wall_time'] < 0.02
+
+    timer.write_log(str(tmpdir), model='Test_Model')
+    with open(str(tmpdir.join('simulation_timing.jsonl'))) as log_file:
+        log = json.loads(log_file.readline())
+    assert log['model'] == 'Test_Model'
+    assert [stage['stage'] for stage in log['stages']] == ['first', 'second']
+
+
+def test_timed(monkeypatch):
+    """Test that producing the items is charged to the timed stage in batches."""
+    timer = StageTimer('HB Test', '0.1.0')
+    cpu_reads = []
+    cpu_time = timer._cpu_time
+    monkeypatch.setattr(timer, '_cpu_time', lambda: cpu_reads.append(1) or cpu_time())
+    timer.start('write')
+    for _ in timer.timed('translation', _slow_items(25, 0.002), batch_size=10):
+        time.sleep(0.001)
+    timer.stop()
+    # read by start, at the start of the batches, after each batch of 10 items,
+    # at the end of the items and by stop
+    assert len(cpu_reads) == 1 + 1 + 2 + 1 + 1
+    assert timer.stages == ['write', 'translation']
+    assert timer.totals['translation']['wall_time'] >= 0.05
+    assert 0.025 <= timer.totals['write']['wall_time'] < \
+        timer.totals['translation']['wall_time']
@@ -0,0 +1,74 @@
+# coding=utf-8
+import pytest
+
+from ladybug_geometry.geometry3d.pointvector import Point3D, Vector3D
+from honeybee.model import Model
+from honeybee.room import Room
+from honeybee.shade import Shade
+from honeybee_energy.lib.programtypes import office_program
+
+from honeybee_grasshopper_energy.writer import model_to_idf_objects, room_key
+
+
+@pytest.fixture
+def model():
+    rooms = []
+    for i in range(3):
+        room = Room.from_box('Room_{}'.format(i), 5, 5, 3, origin=Point3D(i * 5, 0, 0))
+        room.faces[1].apertures_by_ratio(0.4, 0.01)
+        room.faces[1].apertures[0].extruded_border(0.2)
+        room.properties.energy.program_type = office_program.duplicate()
+        room.properties.energy.add_default_ideal_air()
+        rooms.append(room)
+    shade = Shade.from_vertices(
+        'Context', [(0, -5, 0), (15, -5, 0), (15, -5, 10), (0, -5, 10)])
+    return Model('Writer_Model', rooms, orphaned_shades=[shade])
+
+
+def _idf(model, tmpdir, fragments=None, used_fragments=None):
+    return '\n\n'.join(model_to_idf_objects(
+        model, str(tmpdir), 'FullInteriorAndExteriorWithReflections', fragments,
+        used_fragments))
+
+
+def test_model_to_idf_objects(model, tmpdir):
+    """Test that the streamed objects give the same text as model.to.idf."""
+    expected = model.to.idf(model, schedule_directory=str(tmpdir))
+    assert _idf(model, tmpdir) == expected
+
+    used_fragments = {}
+    assert _idf(model, tmpdir, {}, used_fragments) == expected
+    assert len(used_fragments) != 0
+    # a run with all of the fragments cached never translates the rooms
+    assert _idf(model, tmpdir, used_fragments, {}) == expected
+
+
+def test_incremental_changes(model, tmpdir):
+    """Test that objects edited in place are translated again."""
+    used_fragments = {}
+    _idf(model, tmpdir, {}, used_fragments)
+
+    lighting = model.rooms[0].properties.energy.program_type.lighting
+    lighting.unlock()
+    lighting.watts_per_area = 3
+    model.rooms[1].move(Vector3D(0, 0, 1))
+    model.rooms[2].faces[1].apertures[0].outdoor_shades[0].move(Vector3D(0, 0, 0.1))
+    model.orphaned_shades[0].move(Vector3D(0, -1, 0))
+    next_fragments = {}
+    assert _idf(model, tmpdir, used_fragments, next_fragments) == \
+        model.to.idf(model, schedule_directory=str(tmpdir))
+    assert len(set(next_fragments) - set(used_fragments)) == 4
+
+
+def test_room_key(model):
+    """Test that the key of a Room only changes with its IDF text."""
+    room = model.rooms[0]
+    base_key = room_key(room, {})
+    assert room_key(room.duplicate(), {}) == base_key
+    room.display_name = 'Another Name'
+    assert room_key(room, {}) != base_key
+    room.display_name = model.rooms[0].display_name
+    infiltration = room.properties.energy.infiltration.duplicate()
+    infiltration.flow_per_exterior_area = 0.001
+    room.properties.energy.infiltration = infiltration
+    assert room_key(room, {}) != base_key